@@ -2,9 +2,19 @@ import uuid
 
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db.models.functions import Upper
 
 
 class CustomUser(AbstractUser):
+    class Meta(AbstractUser.Meta):
+        # serve the icontains filters of the question search by user
+        indexes = [
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='user_username_trgm_idx'),
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='user_first_name_trgm_idx'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='user_last_name_trgm_idx'),
+        ]
+
     uuid = models.UUIDField(
         primary_key=True,
         default=uuid.uuid4,
@@ -17,6 +17,7 @@ import sentry_sdk
 # Production & staging environment variables will be stored on Dockerfile
 # and will be populated through pipeline using CI/CD variables as args.
 import os
+import tempfile
 from dotenv import load_dotenv, find_dotenv
 from django.core.exceptions import ImproperlyConfigured
 
@@ -98,6 +99,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'rest_framework',
@@ -115,6 +117,9 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    'DEFAULT_THROTTLE_RATES': {
+        'prevalidate': os.getenv("PREVALIDATION_RATE", "30/min"),
+    },
 }
 
 # JWT access token properties
@@ -248,6 +253,102 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Overrides the Groq endpoint, e.g. to point at a local stub server
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")
+
+# Connection pool of the process-wide LLM client
+LLM_HTTP2 = parse_env_value("LLM_HTTP2", os.getenv("LLM_HTTP2", "true"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 10))
+LLM_KEEPALIVE_EXPIRY = int(os.getenv("LLM_KEEPALIVE_EXPIRY", 30))
+
+# Resilience of LLM calls: per-attempt timeout and overall deadline (seconds), retries with
+# jittered exponential backoff, hedged requests past the p95 latency and a circuit breaker
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 10))
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", 30))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 2))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", 0.5))
+LLM_RETRY_BACKOFF_MAX = float(os.getenv("LLM_RETRY_BACKOFF_MAX", 4))
+LLM_HEDGE_ENABLED = parse_env_value("LLM_HEDGE_ENABLED", os.getenv("LLM_HEDGE_ENABLED", "true"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", 0.5))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", 5))
+LLM_BREAKER_RESET_TIMEOUT = float(os.getenv("LLM_BREAKER_RESET_TIMEOUT", 30))
+
+# Requests and tokens per minute sent to the LLM provider, shared by every worker through
+# a flock-guarded file ("file") or the database ("database"), "none" disables the limiter
+LLM_RATE_LIMIT_BACKEND = os.getenv("LLM_RATE_LIMIT_BACKEND", "none")
+LLM_RATE_LIMIT_RPM = int(os.getenv("LLM_RATE_LIMIT_RPM", 30))
+LLM_RATE_LIMIT_TPM = int(os.getenv("LLM_RATE_LIMIT_TPM", 6000))
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", 30))
+LLM_RATE_LIMIT_FILE = os.getenv("LLM_RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "maams-llm-rate-limit.json"))
+
+# Cache of LLM answers: in-process LRU in front of a database table
+LLM_CACHE_ENABLED = parse_env_value("LLM_CACHE_ENABLED", os.getenv("LLM_CACHE_ENABLED", "true"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+LLM_CACHE_DB_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", 100000))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 60 * 60))
+
+# LLM metrics are flushed by every worker to METRICS_DIR at most every METRICS_FLUSH_INTERVAL seconds
+# and merged by the Prometheus endpoint, which requires the METRICS_TOKEN bearer token
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(tempfile.gettempdir(), "maams-metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Identical LLM prompts in flight share one request inside a worker ("process"), and across
+# workers through a Postgres advisory lock ("database")
+LLM_SINGLE_FLIGHT_BACKEND = os.getenv("LLM_SINGLE_FLIGHT_BACKEND", "process")
+LLM_SINGLE_FLIGHT_POLL_INTERVAL = float(os.getenv("LLM_SINGLE_FLIGHT_POLL_INTERVAL", 0.05))
+
+# Cheap model per validation type, e.g. "normal=llama-3.1-8b-instant,root=llama-3.1-8b-instant".
+# Routed prompts escalate to the large model when the cheap answer is unparseable or when
+# LLM_ROUTING_SAMPLES samples of the cheap model disagree, empty disables routing
+LLM_ROUTES = dict(route.split("=", 1) for route in os.getenv("LLM_ROUTES", "").split(",") if route)
+LLM_ROUTING_SAMPLES = int(os.getenv("LLM_ROUTING_SAMPLES", 2))
+LLM_ROUTING_SAMPLE_TEMPERATURE = float(os.getenv("LLM_ROUTING_SAMPLE_TEMPERATURE", 0.7))
+
+# Streams completions and closes the stream as soon as the answer can be parsed,
+# instead of waiting for up to max_tokens tokens
+LLM_STREAMING = parse_env_value("LLM_STREAMING", os.getenv("LLM_STREAMING", "false"))
+
+# Maximum number of causes of a row validated concurrently (1 disables concurrency)
+VALIDATION_MAX_CONCURRENCY = int(os.getenv("VALIDATION_MAX_CONCURRENCY", 5))
+
+# "multi" asks one question per LLM call, "combined" asks for a structured verdict of a cause
+# in a single call and "batched" for the verdicts of a whole row in a single call,
+# both fall back to per-cause "multi" calls when the answer cannot be parsed
+VALIDATION_EVALUATION_MODE = os.getenv("VALIDATION_EVALUATION_MODE", "multi")
+
+# "row" validates the unvalidated causes of the newest row, "tree" those of every row in one call,
+# a cause being evaluated once its parent in the previous row is resolved
+VALIDATION_SCOPE = os.getenv("VALIDATION_SCOPE", "row")
+
+# Causes of row > 1 whose character n-gram TF-IDF cosine similarity to their previous cause
+# reaches the threshold get the "similar to the previous cause" feedback without an LLM call.
+# Off by default as it replaces the verdict of the LLM
+VALIDATION_SIMILARITY_ENABLED = parse_env_value("VALIDATION_SIMILARITY_ENABLED", os.getenv("VALIDATION_SIMILARITY_ENABLED", "false"))
+VALIDATION_SIMILARITY_THRESHOLD = float(os.getenv("VALIDATION_SIMILARITY_THRESHOLD", 0.9))
+VALIDATION_SIMILARITY_NGRAM = int(os.getenv("VALIDATION_SIMILARITY_NGRAM", 3))
+
+# Validation jobs run on an in-process thread pool ("thread"), on the run_validation_worker
+# command ("worker") or synchronously inside the request ("inline")
+VALIDATION_JOB_BACKEND = os.getenv("VALIDATION_JOB_BACKEND", "thread")
+VALIDATION_JOB_WORKERS = int(os.getenv("VALIDATION_JOB_WORKERS", 2))
+VALIDATION_JOB_POLL_INTERVAL = int(os.getenv("VALIDATION_JOB_POLL_INTERVAL", 1))
+# Running jobs not updated for this many seconds are picked up again by the worker command
+VALIDATION_JOB_TIMEOUT = int(os.getenv("VALIDATION_JOB_TIMEOUT", 600))
+
+# Draft causes sent to the pre-validate endpoint are evaluated in the background ("thread") or
+# synchronously ("inline") to warm the verdict cache. A user has at most PREVALIDATION_MAX_PENDING
+# drafts queued or running per worker process, so up to PREVALIDATION_MAX_PENDING times the number
+# of gunicorn workers in total. A newer draft of the same cell cancels the queued one
+PREVALIDATION_BACKEND = os.getenv("PREVALIDATION_BACKEND", "thread")
+PREVALIDATION_WORKERS = int(os.getenv("PREVALIDATION_WORKERS", 2))
+PREVALIDATION_MAX_PENDING = int(os.getenv("PREVALIDATION_MAX_PENDING", 3))
+
+# Search bar dropdown values are cached per worker until a question change bumps the facet version,
+# which is sent as the ETag of the response so that clients can revalidate with If-None-Match
+QUESTION_FACETS_CACHE_ENABLED = parse_env_value("QUESTION_FACETS_CACHE_ENABLED", os.getenv("QUESTION_FACETS_CACHE_ENABLED", "true"))
 
 # Sentry
 if active_env == "DEVELOPMENT":
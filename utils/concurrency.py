@@ -0,0 +1,69 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from django.db import connections
+
+
+def iter_concurrently(tasks: List[Callable], max_workers: int) -> Iterator[Tuple[int, Exception | None]]:
+    '''
+    Runs every task on a bounded thread pool and yields (index, exception or None)
+    in the calling thread as soon as each task finishes.
+    Runs the tasks inline when there is nothing to parallelize.
+    '''
+    return iter_dag(tasks, [()] * len(tasks), max_workers)
+
+
+def iter_dag(tasks: List[Callable], dependencies: List[Iterable[int]], max_workers: int) -> Iterator[Tuple[int, Exception | None]]:
+    '''
+    Like iter_concurrently, but a task is only started once every task whose index is listed
+    in its dependencies has finished, whatever their outcome. Dependencies must not form a cycle.
+    '''
+    waiting = {index: set(depends_on) for index, depends_on in enumerate(dependencies)}
+    dependants = {index: [] for index in waiting}
+    for index, depends_on in waiting.items():
+        for dependency in depends_on:
+            dependants[dependency].append(index)
+
+    ready = deque(index for index, depends_on in waiting.items() if not depends_on)
+
+    def release(index: int):
+        for dependant in dependants[index]:
+            waiting[dependant].discard(index)
+            if not waiting[dependant]:
+                ready.append(dependant)
+
+    if max_workers <= 1 or len(tasks) <= 1:
+        while ready:
+            index = ready.popleft()
+            yield index, _capture(tasks[index])
+            release(index)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+        futures = {}
+        while ready or futures:
+            while ready:
+                index = ready.popleft()
+                futures[executor.submit(_run_in_thread, tasks[index])] = index
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                yield index, future.result()
+                release(index)
+
+
+def _capture(task: Callable) -> Exception | None:
+    try:
+        task()
+    except Exception as error:
+        return error
+    return None
+
+
+def _run_in_thread(task: Callable) -> Exception | None:
+    try:
+        return _capture(task)
+    finally:
+        # pool threads get their own database connections, which Django never closes for us
+        connections.close_all()
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+class AddTrigramIndex(migrations.AddIndex):
+    '''
+    Adds a pg_trgm index, creating the extension first. Where the server does not ship pg_trgm
+    the index is only recorded in the migration state, the icontains filters it serves keep
+    working with sequential scans.
+    '''
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not trigram_available(schema_editor):
+            return
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(self.index.name)}')
+
+
+def trigram_available(schema_editor) -> bool:
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
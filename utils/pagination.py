@@ -1,5 +1,16 @@
+import json
+import uuid
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Field, Func, Value
+from django.db.models.lookups import GreaterThan, LessThan
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class CustomPageNumberPagination(pagination.PageNumberPagination):
     '''
@@ -21,4 +32,117 @@ class CustomPageNumberPagination(pagination.PageNumberPagination):
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'results': data
-        })
\ No newline at end of file
+        })
+
+class KeysetCursorPagination(pagination.BasePagination):
+    '''
+    Keyset pagination, newest first, with opaque cursors. Pages are keyed on the descending
+    ordering of the queryset followed by id: (created_at, id) by default and (rank, created_at, id)
+    for a search ordered by relevance. The position is compared as one row value,
+    (created_at, id) < (%s, %s), which the (created_at, id) indexes serve as a range scan,
+    so every page reads page size + 1 rows whatever its depth.
+    The total count is only computed when asked for with with_count=true.
+
+    Example how to use this pagination:
+    <BASE>/api/history/search?keyword=Indo&pagination=cursor&count=4
+    and then follow the next and previous links.
+    '''
+    page_size = 3
+    page_size_query_param = 'count'
+    max_page_size = 5
+    cursor_query_param = 'cursor'
+    count_query_param = 'with_count'
+    invalid_cursor_message = 'Invalid cursor'
+    default_keys = ['created_at', 'id']
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        self.count = queryset.count() if request.query_params.get(self.count_query_param) == 'true' else None
+        self.keys = self.get_keys(queryset)
+
+        direction, position = self.decode_cursor(request, queryset)
+        descending = direction != 'previous'
+        if position is not None:
+            compare = LessThan if descending else GreaterThan
+            values = [Value(value, output_field=self.get_field(queryset, key)) for key, value in zip(self.keys, position)]
+            queryset = queryset.filter(compare(self._row(*map(F, self.keys)), self._row(*values)))
+        queryset = queryset.order_by(*[f"{'-' if descending else ''}{key}" for key in self.keys])
+
+        # one extra row tells whether there is another page in this direction
+        page = list(queryset[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+        if not descending:
+            page.reverse()
+
+        has_next = has_more if descending else True
+        has_previous = has_more if not descending else position is not None
+        self.next_position = self.get_position(page[-1]) if has_next and page else None
+        self.previous_position = self.get_position(page[0]) if has_previous and page else None
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def get_keys(self, queryset) -> list:
+        '''
+        Returns the fields of the descending ordering of the queryset, ending with id.
+        '''
+        keys = [field.lstrip('-') for field in queryset.query.order_by if isinstance(field, str)] or self.default_keys
+        return keys if keys[-1] == 'id' else keys + ['id']
+
+    def get_field(self, queryset, key: str):
+        if key in queryset.query.annotations:
+            return queryset.query.annotations[key].output_field
+        return queryset.model._meta.get_field(key)
+
+    def get_position(self, instance) -> tuple:
+        return tuple(getattr(instance, key) for key in self.keys)
+
+    def get_next_link(self) -> str | None:
+        return self.encode_cursor('next', self.next_position)
+
+    def get_previous_link(self) -> str | None:
+        return self.encode_cursor('previous', self.previous_position)
+
+    def encode_cursor(self, direction: str, position: tuple | None) -> str | None:
+        if position is None:
+            return None
+        values = [value.isoformat() if isinstance(value, datetime) else str(value) if isinstance(value, uuid.UUID) else value
+                  for value in position]
+        token = json.dumps({'d': direction, 'k': self.keys, 'v': values})
+        cursor = base64.urlsafe_b64encode(token.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request, queryset) -> tuple:
+        '''
+        Returns the direction and key values of the cursor, ('next', None) without one.
+        A cursor taken from another ordering, such as another search, is invalid.
+        '''
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return 'next', None
+        try:
+            token = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if token['d'] not in ('next', 'previous') or token['k'] != self.keys or len(token['v']) != len(self.keys):
+                raise ValueError(token['d'])
+            position = tuple(self.get_field(queryset, key).to_python(value) for key, value in zip(self.keys, token['v']))
+            return token['d'], position
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _row(self, *expressions) -> Func:
+        return Func(*expressions, function='ROW', output_field=Field())
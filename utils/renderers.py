@@ -0,0 +1,24 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import renderers
+
+
+def format_event(event: str, data) -> bytes:
+    '''
+    Encodes one Server-Sent Events message with a JSON payload.
+    '''
+    return f'event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n'.encode()
+
+
+class EventStreamRenderer(renderers.BaseRenderer):
+    '''
+    Lets views negotiate text/event-stream. Streamed events are written by the view itself,
+    so this renderer only formats error responses raised before streaming starts.
+    '''
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data)
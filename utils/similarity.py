@@ -0,0 +1,47 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List
+
+
+def char_ngrams(text: str, n: int) -> Counter:
+    '''
+    Counts the character n-grams of the lowercased words of a text, padded with spaces
+    so word boundaries count too.
+    '''
+    words = re.findall(r'\w+', text.lower())
+    ngrams = Counter()
+    for word in words:
+        padded = f' {word} '
+        if len(padded) <= n:
+            ngrams[padded] += 1
+            continue
+        for start in range(len(padded) - n + 1):
+            ngrams[padded[start:start + n]] += 1
+    return ngrams
+
+
+def tfidf_vectors(texts: List[str], n: int = 3) -> List[Dict[str, float]]:
+    '''
+    Returns L2-normalized TF-IDF vectors of the character n-grams of each text,
+    with the smoothed idf ln((1 + N) / (1 + df)) + 1 over the given texts.
+    '''
+    counts = [char_ngrams(text, n) for text in texts]
+    document_frequency = Counter(ngram for count in counts for ngram in count)
+    idf = {ngram: math.log((1 + len(texts)) / (1 + df)) + 1 for ngram, df in document_frequency.items()}
+
+    vectors = []
+    for count in counts:
+        vector = {ngram: tf * idf[ngram] for ngram, tf in count.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({ngram: weight / norm for ngram, weight in vector.items()} if norm else {})
+    return vectors
+
+
+def cosine(first: Dict[str, float], second: Dict[str, float]) -> float:
+    '''
+    Cosine similarity of two normalized sparse vectors.
+    '''
+    if len(first) > len(second):
+        first, second = second, first
+    return sum(weight * second.get(ngram, 0) for ngram, weight in first.items())
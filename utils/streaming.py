@@ -0,0 +1,43 @@
+import asyncio
+import threading
+from typing import AsyncIterator, Iterator
+
+from django.db import connections
+
+_DONE = object()
+
+
+async def to_async_iterator(iterator: Iterator) -> AsyncIterator:
+    '''
+    Drains a blocking iterator on a dedicated thread, so an ASGI server can stream it
+    without buffering the whole response or holding Django's shared sync thread.
+    '''
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # the event loop is gone once the client disconnected, the iterator still runs to completion
+            pass
+
+    def drain():
+        try:
+            for item in iterator:
+                put(item)
+        except BaseException as error:
+            put(error)
+        finally:
+            put(_DONE)
+            connections.close_all()
+
+    threading.Thread(target=drain, daemon=True).start()
+
+    while True:
+        item = await queue.get()
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
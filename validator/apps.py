@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ValidatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'validator'
+
+    def ready(self):
+        # keeps the search vectors and facets of questions up to date
+        from validator import signals  # noqa: F401
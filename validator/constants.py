@@ -12,6 +12,11 @@ class ErrorMsg:
     VALUE_NOT_UPDATED = "Tidak boleh sama dengan yang sebelumnya"
     INVALID_FILTERS = 'Invalid filter option.'
     AI_SERVICE_ERROR = "Failed to call the AI service."
+    JOB_NOT_FOUND = "Proses validasi tidak ditemukan"
+    JOB_ABANDONED = "Proses validasi terhenti, silakan validasi ulang."
+    JOB_FAILED = "Proses validasi gagal, silakan validasi ulang."
+    PREV_CAUSE_NOT_FOUND = "Sebab sebelumnya tidak ditemukan"
+    TOO_MANY_DRAFTS = "Terlalu banyak sebab yang sedang divalidasi, coba lagi nanti."
     
 class FeedbackMsg:
     # Root Cause Messages
@@ -5,3 +5,5 @@ class FieldValuesDataClass(BaseModel):
     pengguna: list[str]
     judul: list[str]
     topik: list[str]
+    # version of the facets the values were read at, when responses are cached
+    etag: str | None = None
@@ -0,0 +1,9 @@
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class PrevalidationDataClass(BaseModel):
+    question_id: UUID
+    row: int
+    column: int
+    status: str
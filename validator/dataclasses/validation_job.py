@@ -0,0 +1,18 @@
+from uuid import UUID
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel
+
+from validator.dataclasses.create_cause import CreateCauseDataClass
+
+
+class ValidationJobDataClass(BaseModel):
+    id: UUID
+    question_id: UUID
+    status: str
+    progress: int
+    total: int
+    error: str
+    created_at: datetime
+    updated_at: datetime
+    result: List[CreateCauseDataClass]
@@ -21,4 +21,13 @@ class ValidationType(Enum):
     NORMAL = 'normal'
     ROOT = 'root'
     FALSE = 'false'
-    ROOT_TYPE = 'root_type'
\ No newline at end of file
+    ROOT_TYPE = 'root_type'
+
+class EvaluationMode(Enum):
+    MULTI = 'multi'
+    COMBINED = 'combined'
+    BATCHED = 'batched'
+
+class ValidationScope(Enum):
+    ROW = 'row'
+    TREE = 'tree'
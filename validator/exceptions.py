@@ -31,4 +31,7 @@ class ValueNotUpdatedException(APIException):
 
 
 class AIServiceErrorException(APIException):
-    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
\ No newline at end of file
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+class TooManyDraftsException(APIException):
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
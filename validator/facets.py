@@ -0,0 +1,113 @@
+import threading
+from collections import Counter
+from typing import Any, Callable
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from validator.models.question_facet import QuestionFacet, QuestionFacetVersion
+
+JUDUL = QuestionFacet.KindChoices.JUDUL.value
+TOPIK = QuestionFacet.KindChoices.TOPIK.value
+PENGGUNA = QuestionFacet.KindChoices.PENGGUNA.value
+VERSION_SEQUENCE = 'validator_questionfacet_version_seq'
+
+# responses built per facet version, shared by the threads of this worker
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def apply(changes: Counter):
+    """
+    Adds the deltas of a {(kind, value): delta} counter to the facet counts in one upsert,
+    drops the facets no question holds anymore and bumps the version when a facet
+    appeared or disappeared.
+    """
+    changes = sorted((key, delta) for key, delta in changes.items() if delta and key[1])
+    if not changes:
+        return
+
+    table = QuestionFacet._meta.db_table
+    rows = ', '.join(['(%s, %s, %s)'] * len(changes))
+    params = [param for (kind, value), delta in changes for param in (kind, value, delta)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        # keys are sorted so concurrent writers lock the rows in the same order
+        cursor.execute(
+            f"INSERT INTO {table} (kind, value, count) VALUES {rows} "
+            f"ON CONFLICT (kind, value) DO UPDATE SET count = {table}.count + EXCLUDED.count "
+            f"RETURNING xmax = 0 AND count > 0",
+            params,
+        )
+        appeared = any(inserted for inserted, in cursor.fetchall())
+        disappeared, _ = QuestionFacet.objects.filter(
+            count__lte=0, kind__in={kind for (kind, _), _ in changes}, value__in={value for (_, value), _ in changes},
+        ).delete()
+        if appeared or disappeared:
+            _bump_version(cursor)
+
+
+def rename(kind: str, old: str, new: str | None):
+    """
+    Moves the count of a renamed tag or username to its new value, or drops it when new is None.
+    """
+    count = QuestionFacet.objects.filter(kind=kind, value=old).values_list('count', flat=True).first()
+    if count:
+        apply(Counter({(kind, old): -count, (kind, new): count}))
+
+
+def version() -> int:
+    return QuestionFacetVersion.objects.values_list('version', flat=True).first() or 0
+
+
+def values(kind: str) -> list:
+    return list(QuestionFacet.objects.filter(kind=kind).order_by('value').values_list('value', flat=True))
+
+
+def cached(version: int, key: str, build: Callable[[], Any]) -> Any:
+    """
+    Returns the value built for the key at this facet version, building it on the first call.
+    Values of older versions are dropped.
+    """
+    with _cache_lock:
+        if version > _cache.get('version', -1):
+            _cache.clear()
+            _cache['version'] = version
+        value = _cache.get(key) if _cache['version'] == version else None
+    if value is None:
+        value = build()
+        with _cache_lock:
+            if _cache['version'] == version:
+                _cache[key] = value
+    return value
+
+
+def rebuild(question_model, facet_model, version_model):
+    """
+    Recounts every facet from the questions.
+    Takes the models so that migrations can pass their historical ones.
+    """
+    questions = question_model.objects.all()
+    counts = {
+        JUDUL: questions.values('title').annotate(count=Count('pk')).values_list('title', 'count'),
+        TOPIK: (question_model.tags.through.objects.values('tag__name').annotate(count=Count('pk'))
+                .values_list('tag__name', 'count')),
+        PENGGUNA: (questions.filter(user__isnull=False).values('user__username').annotate(count=Count('pk'))
+                   .values_list('user__username', 'count')),
+    }
+    with transaction.atomic():
+        facet_model.objects.all().delete()
+        facet_model.objects.bulk_create(
+            facet_model(kind=kind, value=value, count=count)
+            for kind, rows in counts.items() for value, count in rows if value
+        )
+        with connection.cursor() as cursor:
+            _bump_version(cursor, version_model._meta.db_table)
+
+
+def _bump_version(cursor, table: str = QuestionFacetVersion._meta.db_table):
+    # sequences never hand out a value twice, even when the bumping transaction rolls back,
+    # so a version cached by a worker cannot come back with other facets
+    cursor.execute(
+        f"INSERT INTO {table} (id, version) VALUES (1, nextval('{VERSION_SEQUENCE}')) "
+        f"ON CONFLICT (id) DO UPDATE SET version = EXCLUDED.version"
+    )
@@ -0,0 +1,130 @@
+import json
+import hashlib
+import threading
+from datetime import timedelta
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils import timezone
+
+from validator.llm.metrics import metrics
+from validator.models.llm_verdict import LLMVerdict
+
+
+class VerdictCache:
+    """
+    Two-tier cache of raw LLM answers: an in-process LRU in front of the LLMVerdict table.
+    Prompts are sent with a fixed seed and low temperature, so an identical request
+    can reuse the previous answer instead of another network round trip.
+    """
+
+    # how many database writes happen between two eviction passes
+    EVICTION_INTERVAL = 100
+    # the database tier is evicted least recently used first, a hit refreshes the last use of its
+    # row at most this often so that hot keys do not cost a write per hit
+    TOUCH_INTERVAL = timedelta(minutes=10)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._writes = 0
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """
+        Hashes everything that determines the completion: messages, model and sampling parameters.
+        """
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        if not settings.LLM_CACHE_ENABLED:
+            return None
+
+        now = timezone.now()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+            else:
+                self._entries.pop(key, None)
+                entry = None
+        if entry is not None:
+            metrics.increment('llm_cache_requests_total', tier='memory', result='hit')
+            self._touch(key, entry[2], now)
+            return entry[0]
+
+        verdict = LLMVerdict.objects.filter(key=key, expires_at__gt=now).only('answer', 'expires_at', 'last_used_at').first()
+        if verdict is None:
+            metrics.increment('llm_cache_requests_total', tier='db', result='miss')
+            return None
+
+        metrics.increment('llm_cache_requests_total', tier='db', result='hit')
+        self._remember(key, verdict.answer, verdict.expires_at, verdict.last_used_at)
+        self._touch(key, verdict.last_used_at, now)
+        return verdict.answer
+
+    def set(self, key: str, answer: str, model: str):
+        if not settings.LLM_CACHE_ENABLED:
+            return
+
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=settings.LLM_CACHE_TTL)
+        self._remember(key, answer, expires_at, now)
+        LLMVerdict.objects.update_or_create(
+            key=key, defaults={'model': model, 'answer': answer, 'expires_at': expires_at, 'last_used_at': now}
+        )
+
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.EVICTION_INTERVAL == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes expired rows and trims the table down to LLM_CACHE_DB_MAX_ENTRIES, least recently used first.
+        """
+        LLMVerdict.objects.filter(expires_at__lte=timezone.now()).delete()
+        overflow = LLMVerdict.objects.order_by('-last_used_at').values_list('last_used_at', flat=True)[settings.LLM_CACHE_DB_MAX_ENTRIES:].first()
+        if overflow is not None:
+            LLMVerdict.objects.filter(last_used_at__lte=overflow).delete()
+
+    def clear(self):
+        """
+        Drops the in-process tier only.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        hits = metrics.get('llm_cache_requests_total', result='hit')
+        misses = metrics.get('llm_cache_requests_total', result='miss')
+        return {
+            'memory_hits': metrics.get('llm_cache_requests_total', tier='memory', result='hit'),
+            'db_hits': metrics.get('llm_cache_requests_total', tier='db', result='hit'),
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def _touch(self, key: str, used_at, now):
+        """
+        Records a hit as the last use of the row when the recorded one is older than TOUCH_INTERVAL.
+        """
+        if used_at > now - self.TOUCH_INTERVAL:
+            return
+        LLMVerdict.objects.filter(key=key).update(last_used_at=now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], entry[1], now)
+
+    def _remember(self, key: str, answer: str, expires_at, used_at):
+        with self._lock:
+            self._entries[key] = (answer, expires_at, used_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > settings.LLM_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+
+verdict_cache = VerdictCache()
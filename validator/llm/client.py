@@ -0,0 +1,74 @@
+import os
+import threading
+import importlib.util
+
+import httpx
+from groq import Groq
+from django.conf import settings
+
+
+class LLMClientManager:
+    """
+    Holds one Groq client per process so every LLM call reuses the same keep-alive
+    connection pool instead of paying a new TCP/TLS handshake.
+    The client is rebuilt lazily whenever the process id changes (e.g. gunicorn forks).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+
+    def get(self) -> Groq:
+        pid = os.getpid()
+        if self._client is None or self._pid != pid:
+            with self._lock:
+                if self._client is None or self._pid != pid:
+                    self._client = self._build()
+                    self._pid = pid
+        return self._client
+
+    def reset(self):
+        """
+        Closes the pooled connections, the next call builds a fresh client.
+        """
+        with self._lock:
+            client, self._client, self._pid = self._client, None, None
+        if client is not None:
+            client.close()
+
+    def _forget(self):
+        # sockets inherited from the parent must not be shared nor closed by the child,
+        # the lock may also have been held by another thread while forking
+        self._lock = threading.Lock()
+        self._client = None
+        self._pid = None
+
+    def _build(self) -> Groq:
+        http_client = httpx.Client(
+            http2=settings.LLM_HTTP2 and http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY,
+            ),
+        )
+        # retries are handled by the transport, which also knows about the circuit breaker
+        return Groq(
+            api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL,
+            http_client=http_client,
+            timeout=settings.LLM_TIMEOUT,
+            max_retries=0,
+        )
+
+
+def http2_available() -> bool:
+    # httpx only speaks HTTP/2 when the optional h2 package is installed
+    return importlib.util.find_spec('h2') is not None
+
+
+llm_clients = LLMClientManager()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=llm_clients._forget)
@@ -0,0 +1,306 @@
+import os
+import json
+import atexit
+import glob
+import time
+import fcntl
+import tempfile
+import threading
+
+from django.conf import settings
+
+# upper bounds in seconds of the latency histogram buckets, +Inf is implicit
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# cumulative metrics of the workers that exited, kept so that the aggregated totals never go down
+ARCHIVE_FILE = 'archive.json'
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process counters, summaries and histograms of the LLM pipeline, keyed by name and labels.
+    Every process periodically flushes its values to METRICS_DIR, and once more when it exits,
+    so aggregate() can merge the metrics of all gunicorn workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._summaries = {}
+        self._histograms = {}
+        self._flushed_at = 0
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._maybe_flush()
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Records one sample of a summary, exposed as <name>_count and <name>_sum.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            count, total = self._summaries.get(key, (0, 0))
+            self._summaries[key] = (count + 1, total + value)
+        self._maybe_flush()
+
+    def histogram(self, name: str, value: float, buckets: tuple = DEFAULT_BUCKETS, **labels):
+        """
+        Records one sample of a histogram with cumulative buckets, exposed in the Prometheus format.
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            bounds, counts, count, total = self._histograms.get(key, (tuple(buckets), [0] * len(buckets), 0, 0))
+            counts = [bucket + (value <= bound) for bucket, bound in zip(counts, bounds)]
+            self._histograms[key] = (bounds, counts, count + 1, total + value)
+        self._maybe_flush()
+
+    def get(self, name: str, **labels) -> float:
+        """
+        Returns the sum of every series of a counter matching the given labels.
+        """
+        with self._lock:
+            return sum(
+                value for (key_name, key_labels), value in self._counters.items()
+                if key_name == name and labels.items() <= dict(key_labels).items()
+            )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snapshot = {}
+            for (name, labels), value in sorted(self._counters.items()):
+                snapshot.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            for (name, labels), (count, total) in sorted(self._summaries.items()):
+                snapshot.setdefault(f'{name}_count', []).append({'labels': dict(labels), 'value': count})
+                snapshot.setdefault(f'{name}_sum', []).append({'labels': dict(labels), 'value': total})
+            for (name, labels), (_, _, count, total) in sorted(self._histograms.items()):
+                snapshot.setdefault(f'{name}_count', []).append({'labels': dict(labels), 'value': count})
+                snapshot.setdefault(f'{name}_sum', []).append({'labels': dict(labels), 'value': total})
+            return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+            self._histograms.clear()
+            self._flushed_at = 0
+
+    def dump(self) -> dict:
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'summaries': [[name, list(labels), count, total] for (name, labels), (count, total) in self._summaries.items()],
+                'histograms': [
+                    [name, list(labels), list(bounds), counts, count, total]
+                    for (name, labels), (bounds, counts, count, total) in self._histograms.items()
+                ],
+            }
+
+    def merge(self, data: dict):
+        """
+        Adds the values of a dump() to this registry.
+        """
+        with self._lock:
+            for name, labels, value in data['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, labels, count, total in data['summaries']:
+                key = (name, tuple(map(tuple, labels)))
+                previous_count, previous_total = self._summaries.get(key, (0, 0))
+                self._summaries[key] = (previous_count + count, previous_total + total)
+            for name, labels, bounds, counts, count, total in data['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                _, previous_counts, previous_count, previous_total = self._histograms.get(key, (bounds, [0] * len(bounds), 0, 0))
+                self._histograms[key] = (
+                    tuple(bounds),
+                    [previous + current for previous, current in zip(previous_counts, counts)],
+                    previous_count + count,
+                    previous_total + total,
+                )
+
+    def flush(self):
+        """
+        Writes the values of this process to METRICS_DIR, replacing its previous file atomically.
+        """
+        if not settings.METRICS_DIR:
+            return
+        data = self.dump()
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        _write(os.path.join(settings.METRICS_DIR, f'metrics-{_process_key(os.getpid())}.json'), data)
+        self._flushed_at = time.monotonic()
+
+    def aggregate(self) -> 'MetricsRegistry':
+        """
+        Returns a registry holding the sum of the metrics of every process sharing METRICS_DIR.
+        The counters, summaries and histograms of processes that exited are folded into the archive
+        before their files are removed, their gauges are dropped. A file is matched to its process
+        by pid and start time, so a recycled pid does not keep the file of an exited process alive.
+        """
+        aggregated = MetricsRegistry()
+        aggregated.merge(self.dump())
+        if not settings.METRICS_DIR:
+            return aggregated
+        # the other processes aggregating see the values served here
+        self._flush_quietly()
+
+        own = f'metrics-{_process_key(os.getpid())}.json'
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics-*.json')):
+            name = os.path.basename(path)
+            if name == own:
+                continue
+            if not _is_alive(name[len('metrics-'):-len('.json')]):
+                _archive(path)
+                continue
+            try:
+                with open(path) as file:
+                    aggregated.merge(json.load(file))
+            except (OSError, ValueError):
+                continue
+
+        try:
+            with open(os.path.join(settings.METRICS_DIR, ARCHIVE_FILE)) as file:
+                aggregated.merge(json.load(file))
+        except (OSError, ValueError):
+            pass
+        return aggregated
+
+    def render_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format. Counters not named *_total
+        go up and down and are exposed as gauges.
+        """
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            summaries = sorted(self._summaries.items())
+            histograms = sorted(self._histograms.items())
+
+        for name, series in _group(counters):
+            lines.append(f'# TYPE {name} {"counter" if name.endswith("_total") else "gauge"}')
+            lines.extend(f'{name}{_labels(labels)} {_number(value)}' for labels, value in series)
+        for name, series in _group(summaries):
+            lines.append(f'# TYPE {name} summary')
+            for labels, (count, total) in series:
+                lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+                lines.append(f'{name}_count{_labels(labels)} {_number(count)}')
+        for name, series in _group(histograms):
+            lines.append(f'# TYPE {name} histogram')
+            for labels, (bounds, counts, count, total) in series:
+                for bound, bucket in zip(bounds, counts):
+                    lines.append(f'{name}_bucket{_labels(labels + (("le", _number(bound)),))} {bucket}')
+                lines.append(f'{name}_bucket{_labels(labels + (("le", "+Inf"),))} {count}')
+                lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+                lines.append(f'{name}_count{_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def _maybe_flush(self):
+        if settings.METRICS_DIR and time.monotonic() - self._flushed_at >= settings.METRICS_FLUSH_INTERVAL:
+            self._flush_quietly()
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except OSError:
+            # metrics must never break the request that records them
+            pass
+
+
+def _group(items: list) -> list:
+    groups = {}
+    for (name, labels), value in items:
+        groups.setdefault(name, []).append((labels, value))
+    return sorted(groups.items())
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def _process_key(pid: int) -> str:
+    """
+    Returns "<pid>-<start time>" for a running process, the start time telling apart the processes
+    a pid is recycled for. Without /proc it is "<pid>-0".
+    """
+    try:
+        with open(f'/proc/{pid}/stat') as file:
+            # the command name may hold spaces, the start time is the 20th field after it
+            return f'{pid}-{file.read().rpartition(")")[2].split()[19]}'
+    except (OSError, IndexError):
+        return f'{pid}-0'
+
+
+def _is_alive(key: str) -> bool:
+    """
+    Whether the process a metrics file was written by, keyed as in _process_key, still runs.
+    """
+    pid, _, started = key.partition('-')
+    try:
+        pid = int(pid)
+        os.kill(pid, 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass
+    # files without a start time are trusted to the pid
+    return started in ('', '0') or _process_key(pid) == key
+
+
+def _write(path: str, data: dict):
+    # every write gets its own temporary file, concurrent flushes of the same process cannot interleave
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.metrics-', suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'w') as file:
+            json.dump(data, file)
+        os.replace(temporary, path)
+    except BaseException:
+        _remove(temporary)
+        raise
+
+
+def _archive(path: str):
+    """
+    Adds the cumulative metrics of an exited process to the archive and removes its file,
+    under a lock so that two processes aggregating at once do not both fold it in.
+    """
+    directory = os.path.dirname(path)
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    with open(os.path.join(directory, f'{ARCHIVE_FILE}.lock'), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            if not os.path.exists(path):
+                return
+            archive = MetricsRegistry()
+            for source in (archive_path, path):
+                try:
+                    with open(source) as file:
+                        archive.merge(json.load(file))
+                except (OSError, ValueError):
+                    continue
+            data = archive.dump()
+            # gauges describe a live process, the queue depth of an exited one means nothing
+            data['counters'] = [counter for counter in data['counters'] if counter[0].endswith('_total')]
+            _write(archive_path, data)
+            _remove(path)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+metrics = MetricsRegistry()
+# the values recorded since the last throttled flush would otherwise be lost with the process
+atexit.register(metrics._flush_quietly)
@@ -0,0 +1,153 @@
+import json
+import time
+import fcntl
+import random
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from validator.constants import ErrorMsg
+from validator.exceptions import AIServiceErrorException
+from validator.llm.metrics import metrics
+from validator.models.llm_rate_bucket import LLMRateBucket
+
+
+def take(state: dict, needs: dict, now: float) -> float:
+    """
+    Refills the buckets in `state` ({name: [level, updated_at]}) and takes the needed amounts
+    ({name: (amount, capacity, per_second)}) from all of them at once.
+    Returns 0 when granted, otherwise the seconds to wait before the amounts can be available.
+    """
+    wait = 0
+    for name, (amount, capacity, per_second) in needs.items():
+        level, updated_at = state.get(name, (capacity, now))
+        level = min(capacity, level + max(0, now - updated_at) * per_second)
+        state[name] = [level, now]
+        if level < amount:
+            wait = max(wait, (amount - level) / per_second)
+
+    if wait == 0:
+        for name, (amount, _, _) in needs.items():
+            state[name][0] -= amount
+    return wait
+
+
+class FileBucketBackend:
+    """
+    Keeps the buckets in a JSON file guarded by an exclusive flock,
+    shared by every worker process of the same host.
+    """
+
+    def reserve(self, needs: dict) -> float:
+        with open(settings.LLM_RATE_LIMIT_FILE, 'a+') as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                file.seek(0)
+                content = file.read()
+                state = json.loads(content) if content else {}
+                wait = take(state, needs, time.time())
+                file.seek(0)
+                file.truncate()
+                json.dump(state, file)
+                file.flush()
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+        return wait
+
+
+class DatabaseBucketBackend:
+    """
+    Keeps the buckets in the LLMRateBucket table, rows are locked for the duration of the
+    reservation so every process sharing the database sees the same budget.
+    """
+
+    def reserve(self, needs: dict) -> float:
+        now = time.time()
+        with transaction.atomic():
+            LLMRateBucket.objects.bulk_create(
+                [LLMRateBucket(name=name, level=capacity, updated_at=now) for name, (_, capacity, _) in needs.items()],
+                ignore_conflicts=True,
+            )
+            buckets = {
+                bucket.name: bucket
+                for bucket in LLMRateBucket.objects.select_for_update().filter(name__in=needs).order_by('name')
+            }
+            state = {name: [bucket.level, bucket.updated_at] for name, bucket in buckets.items()}
+            wait = take(state, needs, now)
+            for name, bucket in buckets.items():
+                bucket.level, bucket.updated_at = state[name]
+            LLMRateBucket.objects.bulk_update(buckets.values(), ['level', 'updated_at'])
+        return wait
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter of the requests and tokens per minute sent to the LLM provider.
+    Callers queue until both budgets allow their request, for at most LLM_RATE_LIMIT_MAX_WAIT seconds.
+    """
+
+    BACKENDS = {
+        'file': FileBucketBackend,
+        'database': DatabaseBucketBackend,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.LLM_RATE_LIMIT_BACKEND in self.BACKENDS
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def acquire(self, request: dict, max_wait: float = None):
+        """
+        Waits until the request fits both budgets, for at most max_wait seconds when it is
+        shorter than LLM_RATE_LIMIT_MAX_WAIT.
+        """
+        if not self.enabled:
+            return
+
+        backend = self.BACKENDS[settings.LLM_RATE_LIMIT_BACKEND]()
+        rpm, tpm = settings.LLM_RATE_LIMIT_RPM, settings.LLM_RATE_LIMIT_TPM
+        needs = {
+            'requests': (1, rpm, rpm / 60),
+            # a single request larger than the whole budget would otherwise wait forever
+            'tokens': (min(estimate_tokens(request), tpm), tpm, tpm / 60),
+        }
+
+        max_wait = settings.LLM_RATE_LIMIT_MAX_WAIT if max_wait is None else min(max_wait, settings.LLM_RATE_LIMIT_MAX_WAIT)
+        started = time.monotonic()
+        self._track(1)
+        try:
+            while True:
+                wait = backend.reserve(needs)
+                if wait == 0:
+                    break
+                if time.monotonic() + wait - started > max_wait:
+                    metrics.increment('llm_rate_limit_rejections_total')
+                    raise AIServiceErrorException(ErrorMsg.AI_SERVICE_ERROR)
+                # jitter keeps the queued workers from waking up all at once
+                time.sleep(wait + random.uniform(0, 0.05))
+        finally:
+            self._track(-1)
+
+        metrics.observe('llm_rate_limit_wait_seconds', time.monotonic() - started)
+
+    def _track(self, delta: int):
+        with self._lock:
+            self._waiting += delta
+            metrics.increment('llm_rate_limit_queue_depth', delta)
+
+
+def estimate_tokens(request: dict) -> int:
+    # roughly 4 characters per token for the prompt, plus the completion budget
+    prompt = sum(len(message['content']) for message in request.get('messages', []))
+    return prompt // 4 + request.get('max_tokens', 0)
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,90 @@
+import time
+import threading
+from typing import Any, Callable, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from validator.llm.metrics import metrics
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key: the first caller runs the function and every caller
+    arriving while it runs waits for and shares its outcome. With LLM_SINGLE_FLIGHT_BACKEND set to
+    "database", the first caller also takes a Postgres advisory lock on the key, so callers of other
+    workers wait for it and look the shared value up instead of calling again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key: str, fn: Callable[[], Any], lookup: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Returns the value and whether it was shared by another caller rather than computed.
+        lookup() returns the value stored by another worker's call, or None.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            metrics.increment('llm_coalesced_calls_total', scope='process')
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            if settings.LLM_SINGLE_FLIGHT_BACKEND == 'database':
+                flight.value, shared = self._do_locked(key, fn, lookup)
+            else:
+                flight.value, shared = fn(), False
+            return flight.value, shared
+        except Exception as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _do_locked(self, key: str, fn: Callable[[], Any], lookup: Callable[[], Any]) -> Tuple[Any, bool]:
+        # advisory locks take a bigint, the first 16 hex digits of the sha256 key fit in one
+        lock_id = int.from_bytes(bytes.fromhex(key[:16]), 'big', signed=True)
+        deadline = time.monotonic() + settings.LLM_DEADLINE
+        waited = False
+
+        with connection.cursor() as cursor:
+            while True:
+                cursor.execute("SELECT pg_try_advisory_lock(%s)", [lock_id])
+                acquired = cursor.fetchone()[0]
+                # a stuck holder must not block us forever, we then call on our own
+                if acquired or time.monotonic() >= deadline:
+                    break
+                waited = True
+                time.sleep(settings.LLM_SINGLE_FLIGHT_POLL_INTERVAL)
+
+            try:
+                if waited:
+                    value = lookup()
+                    if value is not None:
+                        metrics.increment('llm_coalesced_calls_total', scope='database')
+                        return value, True
+                return fn(), False
+            finally:
+                if acquired:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", [lock_id])
+
+
+llm_flights = SingleFlight()
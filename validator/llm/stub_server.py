@@ -0,0 +1,229 @@
+import re
+import json
+import math
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLLMServer:
+    """
+    Local server speaking the Groq chat-completions wire format, used to exercise the
+    LLM client and benchmark the validation path without spending Groq quota.
+    Counts the TCP connections, requests and peak concurrent requests it serves.
+    Latency follows a distribution around a mean ("fixed", "uniform", "exponential" or "lognormal").
+    Faults can be injected: a random error rate and a number of upcoming requests that fail
+    with a given status. Answers can be scripted as (pattern, answer) pairs matched against
+    the last message, the first match wins and `answer` is used otherwise.
+    Answers are generated one whitespace-separated token every `token_latency` seconds after the
+    first one, and streamed as server-sent events when the request asks for a stream.
+    """
+
+    DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        answer: str = 'true',
+        latency: float = 0,
+        distribution: str = 'fixed',
+        error_rate: float = 0,
+        error_status: int = 503,
+        script: list = None,
+        token_latency: float = 0,
+    ):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f'Unknown latency distribution {distribution}')
+        self.answer = answer
+        self.latency = latency
+        self.distribution = distribution
+        self.script = [(re.compile(pattern, re.IGNORECASE), answer) for pattern, answer in script or []]
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.token_latency = token_latency
+        self.connections = 0
+        self.tokens_sent = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        # shutdown() waits for serve_forever() and would block on a server never started
+        if self._thread is not None:
+            self._server.shutdown()
+        self._server.server_close()
+
+    def fail_next(self, count: int, status: int = None):
+        """
+        Answers the next `count` requests with an error status.
+        """
+        with self._lock:
+            self._failures = count
+            if status is not None:
+                self.error_status = status
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.requests = 0
+            self.tokens_sent = 0
+            self.peak_in_flight = self.in_flight
+
+    def sample_latency(self) -> float:
+        if self.latency <= 0:
+            return 0
+        match self.distribution:
+            case 'uniform':
+                return random.uniform(0, 2 * self.latency)
+            case 'exponential':
+                return random.expovariate(1 / self.latency)
+            case 'lognormal':
+                # sigma of 0.5 gives a realistic long tail, mu keeps the mean at `latency`
+                sigma = 0.5
+                return random.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+        return self.latency
+
+    def answer_for(self, body: dict) -> str:
+        messages = body.get('messages') or [{}]
+        prompt = messages[-1].get('content', '')
+        for pattern, answer in self.script:
+            if pattern.search(prompt):
+                return answer
+        return self.answer
+
+    def tokens(self, answer: str) -> list:
+        return re.findall(r'\s*\S+', answer) or ['']
+
+    def completion(self, body: dict) -> dict:
+        tokens = self.tokens(self.answer_for(body))
+        return {
+            'id': f'chatcmpl-stub-{self.requests}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', ''),
+            'system_fingerprint': 'stub',
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': self.answer_for(body)},
+                'logprobs': None,
+                'finish_reason': 'stop',
+            }],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': len(tokens), 'total_tokens': len(tokens)},
+        }
+
+    def chunk(self, body: dict, content: str, completion_tokens: int = None) -> dict:
+        last = completion_tokens is not None
+        return {
+            'id': f'chatcmpl-stub-{self.requests}',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': body.get('model', ''),
+            'system_fingerprint': 'stub',
+            'choices': [{
+                'index': 0,
+                'delta': {'role': 'assistant', 'content': content},
+                'logprobs': None,
+                'finish_reason': 'stop' if last else None,
+            }],
+            'x_groq': {'usage': {'prompt_tokens': 0, 'completion_tokens': completion_tokens, 'total_tokens': completion_tokens}} if last else None,
+        }
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive needs HTTP/1.1 and an explicit Content-Length
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not self.path.endswith('/chat/completions'):
+                    self._send(404, {'error': {'message': 'not found'}})
+                    return
+                with stub._lock:
+                    stub.requests += 1
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    fail = stub._failures > 0 or random.random() < stub.error_rate
+                    stub._failures = max(0, stub._failures - 1)
+                try:
+                    time.sleep(stub.sample_latency())
+                    if fail:
+                        self._send(stub.error_status, {'error': {'message': 'injected fault', 'type': 'server_error'}})
+                    elif body.get('stream'):
+                        self._stream(body)
+                    else:
+                        tokens = stub.tokens(stub.answer_for(body))
+                        time.sleep(stub.token_latency * (len(tokens) - 1))
+                        with stub._lock:
+                            stub.tokens_sent += len(tokens)
+                        self._send(200, stub.completion(body))
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def _send(self, status: int, payload: dict):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client gave up waiting, e.g. an injected latency above its timeout
+                    self.close_connection = True
+
+            def _stream(self, body: dict):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Transfer-Encoding', 'chunked')
+                try:
+                    self.end_headers()
+                    tokens = stub.tokens(stub.answer_for(body))
+                    for index, token in enumerate(tokens):
+                        if index:
+                            time.sleep(stub.token_latency)
+                        with stub._lock:
+                            stub.tokens_sent += 1
+                        last = index == len(tokens) - 1
+                        self._write_event(json.dumps(stub.chunk(body, token, completion_tokens=len(tokens) if last else None)))
+                    self._write_event('[DONE]')
+                    self.wfile.write(b'0\r\n\r\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client stopped reading, no more tokens are generated
+                    self.close_connection = True
+
+            def _write_event(self, data: str):
+                event = f'data: {data}\n\n'.encode()
+                self.wfile.write(f'{len(event):x}\r\n'.encode() + event + b'\r\n')
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
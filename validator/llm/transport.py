@@ -0,0 +1,264 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Tuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import groq
+import httpx
+import requests
+from django.conf import settings
+
+from validator.constants import ErrorMsg
+from validator.exceptions import AIServiceErrorException
+from validator.llm.client import llm_clients
+from validator.llm.metrics import metrics
+from validator.llm.rate_limit import rate_limiter
+
+# errors worth another attempt, anything else is either a bad request or a bug
+RETRYABLE_ERRORS = (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)
+
+
+class CircuitBreaker:
+    """
+    Opens after LLM_BREAKER_FAILURES consecutive failures and rejects calls for
+    LLM_BREAKER_RESET_TIMEOUT seconds, after which a single trial call is let through.
+    The transport keeps one per model, a failing model does not cut the others off.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, model: str = ''):
+        self.model = model
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or (self._opened_at is None and self._failures >= settings.LLM_BREAKER_FAILURES):
+                metrics.increment('llm_breaker_opened_total', model=self.model)
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+    def release(self):
+        """
+        Ends a call that failed before the upstream answered, letting another trial through.
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at < settings.LLM_BREAKER_RESET_TIMEOUT:
+            return self.OPEN
+        return self.HALF_OPEN
+
+
+class LatencyTracker:
+    """
+    Keeps the latencies of the most recent successful calls to estimate the p95.
+    """
+
+    def __init__(self, size: int = 200):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=size)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> float | None:
+        with self._lock:
+            if len(self._samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+                return None
+            samples = sorted(self._samples)
+        # hedging calls that are fast anyway only doubles the load on the upstream
+        return max(settings.LLM_HEDGE_MIN_DELAY, samples[min(len(samples) - 1, int(len(samples) * 0.95))])
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+class LLMTransport:
+    """
+    Sends chat completion requests with bounded, jittered retries inside an overall deadline,
+    hedges a duplicate request once the p95 latency is exceeded and fails fast while the
+    circuit breaker is open. Every request, hedges included, queues on the rate limiter first.
+    Completions can also be streamed and cut short once their answer is known.
+    Every failure is surfaced as AIServiceErrorException.
+    Per-attempt timeouts are enforced by the pooled client (LLM_TIMEOUT) and shortened to what
+    is left of the deadline, which also bounds the rate limiter queue and the hedge wait.
+    """
+
+    def __init__(self):
+        self._breakers = {}
+        self.latency = LatencyTracker()
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def create(self, request: dict):
+        return self._call(partial(self._attempt, request), request['model'])
+
+    def stream(self, request: dict, until: Callable[[str], bool]) -> Tuple[str, Any]:
+        """
+        Streams the completion and stops reading once until(text received so far) is true.
+        Returns the text received and the token usage, which the upstream only sends with the last chunk.
+        Streams are not hedged, the first token arrives long before the p95 of a whole completion.
+        """
+        return self._call(partial(self._send_stream, request, until), request['model'])
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            if model not in self._breakers:
+                self._breakers[model] = CircuitBreaker(model)
+            return self._breakers[model]
+
+    def _call(self, attempt: Callable[[float], Any], model: str):
+        deadline = time.monotonic() + settings.LLM_DEADLINE
+        breaker = self.breaker(model)
+
+        for attempt_number in range(settings.LLM_MAX_RETRIES + 1):
+            if not breaker.allow():
+                metrics.increment('llm_breaker_rejections_total', model=model)
+                raise AIServiceErrorException(ErrorMsg.AI_SERVICE_ERROR)
+
+            try:
+                result = attempt(deadline)
+            except RETRYABLE_ERRORS:
+                breaker.record_failure()
+                backoff = random.uniform(0, min(settings.LLM_RETRY_BACKOFF_MAX, settings.LLM_RETRY_BACKOFF * 2 ** attempt_number))
+                if attempt_number == settings.LLM_MAX_RETRIES or time.monotonic() + backoff >= deadline:
+                    raise AIServiceErrorException(ErrorMsg.AI_SERVICE_ERROR)
+                metrics.increment('llm_retries_total')
+                time.sleep(backoff)
+                continue
+            except (groq.APIError, requests.exceptions.RequestException):
+                # the request itself was rejected, the upstream is healthy
+                breaker.record_success()
+                raise AIServiceErrorException(ErrorMsg.AI_SERVICE_ERROR)
+            except Exception:
+                # e.g. the rate limiter gave up, the upstream was never asked
+                breaker.release()
+                raise
+
+            breaker.record_success()
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+        self.latency.reset()
+
+    def _attempt(self, request: dict, deadline: float):
+        hedge_after = self.latency.p95() if settings.LLM_HEDGE_ENABLED else None
+        if hedge_after is None:
+            return self._send(request, deadline)
+
+        executor = self._get_executor()
+        primary = executor.submit(self._send, request, deadline)
+        done, _ = wait([primary], timeout=min(hedge_after, self._remaining(deadline)))
+        if done:
+            return primary.result()
+
+        metrics.increment('llm_hedged_requests_total')
+        hedge = executor.submit(self._send, request, deadline)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, timeout=self._remaining(deadline), return_when=FIRST_COMPLETED)
+            succeeded = [future for future in done if future.exception() is None]
+            if succeeded or not pending:
+                return (succeeded or list(done))[0].result()
+
+    def _send(self, request: dict, deadline: float):
+        rate_limiter.acquire(request, max_wait=self._remaining(deadline))
+        started = time.monotonic()
+        completion = llm_clients.get().chat.completions.create(**request, **self._timeout(deadline))
+        self.latency.record(time.monotonic() - started)
+        return completion
+
+    def _send_stream(self, request: dict, until: Callable[[str], bool], deadline: float) -> Tuple[str, Any]:
+        rate_limiter.acquire(request, max_wait=self._remaining(deadline))
+        stream = llm_clients.get().chat.completions.create(**request, **self._timeout(deadline), stream=True)
+        text, usage = '', None
+        try:
+            for chunk in stream:
+                # the timeout bounds each read, not the whole stream
+                self._remaining(deadline)
+                if chunk.choices:
+                    text += chunk.choices[0].delta.content or ''
+                x_groq = getattr(chunk, 'x_groq', None)
+                if x_groq is not None:
+                    usage = x_groq.usage
+                if until(text):
+                    metrics.increment('llm_stream_early_exits_total')
+                    break
+        except httpx.TransportError as error:
+            # the body is read outside of the client, which only wraps errors of the request itself
+            raise groq.APIConnectionError(request=error.request) from error
+        finally:
+            # closing the response drops the connection, the upstream stops generating tokens
+            stream.close()
+        return text, usage
+
+    def _remaining(self, deadline: float) -> float:
+        """
+        Returns the seconds left before the deadline, failing fast once it has passed.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            metrics.increment('llm_deadline_exceeded_total')
+            raise AIServiceErrorException(ErrorMsg.AI_SERVICE_ERROR)
+        return remaining
+
+    def _timeout(self, deadline: float) -> dict:
+        # the pooled client already enforces LLM_TIMEOUT, only a shorter budget is passed along
+        remaining = self._remaining(deadline)
+        return {'timeout': remaining} if remaining < settings.LLM_TIMEOUT else {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=settings.LLM_MAX_CONNECTIONS, thread_name_prefix='llm-hedge')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+
+llm_transport = LLMTransport()
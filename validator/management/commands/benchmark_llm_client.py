@@ -0,0 +1,50 @@
+import time
+
+from groq import Groq
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from validator.llm.client import llm_clients
+from validator.llm.stub_server import StubLLMServer
+
+
+class Command(BaseCommand):
+    help = 'Compare a new Groq client per LLM call with the pooled client against a local stub server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--validations', type=int, default=50, help='Number of simulated validate calls')
+        parser.add_argument('--calls', type=int, default=4, help='LLM calls per validate call')
+
+    def handle(self, *args, **options):
+        validations, calls = options['validations'], options['calls']
+        stub = StubLLMServer()
+        base_url = stub.start()
+
+        try:
+            with override_settings(GROQ_BASE_URL=base_url, GROQ_API_KEY='stub'):
+                modes = (
+                    ('per-call client', lambda: Groq(api_key='stub', base_url=base_url), True),
+                    ('pooled client', llm_clients.get, False),
+                )
+                for name, get_client, close_client in modes:
+                    llm_clients.reset()
+                    stub.reset_counters()
+                    started = time.perf_counter()
+
+                    for _ in range(validations * calls):
+                        client = get_client()
+                        client.chat.completions.create(
+                            messages=[{'role': 'user', 'content': 'benchmark'}],
+                            model='llama-3.3-70b-specdec',
+                        )
+                        if close_client:
+                            client.close()
+
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f'{name}: {elapsed * 1000 / validations:.2f} ms per validate, '
+                        f'{stub.connections / validations:.2f} connections per validate'
+                    )
+        finally:
+            llm_clients.reset()
+            stub.stop()
@@ -0,0 +1,127 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from authentication.models import CustomUser
+from validator.llm.cache import verdict_cache
+from validator.llm.client import llm_clients
+from validator.llm.stub_server import StubLLMServer
+from validator.llm.transport import llm_transport
+from validator.models.causes import Causes
+from validator.models.question import Question
+from validator.models.validation_job import ValidationJob
+
+
+def percentile(samples: list, percent: float) -> float:
+    # nearest-rank percentile of sorted samples
+    if not samples:
+        return 0
+    return samples[min(len(samples) - 1, max(0, round(percent / 100 * len(samples)) - 1))]
+
+
+class Command(BaseCommand):
+    help = 'Drive ValidateView with concurrent questions against a fake LLM server and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=20, help='Number of questions validated')
+        parser.add_argument('--causes', type=int, default=3, help='Causes in the validated row of each question')
+        parser.add_argument('--concurrency', type=int, default=5, help='Validations in flight at once')
+        parser.add_argument('--base-url', help='Use an already running fake LLM server instead of starting one')
+        parser.add_argument('--latency', type=float, default=0.2, help='Mean latency of the fake LLM in seconds')
+        parser.add_argument('--distribution', default='lognormal', choices=StubLLMServer.DISTRIBUTIONS)
+        parser.add_argument('--token-latency', type=float, default=0.01, help='Seconds between two tokens generated by the fake LLM')
+        parser.add_argument('--error-rate', type=float, default=0, help='Share of fake LLM requests that fail')
+        parser.add_argument('--answer', default='true', help='Answer of the fake LLM')
+        parser.add_argument('--cache', action='store_true', help='Keep the verdict cache enabled')
+        parser.add_argument('--streaming', action='store_true', help='Stream completions and stop at the answer, compare with a run without')
+
+    def handle(self, *args, **options):
+        server = None
+        base_url = options['base_url']
+        if base_url is None:
+            server = StubLLMServer(
+                answer=options['answer'],
+                latency=options['latency'],
+                distribution=options['distribution'],
+                token_latency=options['token_latency'],
+                error_rate=options['error_rate'],
+            )
+            base_url = server.start()
+
+        user = CustomUser.objects.create(username=f'benchmark-{uuid.uuid4().hex[:8]}')
+        question_ids = self._create_questions(user, options['questions'], options['causes'])
+
+        try:
+            with override_settings(
+                GROQ_BASE_URL=base_url,
+                GROQ_API_KEY='benchmark',
+                VALIDATION_JOB_BACKEND='inline',
+                LLM_CACHE_ENABLED=options['cache'],
+                LLM_STREAMING=options['streaming'],
+                ALLOWED_HOSTS=['*'],
+            ):
+                llm_clients.reset()
+                llm_transport.reset()
+                verdict_cache.clear()
+
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+                    results = list(executor.map(lambda pk: self._validate(user, pk), question_ids))
+                elapsed = time.perf_counter() - started
+
+            self._report(results, elapsed, options['concurrency'], server)
+        finally:
+            llm_clients.reset()
+            Causes.objects.filter(problem_id__in=question_ids).delete()
+            ValidationJob.objects.filter(problem_id__in=question_ids).delete()
+            Question.objects.filter(pk__in=question_ids).delete()
+            user.delete()
+            if server is not None:
+                server.stop()
+
+    def _create_questions(self, user: CustomUser, count: int, causes: int) -> list:
+        question_ids = []
+        for index in range(count):
+            question = Question.objects.create(user=user, title='Benchmark', question=f'Benchmark problem {index}')
+            Causes.objects.bulk_create([
+                Causes(problem=question, row=1, column=column, cause=f'Benchmark cause {index}-{column}')
+                for column in range(causes)
+            ])
+            question_ids.append(question.pk)
+        return question_ids
+
+    def _validate(self, user: CustomUser, question_id: uuid) -> tuple:
+        client = APIClient()
+        client.force_authenticate(user=user)
+        started = time.perf_counter()
+        try:
+            response = client.patch(reverse('validator:validate_causes', kwargs={'question_id': question_id}))
+            succeeded = response.status_code == 202 and response.data['status'] == ValidationJob.StatusChoices.SUCCEEDED
+        finally:
+            connections.close_all()
+        return time.perf_counter() - started, succeeded
+
+    def _report(self, results: list, elapsed: float, concurrency: int, server: StubLLMServer):
+        latencies = sorted(latency for latency, _ in results)
+        failures = sum(1 for _, succeeded in results if not succeeded)
+
+        self.stdout.write(f'validations: {len(results)} in {elapsed:.2f} s ({len(results) / elapsed:.2f}/s), {failures} failed')
+        self.stdout.write(
+            'latency: '
+            + ', '.join(f'p{percent} {percentile(latencies, percent) * 1000:.0f} ms' for percent in (50, 95, 99))
+        )
+        # share of the time the concurrent validation slots were busy
+        self.stdout.write(f'worker saturation: {sum(latencies) / (elapsed * concurrency):.0%}')
+        if server is not None:
+            self.stdout.write(
+                f'LLM calls per validation: {server.requests / len(results):.2f}, '
+                f'completion tokens per LLM call: {server.tokens_sent / max(1, server.requests):.2f}, '
+                f'peak concurrent LLM calls: {server.peak_in_flight}, '
+                f'connections: {server.connections}'
+            )
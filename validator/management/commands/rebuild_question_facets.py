@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from validator import facets
+from validator.models.question import Question
+from validator.models.question_facet import QuestionFacet, QuestionFacetVersion
+
+
+class Command(BaseCommand):
+    help = 'Recount the facets of the search bar dropdown, e.g. after questions were changed by bulk updates that send no signal'
+
+    def handle(self, *args, **options):
+        facets.rebuild(Question, QuestionFacet, QuestionFacetVersion)
+        self.stdout.write(self.style.SUCCESS(f'Counted {QuestionFacet.objects.count()} facet value(s).'))
@@ -0,0 +1,115 @@
+import os
+import json
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from django.conf import settings
+from django.db import connections
+from django.core.management.base import BaseCommand, CommandError
+
+from validator.models.question import Question
+from validator.services.causes import CausesService
+
+
+class Command(BaseCommand):
+    help = 'Re-run validation over every cause of a filtered set of questions, e.g. after a model or prompt change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=Question.ModeChoices.values, help='Only questions of this mode')
+        parser.add_argument('--since', type=datetime.fromisoformat, help='Only questions created at or after this ISO date')
+        parser.add_argument('--until', type=datetime.fromisoformat, help='Only questions created before this ISO date')
+        parser.add_argument('--user', help='Only questions of this username')
+        parser.add_argument('--workers', type=int, default=4, help='Questions validated at once')
+        parser.add_argument('--checkpoint', default='revalidate_causes.checkpoint.json', help='File recording the questions already done')
+        parser.add_argument('--checkpoint-every', type=int, default=20, help='Questions done between two checkpoint writes')
+        parser.add_argument('--restart', action='store_true', help='Ignore and replace an existing checkpoint')
+        parser.add_argument('--no-cache', action='store_true', help='Ask the LLM again instead of reusing cached answers')
+
+    def handle(self, *args, **options):
+        filters = {name: str(options[name]) if options[name] is not None else None for name in ('mode', 'since', 'until', 'user')}
+        done = self._load_checkpoint(options['checkpoint'], filters, options['restart'])
+
+        question_ids = [
+            question_id for question_id in self._questions(options).values_list('id', flat=True)
+            if str(question_id) not in done
+        ]
+        self.stdout.write(f'{len(question_ids)} question(s) to revalidate, {len(done)} already done.')
+        if settings.LLM_RATE_LIMIT_BACKEND not in ('file', 'database'):
+            self.stdout.write(self.style.WARNING('The LLM rate limiter is disabled, only --workers bounds the request rate.'))
+
+        failed = 0
+        try:
+            for question_id, error in self._revalidate(question_ids, options['workers'], use_cache=not options['no_cache']):
+                if error is None:
+                    done.add(str(question_id))
+                    if len(done) % options['checkpoint_every'] == 0:
+                        self._save_checkpoint(options['checkpoint'], filters, done)
+                else:
+                    failed += 1
+                    self.stderr.write(f'Question {question_id} failed: {error}')
+        except KeyboardInterrupt:
+            self._save_checkpoint(options['checkpoint'], filters, done)
+            raise CommandError(f'Interrupted, rerun the command to resume from {options["checkpoint"]}.')
+
+        self._save_checkpoint(options['checkpoint'], filters, done)
+        # failed questions are left out of the checkpoint, a rerun retries them
+        self.stdout.write(self.style.SUCCESS(f'Revalidated {len(question_ids) - failed} question(s), {failed} failed.'))
+
+    def _questions(self, options: dict):
+        questions = Question.objects.order_by('created_at', 'id')
+        if options['mode']:
+            questions = questions.filter(mode=options['mode'])
+        if options['since']:
+            questions = questions.filter(created_at__gte=options['since'])
+        if options['until']:
+            questions = questions.filter(created_at__lt=options['until'])
+        if options['user']:
+            questions = questions.filter(user__username=options['user'])
+        return questions
+
+    def _revalidate(self, question_ids: list, workers: int, use_cache: bool = True):
+        """
+        Yields (question id, error or None) as questions finish, with at most `workers` in flight.
+        """
+        remaining = iter(question_ids)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {}
+            for question_id in remaining:
+                futures[executor.submit(self._revalidate_one, question_id, use_cache)] = question_id
+                if len(futures) >= workers:
+                    break
+
+            try:
+                while futures:
+                    finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        yield futures.pop(future), future.result()
+                        question_id = next(remaining, None)
+                        if question_id is not None:
+                            futures[executor.submit(self._revalidate_one, question_id, use_cache)] = question_id
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _revalidate_one(self, question_id, use_cache: bool = True) -> Exception | None:
+        try:
+            CausesService.validate(self=CausesService, question_id=question_id, force=True, use_cache=use_cache)
+        except Exception as error:
+            return error
+        finally:
+            connections.close_all()
+        return None
+
+    def _load_checkpoint(self, path: str, filters: dict, restart: bool) -> set:
+        if restart or not os.path.exists(path):
+            return set()
+        with open(path) as file:
+            checkpoint = json.load(file)
+        if checkpoint['filters'] != filters:
+            raise CommandError(f'{path} was written with other filters {checkpoint["filters"]}, pass --restart to discard it.')
+        return set(checkpoint['done'])
+
+    def _save_checkpoint(self, path: str, filters: dict, done: set):
+        with open(f'{path}.tmp', 'w') as file:
+            json.dump({'filters': filters, 'done': sorted(done)}, file)
+        os.replace(f'{path}.tmp', path)
@@ -0,0 +1,50 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from validator.llm.stub_server import StubLLMServer
+
+
+class Command(BaseCommand):
+    help = 'Run a local stand-in for the Groq chat-completions API, point GROQ_BASE_URL at it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--answer', default='true', help='Answer of prompts not matched by the script')
+        parser.add_argument('--latency', type=float, default=0.3, help='Mean latency in seconds')
+        parser.add_argument('--distribution', default='lognormal', choices=StubLLMServer.DISTRIBUTIONS)
+        parser.add_argument('--token-latency', type=float, default=0, help='Seconds between two generated tokens')
+        parser.add_argument('--error-rate', type=float, default=0, help='Share of requests answered with an error')
+        parser.add_argument('--error-status', type=int, default=503)
+        parser.add_argument('--script', help='JSON file with a list of [pattern, answer] pairs')
+
+    def handle(self, *args, **options):
+        script = None
+        if options['script']:
+            with open(options['script']) as file:
+                script = json.load(file)
+
+        server = StubLLMServer(
+            host=options['host'],
+            port=options['port'],
+            answer=options['answer'],
+            latency=options['latency'],
+            distribution=options['distribution'],
+            token_latency=options['token_latency'],
+            error_rate=options['error_rate'],
+            error_status=options['error_status'],
+            script=script,
+        )
+        base_url = server.start()
+        self.stdout.write(f'Fake LLM server listening on {base_url}')
+
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            self.stdout.write(f'Served {server.requests} requests on {server.connections} connections')
@@ -0,0 +1,48 @@
+import time
+import threading
+
+from django.conf import settings
+from django.db import connections
+from django.core.management.base import BaseCommand
+
+from validator.services.validation_job import ValidationJobService
+
+
+class Command(BaseCommand):
+    help = 'Drain pending validation jobs, used with VALIDATION_JOB_BACKEND=worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.VALIDATION_JOB_WORKERS, help='Number of worker threads')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is pending')
+
+    def handle(self, *args, **options):
+        service = ValidationJobService()
+        threads = [
+            threading.Thread(target=self._work, args=(service, options['once']), daemon=True)
+            for _ in range(options['workers'])
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.stdout.write(f'Validation worker started with {len(threads)} thread(s).')
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.stdout.write('Validation worker stopped.')
+            return
+
+        self.stdout.write(self.style.SUCCESS('No pending validation jobs left.'))
+
+    def _work(self, service: ValidationJobService, once: bool):
+        try:
+            while True:
+                job_id = service.claim()
+                if job_id is None:
+                    if once:
+                        return
+                    time.sleep(settings.VALIDATION_JOB_POLL_INTERVAL)
+                    continue
+                service.run(job_id)
+        finally:
+            connections.close_all()
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validator', '0008_validationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMRateBucket',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('level', models.FloatField()),
+                ('updated_at', models.FloatField()),
+            ],
+        ),
+    ]
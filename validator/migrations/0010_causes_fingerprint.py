@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-18 16:43
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """
+    Causes that already have a verdict get the fingerprint of their current texts,
+    so the first validation after the upgrade does not re-evaluate them.
+    """
+    Causes = apps.get_model('validator', 'Causes')
+    Question = apps.get_model('validator', 'Question')
+
+    question_ids = Causes.objects.exclude(status=False, feedback='').values_list('problem_id', flat=True).distinct()
+    for problem in Question.objects.filter(pk__in=question_ids).iterator():
+        causes = list(Causes.objects.filter(problem_id=problem.pk).order_by('row', 'column'))
+        positions = {}
+        for cause in causes:
+            positions.setdefault((cause.row, cause.column), cause)
+        stamped = []
+        for cause in causes:
+            if not cause.status and not cause.feedback:
+                continue
+            prev_cause = positions.get((cause.row - 1, cause.column)) if cause.row > 1 else None
+            parent = prev_cause.cause if prev_cause is not None else problem.question
+            cause.fingerprint = hashlib.sha256(f"{parent}\x00{cause.cause}".encode()).hexdigest()
+            stamped.append(cause)
+        Causes.objects.bulk_update(stamped, ['fingerprint'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validator', '0009_llmratebucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='causes',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-18 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validator', '0010_causes_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['created_at', 'id'], name='validator_q_created_9e965e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='validator_q_user_id_175e56_idx'),
+        ),
+    ]
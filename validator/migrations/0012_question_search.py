@@ -0,0 +1,46 @@
+# Generated by Django 4.2 on 2026-10-18 17:25
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+import django.db.models.functions.text
+
+from utils.migrations import AddTrigramIndex
+from validator.search import question_search_vector
+
+
+def backfill_search_vectors(apps, schema_editor):
+    Question = apps.get_model('validator', 'Question')
+    Question.objects.update(search_vector=question_search_vector(Question))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validator', '0011_question_created_at_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='validator_q_search__e9250a_gin'),
+        ),
+        AddTrigramIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('title'), name='gin_trgm_ops'), name='question_title_trgm_idx'),
+        ),
+        AddTrigramIndex(
+            model_name='question',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('question'), name='gin_trgm_ops'), name='question_question_trgm_idx'),
+        ),
+        AddTrigramIndex(
+            model_name='tag',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'), name='tag_name_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+from validator.facets import VERSION_SEQUENCE, rebuild
+
+
+def count_facets(apps, schema_editor):
+    rebuild(apps.get_model('validator', 'Question'),
+            apps.get_model('validator', 'QuestionFacet'),
+            apps.get_model('validator', 'QuestionFacetVersion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validator', '0012_question_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('judul', 'judul'), ('topik', 'topik'), ('pengguna', 'pengguna')], max_length=10)),
+                ('value', models.CharField(max_length=150)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionFacetVersion',
+            fields=[
+                ('id', models.IntegerField(default=1, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='questionfacet',
+            constraint=models.UniqueConstraint(fields=('kind', 'value'), name='question_facet_kind_value_unique'),
+        ),
+        migrations.RunSQL(f'CREATE SEQUENCE {VERSION_SEQUENCE}', f'DROP SEQUENCE {VERSION_SEQUENCE}'),
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
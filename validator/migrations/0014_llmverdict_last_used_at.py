@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 18:28
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validator', '0013_questionfacet'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmverdict',
+            name='last_used_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -1 +1,5 @@
-from validator.models.question import Question
\ No newline at end of file
+from validator.models.question import Question
+from validator.models.llm_verdict import LLMVerdict
+from validator.models.validation_job import ValidationJob
+from validator.models.llm_rate_bucket import LLMRateBucket
+from validator.models.question_facet import QuestionFacet, QuestionFacetVersion
@@ -18,4 +18,6 @@ class Causes(models.Model):
     cause = models.CharField(max_length = 120)
     status = models.BooleanField(default=False)
     root_status = models.BooleanField(default=False)
-    feedback = models.CharField(max_length = 50, default='')
\ No newline at end of file
+    feedback = models.CharField(max_length = 50, default='')
+    # fingerprint of the cause and parent texts the current verdict was given for
+    fingerprint = models.CharField(max_length = 64, default='', blank=True)
\ No newline at end of file
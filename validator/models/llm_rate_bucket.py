@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class LLMRateBucket(models.Model):
+    class Meta:
+        app_label = 'validator'
+
+    name = models.CharField(max_length=50, primary_key=True)
+    level = models.FloatField()
+    updated_at = models.FloatField()
@@ -0,0 +1,15 @@
+from django.db import models
+from django.utils import timezone
+
+
+class LLMVerdict(models.Model):
+    class Meta:
+        app_label = 'validator'
+
+    key = models.CharField(max_length=64, primary_key=True)
+    model = models.CharField(max_length=100)
+    answer = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # refreshed on cache hits, at most once per VerdictCache.TOUCH_INTERVAL
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
@@ -2,12 +2,24 @@ from django.db import models
 import uuid
 
 from django.core.exceptions import ValidationError
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Upper
 from authentication.models import CustomUser
 from .tag import Tag
 
 class Question(models.Model):
     class Meta:
         app_label = 'validator'
+        # keyset pagination walks (created_at, id) backwards, over all questions or those of a user
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['user', 'created_at', 'id']),
+            GinIndex(fields=['search_vector']),
+            # icontains compiles to UPPER(column) LIKE UPPER(pattern), which pg_trgm indexes can serve
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='question_title_trgm_idx'),
+            GinIndex(OpClass(Upper('question'), name='gin_trgm_ops'), name='question_question_trgm_idx'),
+        ]
         
     class ModeChoices(models.TextChoices):
         PRIBADI = "PRIBADI", "pribadi"
@@ -19,4 +31,6 @@ class Question(models.Model):
     question = models.CharField()
     mode = models.CharField(max_length = 20, choices=ModeChoices.choices, default=ModeChoices.PRIBADI)
     created_at = models.DateTimeField(auto_now_add=True)
-    tags = models.ManyToManyField(Tag, blank=False)
\ No newline at end of file
+    tags = models.ManyToManyField(Tag, blank=False)
+    # title (A), question (B) and tag names (C), kept up to date by validator.signals
+    search_vector = SearchVectorField(null=True, editable=False)
\ No newline at end of file
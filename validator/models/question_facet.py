@@ -0,0 +1,33 @@
+from django.db import models
+
+
+class QuestionFacet(models.Model):
+    """
+    A distinct title, tag name or username of the questions, with the number of
+    questions (or question tags) holding it. Kept up to date by validator.signals.
+    """
+    class Meta:
+        app_label = 'validator'
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value'], name='question_facet_kind_value_unique'),
+        ]
+
+    class KindChoices(models.TextChoices):
+        JUDUL = "judul", "judul"
+        TOPIK = "topik", "topik"
+        PENGGUNA = "pengguna", "pengguna"
+
+    kind = models.CharField(max_length=10, choices=KindChoices.choices)
+    value = models.CharField(max_length=150)
+    count = models.IntegerField(default=0)
+
+
+class QuestionFacetVersion(models.Model):
+    """
+    Single row counter bumped whenever a facet value appears or disappears.
+    """
+    class Meta:
+        app_label = 'validator'
+
+    id = models.IntegerField(primary_key=True, default=1)
+    version = models.BigIntegerField(default=0)
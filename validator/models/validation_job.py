@@ -0,0 +1,29 @@
+from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+import uuid
+from authentication.models import CustomUser
+from validator.models import Question
+
+class ValidationJob(models.Model):
+    class Meta:
+        app_label = 'validator'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+        
+    class StatusChoices(models.TextChoices):
+        PENDING = "PENDING", "pending"
+        RUNNING = "RUNNING", "running"
+        SUCCEEDED = "SUCCEEDED", "succeeded"
+        FAILED = "FAILED", "failed"
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    problem = models.ForeignKey(Question, on_delete=models.CASCADE)
+    user = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True)
+    status = models.CharField(max_length=20, choices=StatusChoices.choices, default=StatusChoices.PENDING)
+    progress = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    result = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    error = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
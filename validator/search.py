@@ -0,0 +1,42 @@
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db.models import OuterRef, Subquery
+
+# question texts are mostly Indonesian, which Postgres has no stemmer for
+SEARCH_CONFIG = 'simple'
+
+
+def question_search_vector(question_model):
+    """
+    Returns the expression of the search vector of a question row: its title (weight A),
+    its question (B) and the names of its tags (C).
+    Takes the model so that migrations can pass their historical one.
+    """
+    tag_names = (question_model.tags.through.objects
+                 .filter(question_id=OuterRef('pk'))
+                 .values('question_id')
+                 .annotate(names=StringAgg('tag__name', ' '))
+                 .values('names'))
+    return (SearchVector('title', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('question', weight='B', config=SEARCH_CONFIG)
+            + SearchVector(Subquery(tag_names), weight='C', config=SEARCH_CONFIG))
+
+
+def refresh_search_vectors(questions):
+    """
+    Recomputes the search vector of a queryset of questions in one UPDATE.
+    """
+    questions.update(search_vector=question_search_vector(questions.model))
+
+
+def search_query(keyword: str, weights: str) -> SearchQuery | None:
+    """
+    Matches questions having, in the fields of the given weights, a word starting with every
+    word of the keyword. Returns None when the keyword has no word.
+    """
+    words = re.findall(r'\w+', keyword.lower())
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f'{word}:*{weights}' for word in words), search_type='raw', config=SEARCH_CONFIG)
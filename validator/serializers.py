@@ -100,3 +100,36 @@ class CausesResponse(BaseCauses):
     status = serializers.BooleanField()
     root_status = serializers.BooleanField()
     feedback = serializers.CharField()
+
+
+class PrevalidationRequest(BaseCauses):
+    class Meta:
+        ref_name = 'PrevalidationRequest'
+
+    row = serializers.IntegerField(min_value=1)
+    column = serializers.IntegerField(min_value=0)
+
+
+class PrevalidationResponse(serializers.Serializer):
+    class Meta:
+        ref_name = 'PrevalidationResponse'
+
+    question_id = serializers.UUIDField()
+    row = serializers.IntegerField()
+    column = serializers.IntegerField()
+    status = serializers.CharField()
+
+
+class ValidationJobResponse(serializers.Serializer):
+    class Meta:
+        ref_name = 'ValidationJobResponse'
+
+    id = serializers.UUIDField()
+    question_id = serializers.UUIDField()
+    status = serializers.CharField()
+    progress = serializers.IntegerField()
+    total = serializers.IntegerField()
+    error = serializers.CharField(allow_blank=True)
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+    result = CausesResponse(many=True)
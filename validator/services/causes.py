@@ -1,46 +1,175 @@
+import json
+import time
 import uuid
-import requests
-from groq import Groq
-from typing import List
+import hashlib
+import sentry_sdk
+from functools import partial
+from typing import Any, Callable, Iterator, List, Tuple
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
 from authentication.models import CustomUser
 from validator.models import question
 from validator.services import question
 from validator.constants import ErrorMsg
 from validator.models.causes import Causes
-from validator.enums import ValidationType
+from validator.enums import ValidationType, EvaluationMode, ValidationScope
 from validator.constants import FeedbackMsg
 from validator.dataclasses.create_cause import CreateCauseDataClass
 from validator.exceptions import NotFoundRequestException, ForbiddenRequestException, AIServiceErrorException
+from validator.llm.transport import llm_transport
+from validator.llm.single_flight import llm_flights
+from validator.llm.cache import verdict_cache
+from validator.llm.metrics import metrics
+from utils.concurrency import iter_concurrently, iter_dag
+from utils.similarity import tfidf_vectors, cosine
 
 class CausesService:
-    def api_call(self, system_message: str, user_prompt: str, validation_type:ValidationType) -> int:
-        client = Groq(api_key=settings.GROQ_API_KEY)
+    STRUCTURED_SYSTEM_MESSAGE = (
+        "You are an AI model. You are asked to evaluate causes of a root cause analysis and answer ONLY with a JSON object. "
+        "A root cause is the fundamental underlying reason for a problem, which, if addressed, would prevent recurrence of the problem. "
+        "Root causes are categorized into corruption categories: 'Harta' for corruption of wealth, 'Tahta' for corruption of power, "
+        "or 'Cinta' for corruption of love."
+    )
+    
+    VERDICT_FIELDS = ['status', 'root_status', 'feedback', 'fingerprint']
+    
+    def api_call(self, system_message: str, user_prompt: str, validation_type:ValidationType, use_cache: bool = True) -> int:
+        if validation_type.value in settings.LLM_ROUTES:
+            result = CausesService.routed_call(self=self, system_message=system_message, user_prompt=user_prompt, validation_type=validation_type, use_cache=use_cache)
+            if result is not None:
+                return result
         
-        try:
-            chat_completion = client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_message,
-                    },
-                    {
-                        "role": "user",
-                        "content": user_prompt
-                    }
-                ],
-                model="llama-3.3-70b-specdec",
-                temperature=0.1,
-                max_tokens=50,
-                seed=42
+        request = CausesService._make_request(self=self, system_message=system_message, user_prompt=user_prompt)
+        
+        started = time.perf_counter()
+        result = CausesService.complete(
+            self=self,
+            request=request,
+            parse=partial(CausesService.parse_answer, self=self, validation_type=validation_type),
+            kind=validation_type.value,
+            is_final=partial(CausesService.is_final_answer, self=self, validation_type=validation_type),
+            use_cache=use_cache
+        )
+        if validation_type.value in settings.LLM_ROUTES:
+            metrics.histogram('llm_route_duration_seconds', time.perf_counter() - started, kind=validation_type.value, route='large')
+        
+        return result
+    
+    def routed_call(self, system_message: str, user_prompt: str, validation_type: ValidationType, use_cache: bool = True) -> int | None:
+        """
+        Asks the cheap model of the validation type LLM_ROUTING_SAMPLES times concurrently, the first
+        sample with the usual sampling parameters and the others with another seed and a higher temperature.
+        Returns None, so the caller escalates to the large model, when a sample fails, is unparseable
+        or the samples disagree.
+        """
+        started = time.perf_counter()
+        results = [None] * settings.LLM_ROUTING_SAMPLES
+        
+        def ask(sample: int):
+            request = CausesService._make_request(
+                self=self,
+                system_message=system_message,
+                user_prompt=user_prompt,
+                model=settings.LLM_ROUTES[validation_type.value],
+                temperature=0.1 if sample == 0 else settings.LLM_ROUTING_SAMPLE_TEMPERATURE,
+                seed=42 + sample
             )
+            results[sample] = CausesService.complete(
+                self=self,
+                request=request,
+                parse=partial(CausesService.parse_answer, self=self, validation_type=validation_type),
+                kind=validation_type.value,
+                is_final=partial(CausesService.is_final_answer, self=self, validation_type=validation_type),
+                use_cache=use_cache
+            )
+        
+        tasks = [partial(ask, sample) for sample in range(settings.LLM_ROUTING_SAMPLES)]
+        errors = [error for _, error in iter_concurrently(tasks, max_workers=len(tasks)) if error is not None]
+        metrics.histogram('llm_route_duration_seconds', time.perf_counter() - started, kind=validation_type.value, route='small')
+        
+        for error in errors:
+            if not isinstance(error, AIServiceErrorException):
+                raise error
+        if errors:
+            # the large model is the safety net of a cheap model that is down, renamed or rejecting the prompt
+            reason = 'error'
+        elif None in results:
+            reason = 'unparseable'
+        elif len(set(results)) > 1:
+            reason = 'disagreement'
+        else:
+            metrics.increment('llm_route_answers_total', kind=validation_type.value, route='small')
+            return results[0]
+        
+        metrics.increment('llm_route_escalations_total', kind=validation_type.value, reason=reason)
+        return None
+    
+    def complete(self, request: dict, parse: Callable[[str], Any], kind: str, is_final: Callable[[str], bool] | None = None, use_cache: bool = True) -> Any:
+        """
+        Sends a chat completion request through the verdict cache and returns the parsed answer.
+        Latency, token usage, errors and cache hits are recorded per kind of prompt.
+        A streamed answer stops once is_final(answer=text so far) is true, by default once it parses.
+        Without use_cache the cached answer is ignored and replaced by the fresh one.
+        """
+        cache_key = verdict_cache.make_key(**request)
+        answer = verdict_cache.get(cache_key) if use_cache else None
+        if answer is not None:
+            metrics.increment('llm_calls_total', kind=kind, source='cache')
+            return parse(answer=answer)
+        
+        # identical prompts in flight share one upstream request
+        answer, shared = llm_flights.do(
+            cache_key,
+            fn=partial(CausesService._fetch, self=self, request=request, parse=parse, kind=kind, cache_key=cache_key, is_final=is_final),
+            lookup=partial(verdict_cache.get, cache_key) if use_cache else (lambda: None)
+        )
+        if shared:
+            metrics.increment('llm_calls_total', kind=kind, source='coalesced')
+        
+        return parse(answer=answer)
+    
+    def _fetch(self, request: dict, parse: Callable[[str], Any], kind: str, cache_key: str, is_final: Callable[[str], bool] | None = None) -> str:
+        """
+        Sends the request upstream and caches its answer when it can be parsed.
+        """
+        with sentry_sdk.start_span(op='llm.call', description=kind) as span:
+            started = time.perf_counter()
+            try:
+                if settings.LLM_STREAMING:
+                    # the rest of a final answer is never generated
+                    final = is_final or (lambda answer: parse(answer=answer) is not None)
+                    answer, usage = llm_transport.stream(request, until=lambda text: final(answer=text))
+                else:
+                    chat_completion = llm_transport.create(request)
+                    answer, usage = chat_completion.choices[0].message.content, getattr(chat_completion, 'usage', None)
+            except Exception as error:
+                metrics.increment('llm_errors_total', kind=kind, error=type(error).__name__)
+                raise
+            finally:
+                metrics.histogram('llm_call_duration_seconds', time.perf_counter() - started, kind=kind)
             
-            answer = chat_completion.choices[0].message.content
+            metrics.increment('llm_calls_total', kind=kind, source='llm')
+            for token_type, tokens in CausesService._token_usage(self=self, usage=usage).items():
+                metrics.increment('llm_tokens_total', tokens, kind=kind, type=token_type)
+                span.set_data(f'tokens.{token_type}', tokens)
+            span.set_data('model', request['model'])
         
-        except requests.exceptions.RequestException:
-            raise AIServiceErrorException(ErrorMsg.AI_SERVICE_ERROR)
+        # unparseable answers are not cached so that the next run asks again
+        if parse(answer=answer) is not None:
+            verdict_cache.set(cache_key, answer, request['model'])
         
+        return answer
+    
+    def _token_usage(self, usage: Any) -> dict:
+        tokens = {
+            'prompt': getattr(usage, 'prompt_tokens', None),
+            'completion': getattr(usage, 'completion_tokens', None),
+        }
+        # the usage block is optional in the wire format and missing from streams cut short
+        return {token_type: count for token_type, count in tokens.items() if type(count) is int}
+    
+    def parse_answer(self, answer: str, validation_type: ValidationType) -> int | None:
         if validation_type in [ValidationType.NORMAL, ValidationType.ROOT]:
             if answer.lower().__contains__('true'):
                 return 1
@@ -54,38 +183,203 @@ class CausesService:
             elif answer.__contains__('3'):  
                 return 3
     
-    def validate(self, question_id: uuid):
-        max_row = Causes.objects.filter(problem_id=question_id).order_by('-row').values_list('row', flat=True).first()
-        causes = Causes.objects.filter(problem_id=question_id, row=max_row)
-        problem = question.Question.objects.get(pk=question_id)
+    def is_final_answer(self, answer: str, validation_type: ValidationType) -> bool:
+        """
+        Whether no continuation of a streamed answer can change what parse_answer reads from the whole
+        answer, which is the case once it holds the token parse_answer looks for first.
+        """
+        if validation_type in [ValidationType.NORMAL, ValidationType.ROOT]:
+            return 'true' in answer.lower()
+        return '1' in answer
+    
+    def validate(self, question_id: uuid, on_progress: Callable[[int, int], None] | None = None, force: bool = False, use_cache: bool = True) -> List[CreateCauseDataClass]:
+        """
+        Validates the causes of a question whose text or parent text changed since their last verdict,
+        on_progress(done, total) is called as causes are evaluated. Returns the newest row, or the
+        whole tree in the tree scope. force re-evaluates every cause of the tree and returns it,
+        use_cache=False asks the LLM again instead of reusing cached answers.
+        """
+        causes, pending, problem = CausesService._load_row(self=self, question_id=question_id, force=force)
+        
+        if on_progress:
+            on_progress(0, len(pending))
+        
+        errors = [None] * len(pending)
+        for done, (index, error) in enumerate(CausesService._evaluate(self=self, pending=pending, problem=problem, use_cache=use_cache), start=1):
+            errors[index] = error
+            if on_progress:
+                on_progress(done, len(pending))
+        
+        # every worker only mutates its own cause, the verdicts are written afterwards in one statement
+        evaluated = []
+        for (cause, prev_cause), error in zip(pending, errors):
+            if error is None:
+                CausesService._stamp_fingerprint(self=self, cause=cause, prev_cause=prev_cause, problem=problem)
+                evaluated.append(cause)
+        
+        with transaction.atomic():
+            Causes.objects.bulk_update(evaluated, CausesService.VERDICT_FIELDS)
+        
+        for error in errors:
+            if error is not None:
+                raise error
+        
+        return [CausesService._make_cause_response(self=self, cause=cause) for cause in causes]
+    
+    def validate_stream(self, user: CustomUser, question_id: uuid) -> Iterator[Tuple[CreateCauseDataClass, Exception | None]]:
+        """
+        Validates like validate, but saves each cause as soon as its verdict is known
+        and yields it together with the error that prevented its evaluation, if any.
+        The row is loaded eagerly so a missing or foreign question is reported before streaming starts.
+        """
+        causes, pending, problem = CausesService._load_row(self=self, question_id=question_id)
+        if problem.user_id != user.uuid:
+            raise ForbiddenRequestException(ErrorMsg.FORBIDDEN_UPDATE)
+        
+        def stream():
+            for index, error in CausesService._evaluate(self=self, pending=pending, problem=problem):
+                cause, prev_cause = pending[index]
+                if error is None:
+                    CausesService._stamp_fingerprint(self=self, cause=cause, prev_cause=prev_cause, problem=problem)
+                    cause.save(update_fields=CausesService.VERDICT_FIELDS)
+                yield CausesService._make_cause_response(self=self, cause=cause), error
+        
+        return stream()
+    
+    def _load_row(self, question_id: uuid, force: bool = False) -> Tuple[List[Causes], List[tuple], question.Question]:
+        """
+        Returns the causes of the newest row, or of the whole tree in the tree scope, the stale
+        (cause, prev_cause) pairs to evaluate in row and column order and the question.
+        Stale causes have their previous verdict cleared.
+        """
+        try:
+            problem = question.Question.objects.get(pk=question_id)
+        except ObjectDoesNotExist:
+            raise NotFoundRequestException(ErrorMsg.NOT_FOUND)
+        
+        all_causes = list(Causes.objects.filter(problem_id=question_id).order_by('row', 'column', 'pk'))
+        # the first cause of a (row, column) position by pk is the parent of the position below it
+        positions = {}
+        for cause in all_causes:
+            positions.setdefault((cause.row, cause.column), cause)
+        
+        max_row = all_causes[-1].row if all_causes else None
+        tree_scope = force or settings.VALIDATION_SCOPE == ValidationScope.TREE.value
+        causes = all_causes if tree_scope else [cause for cause in all_causes if cause.row == max_row]
 
-        for cause in causes:
-            if cause.status:
+        pending = []
+        for cause in all_causes:
+            prev_cause = positions.get((cause.row - 1, cause.column)) if cause.row > 1 else None
+            
+            if not force and not CausesService._is_stale(self=self, cause=cause, prev_cause=prev_cause, problem=problem, max_row=max_row, tree_scope=tree_scope):
                 continue
             
-            user_prompt = ""
-            prev_cause = None
-            system_message = "You are an AI model. You are asked to determine whether the given cause is the cause of the given problem."
+            cause.status = False
+            cause.root_status = False
+            cause.feedback = ""
+            pending.append((cause, prev_cause))
+        
+        return causes, pending, problem
+    
+    def fingerprint(self, cause: Causes, prev_cause: None|Causes, problem: question.Question) -> str:
+        """
+        Hashes the cause text with the text it is evaluated against, the previous cause or the question.
+        """
+        parent = prev_cause.cause if prev_cause is not None else problem.question
+        return hashlib.sha256(f"{parent}\x00{cause.cause}".encode()).hexdigest()
+    
+    def _is_stale(self, cause: Causes, prev_cause: None|Causes, problem: question.Question, max_row: int, tree_scope: bool) -> bool:
+        if cause.fingerprint:
+            return cause.fingerprint != CausesService.fingerprint(self=self, cause=cause, prev_cause=prev_cause, problem=problem)
+        # without a recorded verdict only the newest row is validated, as causes are added row by row,
+        # unless the whole tree is
+        return not cause.status and (tree_scope or cause.row == max_row)
+    
+    def _stamp_fingerprint(self, cause: Causes, prev_cause: None|Causes, problem: question.Question):
+        # a false verdict without a reason means the answer was unusable, so the cause is retried next time
+        if cause.status or cause.feedback:
+            cause.fingerprint = CausesService.fingerprint(self=self, cause=cause, prev_cause=prev_cause, problem=problem)
+        else:
+            cause.fingerprint = ""
+    
+    def _evaluate(self, pending: List[tuple], problem: question.Question, use_cache: bool = True) -> Iterator[Tuple[int, Exception | None]]:
+        """
+        Evaluates the (cause, prev_cause) pairs and yields (index, error) in the calling thread as each verdict is ready.
+        """
+        similar = CausesService.prefilter_similar(self=self, pending=pending)
+        for index in sorted(similar):
+            yield index, None
+        
+        remaining = [index for index in range(len(pending)) if index not in similar]
+        if settings.VALIDATION_EVALUATION_MODE == EvaluationMode.BATCHED.value and len(remaining) > 1:
+            batched = CausesService.evaluate_batch(self=self, pending=[pending[index] for index in remaining], problem=problem, use_cache=use_cache)
+            for position in sorted(batched):
+                yield remaining[position], None
+            remaining = [index for position, index in enumerate(remaining) if position not in batched]
+        
+        # columns are independent and run concurrently, a cause waits for its parent when both are evaluated
+        positions = {id(pending[index][0]): position for position, index in enumerate(remaining)}
+        tasks = [
+            partial(CausesService.evaluate_cause, self=self, cause=pending[index][0], problem=problem, prev_cause=pending[index][1], use_cache=use_cache)
+            for index in remaining
+        ]
+        dependencies = [
+            [positions[id(pending[index][1])]] if id(pending[index][1]) in positions else []
+            for index in remaining
+        ]
+        for position, error in iter_dag(tasks, dependencies, max_workers=settings.VALIDATION_MAX_CONCURRENCY):
+            yield remaining[position], error
+    
+    def prefilter_similar(self, pending: List[tuple]) -> set:
+        """
+        Gives the "similar to the previous cause" feedback without an LLM call to the causes whose
+        character n-gram TF-IDF vector is nearly the same as their previous cause's.
+        Returns the indexes of the short-circuited pairs.
+        """
+        pairs = [index for index, (_, prev_cause) in enumerate(pending) if prev_cause is not None]
+        if not settings.VALIDATION_SIMILARITY_ENABLED or not pairs:
+            return set()
+        
+        similar = set()
+        for index in pairs:
+            cause, prev_cause = pending[index]
+            # the idf is computed over the pair alone, so the decision does not depend on the rest of the row
+            vectors = tfidf_vectors([cause.cause, prev_cause.cause], n=settings.VALIDATION_SIMILARITY_NGRAM)
+            metrics.increment('validation_similarity_checks_total')
+            if cosine(*vectors) >= settings.VALIDATION_SIMILARITY_THRESHOLD:
+                CausesService._apply_false_reason(self=self, cause=cause, prev_cause=prev_cause, feedback_type=3)
+                metrics.increment('validation_similarity_short_circuits_total')
+                similar.add(index)
+        
+        return similar
+    
+    def evaluate_cause(self, cause: Causes, problem: question.Question, prev_cause: None|Causes, use_cache: bool = True):
+        """
+        Runs the LLM checks of a single cause and stores the verdict on the instance without saving it.
+        """
+        if settings.VALIDATION_EVALUATION_MODE == EvaluationMode.COMBINED.value:
+            if CausesService.evaluate_combined(self=self, cause=cause, problem=problem, prev_cause=prev_cause, use_cache=use_cache):
+                return
+            metrics.increment('validation_fallbacks_total', mode=EvaluationMode.COMBINED.value)
+        
+        metrics.increment('validation_evaluations_total', mode=EvaluationMode.MULTI.value)
+        system_message = "You are an AI model. You are asked to determine whether the given cause is the cause of the given problem."
+        
+        if prev_cause is None:
+            user_prompt = f"Is '{cause.cause}' the cause of this question: '{problem.question}'? Answer only with True/False"
+        else:
+            user_prompt = f"Is '{cause.cause}' the cause of '{prev_cause.cause}'? Answer only with True/False"
             
-            if max_row == 1:
-                user_prompt = f"Is '{cause.cause}' the cause of this question: '{problem.question}'? Answer only with True/False"
-                
-            else:
-                prev_cause = Causes.objects.filter(problem_id=question_id, row=max_row-1, column=cause.column).first()
-                user_prompt = f"Is '{cause.cause}' the cause of '{prev_cause.cause}'? Answer only with True/False"
-                
-            if self.api_call(self=self, system_message=system_message, user_prompt=user_prompt, validation_type=ValidationType.NORMAL) == 1:
-                cause.status = True
-                cause.feedback = ""
-                if max_row > 1:
-                    CausesService.check_root_cause(self=self, cause=cause, problem=problem)
+        if CausesService.api_call(self=self, system_message=system_message, user_prompt=user_prompt, validation_type=ValidationType.NORMAL, use_cache=use_cache) == 1:
+            cause.status = True
+            cause.feedback = ""
+            if cause.row > 1:
+                CausesService.check_root_cause(self=self, cause=cause, problem=problem, use_cache=use_cache)
 
-            else:
-                CausesService.retrieve_feedback(self=self, cause=cause, problem=problem, prev_cause = prev_cause)
-            
-            cause.save()
+        else:
+            CausesService.retrieve_feedback(self=self, cause=cause, problem=problem, prev_cause=prev_cause, use_cache=use_cache)
     
-    def check_root_cause(self, cause: Causes, problem: question.Question):
+    def check_root_cause(self, cause: Causes, problem: question.Question, use_cache: bool = True):
         root_check_user_prompt = f"Is the cause '{cause.cause}' the fundamental reason behind the problem '{problem.question}'? Answer only with True or False."
         root_check_system_message = (
             "You are an AI model. You are asked to determine whether the given cause is a root cause of the given problem. "
@@ -94,7 +388,7 @@ class CausesService:
             "Your task is to distinguish between direct causes and root causes, identifying whether the given cause is indeed the fundamental issue driving the problem."
         )
         
-        if CausesService.api_call(self=self, system_message=root_check_system_message, user_prompt=root_check_user_prompt, validation_type=ValidationType.ROOT) == 1:
+        if CausesService.api_call(self=self, system_message=root_check_system_message, user_prompt=root_check_user_prompt, validation_type=ValidationType.ROOT, use_cache=use_cache) == 1:
             cause.root_status = True
     
             korupsi_check_user_prompt = (
@@ -110,20 +404,11 @@ class CausesService:
                 "Answer ONLY with '1' for Harta, '2' for Tahta, or '3' for Cinta."
             )
             
-            korupsi_category = CausesService.api_call(self=self, system_message=korupsi_check_system_message, user_prompt=korupsi_check_user_prompt, validation_type=ValidationType.ROOT_TYPE)
-            
-            if korupsi_category == 1:
-                cause.feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='ABCDE'[cause.column])} Korupsi Harta."
-            elif korupsi_category == 2:
-                cause.feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='ABCDE'[cause.column])} Korupsi Tahta."
-            elif korupsi_category == 3:
-                cause.feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='ABCDE'[cause.column])} Korupsi Cinta."
-            else:
-                cause.feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='ABCDE'[cause.column])} Korupsi Harta."
+            korupsi_category = CausesService.api_call(self=self, system_message=korupsi_check_system_message, user_prompt=korupsi_check_user_prompt, validation_type=ValidationType.ROOT_TYPE, use_cache=use_cache)
             
-            cause.save()
+            CausesService._apply_root_category(self=self, cause=cause, korupsi_category=korupsi_category)
                 
-    def retrieve_feedback(self, cause: Causes, problem: question.Question, prev_cause: None|Causes):
+    def retrieve_feedback(self, cause: Causes, problem: question.Question, prev_cause: None|Causes, use_cache: bool = True):
         retrieve_feedback_user_prompt = ""
         retrieve_feedback_system_message = ""
         
@@ -152,8 +437,208 @@ class CausesService:
                 "Please respond ONLY WITH '1' if the cause is NOT THE CAUSE of the question, ONLY WITH '2' if the cause is positive or neutral"
             )
         
-        feedback_type = CausesService.api_call(self=self, system_message=retrieve_feedback_system_message, user_prompt=retrieve_feedback_user_prompt, validation_type=ValidationType.FALSE)
-            
+        feedback_type = CausesService.api_call(self=self, system_message=retrieve_feedback_system_message, user_prompt=retrieve_feedback_user_prompt, validation_type=ValidationType.FALSE, use_cache=use_cache)
+        
+        CausesService._apply_false_reason(self=self, cause=cause, prev_cause=prev_cause, feedback_type=feedback_type)
+    
+    def evaluate_combined(self, cause: Causes, problem: question.Question, prev_cause: None|Causes, use_cache: bool = True) -> bool:
+        """
+        Asks for the verdict, root status, corruption category and false reason of a cause in one structured request.
+        Returns False without touching the cause when the answer is unusable, so the caller can fall back.
+        """
+        if prev_cause is None:
+            user_prompt = f"Cause: '{cause.cause}'. Question: '{problem.question}'. "
+        else:
+            user_prompt = f"Cause: '{cause.cause}'. Previous cause: '{prev_cause.cause}'. Problem: '{problem.question}'. "
+        user_prompt += "Answer with a JSON object with the keys " + CausesService._verdict_keys(self=self, has_prev_cause=prev_cause is not None)
+        
+        request = CausesService._make_request(
+            self=self,
+            system_message=CausesService.STRUCTURED_SYSTEM_MESSAGE,
+            user_prompt=user_prompt,
+            max_tokens=100,
+            response_format={"type": "json_object"}
+        )
+        
+        verdict = CausesService.complete(
+            self=self,
+            request=request,
+            parse=partial(CausesService.parse_combined_answer, self=self, has_prev_cause=prev_cause is not None),
+            kind=EvaluationMode.COMBINED.value,
+            use_cache=use_cache
+        )
+        if verdict is None:
+            return False
+        
+        metrics.increment('validation_evaluations_total', mode=EvaluationMode.COMBINED.value)
+        CausesService._apply_verdict(self=self, cause=cause, prev_cause=prev_cause, verdict=verdict)
+        return True
+    
+    def evaluate_batch(self, pending: List[tuple], problem: question.Question, use_cache: bool = True) -> set:
+        """
+        Evaluates every (cause, prev_cause) pair of a row in one structured request.
+        Returns the indexes of the pairs whose verdict was applied, the others need per-cause calls.
+        """
+        has_prev_cause = any(prev_cause is not None for _, prev_cause in pending)
+        items = []
+        for index, (cause, prev_cause) in enumerate(pending):
+            if prev_cause is None:
+                items.append(f"{index}. Cause: '{cause.cause}'.")
+            else:
+                items.append(f"{index}. Cause: '{cause.cause}'. Previous cause: '{prev_cause.cause}'.")
+        
+        user_prompt = (
+            f"Problem: '{problem.question}'. Evaluate each of the following causes:\n" + "\n".join(items) + "\n"
+            "Answer with a JSON object {\"results\": [...]} holding one object per cause with the keys "
+            "\"index\": the number of the cause; " + CausesService._verdict_keys(self=self, has_prev_cause=has_prev_cause)
+        )
+        
+        request = CausesService._make_request(
+            self=self,
+            system_message=CausesService.STRUCTURED_SYSTEM_MESSAGE,
+            user_prompt=user_prompt,
+            max_tokens=60 * len(pending) + 20,
+            response_format={"type": "json_object"}
+        )
+        
+        verdicts = CausesService.complete(
+            self=self,
+            request=request,
+            parse=partial(CausesService.parse_batch_answer, self=self, pending=pending),
+            kind=EvaluationMode.BATCHED.value,
+            use_cache=use_cache
+        )
+        if verdicts is None:
+            metrics.increment('validation_fallbacks_total', mode=EvaluationMode.BATCHED.value, value=len(pending))
+            return set()
+        
+        for index, verdict in verdicts.items():
+            cause, prev_cause = pending[index]
+            CausesService._apply_verdict(self=self, cause=cause, prev_cause=prev_cause, verdict=verdict)
+        
+        metrics.increment('validation_evaluations_total', mode=EvaluationMode.BATCHED.value, value=len(verdicts))
+        if len(verdicts) < len(pending):
+            metrics.increment('validation_fallbacks_total', mode=EvaluationMode.BATCHED.value, value=len(pending) - len(verdicts))
+        return set(verdicts)
+    
+    def parse_combined_answer(self, answer: str, has_prev_cause: bool) -> dict | None:
+        """
+        Returns the structured verdict, or None when the answer does not follow the requested schema.
+        """
+        try:
+            verdict = json.loads(answer)
+        except (TypeError, ValueError):
+            return None
+        
+        if not CausesService._is_valid_verdict(self=self, verdict=verdict, has_prev_cause=has_prev_cause):
+            return None
+        return verdict
+    
+    def parse_batch_answer(self, answer: str, pending: List[tuple]) -> dict | None:
+        """
+        Returns the valid verdicts of a batched answer keyed by cause index, or None when the answer is not
+        an array with exactly one item per cause. Invalid items are left out so only those causes fall back.
+        """
+        try:
+            results = json.loads(answer).get('results')
+        except (TypeError, ValueError, AttributeError):
+            return None
+        
+        if not isinstance(results, list) or len(results) != len(pending):
+            return None
+        
+        indexes = [result.get('index') if isinstance(result, dict) else None for result in results]
+        if sorted(index for index in indexes if type(index) is int) != list(range(len(pending))):
+            return None
+        
+        verdicts = {}
+        for index, result in zip(indexes, results):
+            if CausesService._is_valid_verdict(self=self, verdict=result, has_prev_cause=pending[index][1] is not None):
+                verdicts[index] = result
+        
+        # an empty dict would be cached as a usable answer
+        return verdicts or None
+    
+    def _is_valid_verdict(self, verdict: Any, has_prev_cause: bool) -> bool:
+        if not isinstance(verdict, dict) or not isinstance(verdict.get('is_cause'), bool):
+            return False
+        
+        if verdict['is_cause']:
+            if not has_prev_cause:
+                return True
+            if not isinstance(verdict.get('is_root'), bool):
+                return False
+            return not verdict['is_root'] or CausesService._is_choice(self=self, value=verdict.get('category'), choices=(1, 2, 3))
+        
+        return CausesService._is_choice(self=self, value=verdict.get('false_reason'), choices=(1, 2, 3) if has_prev_cause else (1, 2))
+    
+    def _verdict_keys(self, has_prev_cause: bool) -> str:
+        if not has_prev_cause:
+            return (
+                "\"is_cause\": true if the cause is the cause of the question, otherwise false; "
+                "\"false_reason\": null if is_cause is true, otherwise 1 if it is NOT THE CAUSE or 2 if it is POSITIVE OR NEUTRAL."
+            )
+        return (
+            "\"is_cause\": true if the cause is the cause of the previous cause, otherwise false; "
+            "\"is_root\": true if the cause is the fundamental reason behind the problem, otherwise false; "
+            "\"category\": null if is_root is false, otherwise 1 for Harta, 2 for Tahta or 3 for Cinta; "
+            "\"false_reason\": null if is_cause is true, otherwise 1 if it is NOT THE CAUSE, 2 if it is POSITIVE OR NEUTRAL "
+            "or 3 if it is SIMILAR TO THE PREVIOUS cause."
+        )
+    
+    def _apply_verdict(self, cause: Causes, prev_cause: None|Causes, verdict: dict):
+        cause.status = verdict['is_cause']
+        if cause.status:
+            cause.feedback = ""
+            if verdict.get('is_root'):
+                cause.root_status = True
+                CausesService._apply_root_category(self=self, cause=cause, korupsi_category=verdict['category'])
+        else:
+            CausesService._apply_false_reason(self=self, cause=cause, prev_cause=prev_cause, feedback_type=verdict['false_reason'])
+    
+    def _is_choice(self, value: Any, choices: tuple) -> bool:
+        # bool is a subclass of int, so True must not be read as choice 1
+        return type(value) is int and value in choices
+    
+    def _make_request(
+        self,
+        system_message: str,
+        user_prompt: str,
+        max_tokens: int = 50,
+        model: str = "llama-3.3-70b-specdec",
+        temperature: float = 0.1,
+        seed: int = 42,
+        **options
+    ) -> dict:
+        return dict(
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_message,
+                },
+                {
+                    "role": "user",
+                    "content": user_prompt
+                }
+            ],
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            seed=seed,
+            **options
+        )
+    
+    def _apply_root_category(self, cause: Causes, korupsi_category: int | None):
+        if korupsi_category == 1:
+            cause.feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='ABCDE'[cause.column])} Korupsi Harta."
+        elif korupsi_category == 2:
+            cause.feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='ABCDE'[cause.column])} Korupsi Tahta."
+        elif korupsi_category == 3:
+            cause.feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='ABCDE'[cause.column])} Korupsi Cinta."
+        else:
+            cause.feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='ABCDE'[cause.column])} Korupsi Harta."
+    
+    def _apply_false_reason(self, cause: Causes, prev_cause: None|Causes, feedback_type: int | None):
         if feedback_type == 1 and prev_cause:
             cause.feedback = FeedbackMsg.FALSE_ROW_N_NOT_CAUSE.format(column='ABCDE'[cause.column], row=cause.row, prev_row=cause.row-1)
         elif feedback_type == 1:
@@ -163,6 +648,19 @@ class CausesService:
         elif feedback_type == 3:
             cause.feedback = FeedbackMsg.FALSE_ROW_N_SIMILAR_PREVIOUS.format(column='ABCDE'[cause.column], row=cause.row) 
                
+    def _make_cause_response(self, cause: Causes) -> CreateCauseDataClass:
+        return CreateCauseDataClass(
+            question_id=cause.problem_id,
+            id=cause.id,
+            row=cause.row,
+            column=cause.column,
+            mode=cause.mode,
+            cause=cause.cause,
+            status=cause.status,
+            root_status=cause.root_status,
+            feedback = cause.feedback
+        )
+
     def create(self, question_id: uuid, cause: str, row: int, column: int, mode: str) -> CreateCauseDataClass:
         cause = Causes.objects.create(
             problem=question.Question.objects.get(pk=question_id),
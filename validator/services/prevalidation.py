@@ -0,0 +1,121 @@
+import os
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from django.conf import settings
+from django.db import connections
+from authentication.models import CustomUser
+
+from validator.constants import ErrorMsg
+from validator.models.causes import Causes
+from validator.models.question import Question
+from validator.services.causes import CausesService
+from validator.llm.metrics import metrics
+from validator.dataclasses.prevalidation import PrevalidationDataClass
+from validator.exceptions import NotFoundRequestException, ForbiddenRequestException, TooManyDraftsException
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+# (user, question, row, column) of the queued or running drafts of this process by future,
+# and the newest draft future of every cell
+_drafts = {}
+_latest = {}
+# reentrant as cancelling a future runs its done callback in the cancelling thread
+_drafts_lock = threading.RLock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the pre-validation thread pool of this process, a forked worker builds its own.
+    """
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=settings.PREVALIDATION_WORKERS, thread_name_prefix='prevalidation')
+            _executor_pid = os.getpid()
+            _drafts.clear()
+            _latest.clear()
+        return _executor
+
+
+class PrevalidationService:
+    """
+    Evaluates draft causes before they are saved so their LLM answers are in the verdict cache when
+    the question is validated. The draft is checked with the exact prompts validation sends for the
+    same text, parent and question, the verdict itself is thrown away.
+    """
+
+    def prevalidate(self, user: CustomUser, question_id: uuid, row: int, column: int, cause: str) -> PrevalidationDataClass:
+        try:
+            problem = Question.objects.get(pk=question_id)
+        except Question.DoesNotExist:
+            raise NotFoundRequestException(ErrorMsg.NOT_FOUND)
+
+        if problem.user_id != user.uuid:
+            raise ForbiddenRequestException(ErrorMsg.FORBIDDEN_UPDATE)
+
+        prev_cause = None
+        if row > 1:
+            # the same parent validation picks among duplicates, or the prompts and their cache keys differ
+            prev_cause = Causes.objects.filter(problem_id=question_id, row=row - 1, column=column).order_by('pk').first()
+            if prev_cause is None:
+                raise NotFoundRequestException(ErrorMsg.PREV_CAUSE_NOT_FOUND)
+
+        draft = Causes(problem=problem, row=row, column=column, mode=problem.mode, cause=cause)
+
+        if settings.PREVALIDATION_BACKEND == 'inline':
+            self.run(draft, prev_cause)
+            status = 'done'
+        else:
+            self._submit((user.uuid, question_id, row, column), draft, prev_cause)
+            status = 'scheduled'
+
+        metrics.increment('prevalidation_requests_total', status=status)
+        return PrevalidationDataClass(question_id=question_id, row=row, column=column, status=status)
+
+    def run(self, draft: Causes, prev_cause: None|Causes):
+        try:
+            CausesService.evaluate_cause(self=CausesService, cause=draft, problem=draft.problem, prev_cause=prev_cause)
+        except Exception:
+            # pre-validation is speculative, the real validation reports the error if it persists
+            logger.warning('Pre-validation of a draft cause failed', exc_info=True)
+            metrics.increment('prevalidation_errors_total')
+
+    def _submit(self, key: tuple, draft: Causes, prev_cause: None|Causes):
+        executor = _get_executor()
+        with _drafts_lock:
+            superseded = _latest.get(key)
+            pending = sum(1 for future, (user_id, *_) in _drafts.items() if user_id == key[0] and future is not superseded)
+            # the queued draft of the cell is only dropped once the new one is accepted,
+            # a running one finishes its LLM calls and still counts
+            if pending < settings.PREVALIDATION_MAX_PENDING and superseded is not None:
+                if superseded.cancel():
+                    metrics.increment('prevalidation_superseded_total')
+                elif not superseded.done():
+                    pending += 1
+            if pending >= settings.PREVALIDATION_MAX_PENDING:
+                metrics.increment('prevalidation_rejections_total')
+                raise TooManyDraftsException(ErrorMsg.TOO_MANY_DRAFTS)
+
+            future = executor.submit(self._run_in_thread, draft, prev_cause)
+            _drafts[future] = key
+            _latest[key] = future
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future: Future):
+        with _drafts_lock:
+            key = _drafts.pop(future, None)
+            if key is not None and _latest.get(key) is future:
+                del _latest[key]
+
+    def _run_in_thread(self, draft: Causes, prev_cause: None|Causes):
+        try:
+            self.run(draft, prev_cause)
+        finally:
+            connections.close_all()
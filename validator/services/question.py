@@ -1,17 +1,21 @@
-from typing import List
+from typing import Callable, List
 import uuid
 from datetime import (
     datetime, timedelta
 )
 from multiprocessing.managers import BaseManager
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F, FloatField, Q
+from django.db.models.functions import Cast
 from authentication.models import CustomUser
 
 from validator.enums import (
     QuestionType, HistoryType, FilterType
 )
+from validator import facets
 from validator.constants import ErrorMsg
 from validator.dataclasses.field_values import FieldValuesDataClass
 from validator.dataclasses.create_question import CreateQuestionDataClass 
@@ -24,10 +28,17 @@ from validator.exceptions import (
 from validator.models.causes import Causes
 from validator.models.question import Question
 from validator.models.tag import Tag
+from validator.search import search_query
 from validator.serializers import Question
 
 
 class QuestionService():
+    # search vector weights matched by each filter: title (A), question (B) and tag names (C)
+    FILTER_WEIGHTS = {
+        FilterType.JUDUL.value: 'AB',
+        FilterType.TOPIK.value: 'C',
+        FilterType.SEMUA.value: 'ABC',
+    }
     
     def create(self, user: CustomUser, title:str, question: str, mode: str, tags: List[str]):
         tags_object = self._validate_tags(tags)
@@ -60,9 +71,10 @@ class QuestionService():
 
         return response[0]
     
-    def get_all(self, user: CustomUser,time_range: str):
+    def get_all(self, user: CustomUser,time_range: str, paginate: Callable = None):
         """
         Returns a list of  all questions corresponding to a specified user.
+        paginate(queryset) returns the page to respond with, responses are only built for its questions.
         """
 
         today_datetime = datetime.now()
@@ -76,9 +88,10 @@ class QuestionService():
             case HistoryType.OLDER.value:
                 questions = Question.objects.filter(user=user, created_at__lt=last_week_datetime
                                                     ).order_by('-created_at')
+        questions = self._with_response_relations(questions)
                 
         # get all questions filtered by user
-        response = self._make_question_response(questions)
+        response = self._make_question_response(paginate(questions) if paginate else questions)
 
         return response
     
@@ -93,9 +106,10 @@ class QuestionService():
 
         return response
     
-    def get_privileged(self, q_filter: str, user: CustomUser, keyword: str):
+    def get_privileged(self, q_filter: str, user: CustomUser, keyword: str, paginate: Callable = None):
         """
         Return a list for pengawasan questions by keyword and filter type for privileged users.
+        paginate(queryset) returns the page to respond with, as in get_all.
         """
         # allow only superuser/staff (admins) to access resource
         is_admin = user.is_superuser and user.is_staff
@@ -109,16 +123,18 @@ class QuestionService():
         
         # query the questions with specified filters     
         mode = Q(mode=QuestionType.PENGAWASAN.value)       
-        questions = Question.objects.filter(mode & clause).order_by('-created_at').distinct()
+        questions = self._order_by_relevance(Question.objects.filter(mode & clause), q_filter, keyword)
+        questions = self._with_response_relations(questions)
 
         # get all questions matching corresponding filters
-        response = self._make_question_response(questions)
+        response = self._make_question_response(paginate(questions) if paginate else questions)
 
         return response
     
-    def get_matched(self, q_filter: str, user: CustomUser, time_range: str, keyword: str):
+    def get_matched(self, q_filter: str, user: CustomUser, time_range: str, keyword: str, paginate: Callable = None):
         """
         Returns a list of matched questions corresponding to logged in user with specified filters.
+        paginate(queryset) returns the page to respond with, as in get_all.
         """
         is_admin = user.is_superuser and user.is_staff
         
@@ -136,48 +152,38 @@ class QuestionService():
         time = self._resolve_time_range(time_range.lower(), today_datetime, last_week_datetime)
 
         # query the questions with specified filters            
-        questions = Question.objects.filter(user_filter & clause & time).order_by('-created_at').distinct()
+        questions = self._order_by_relevance(Question.objects.filter(user_filter & clause & time), q_filter, keyword)
+        questions = self._with_response_relations(questions)
 
         # get all questions matching corresponding filters
-        response = self._make_question_response(questions)
+        response = self._make_question_response(paginate(questions) if paginate else questions)
 
         return response
 
     def get_field_values(self, user: CustomUser) -> FieldValuesDataClass:
         """
         Returns all unique field values attached to available questions for search bar dropdown functionality.
+        Values are read from the facet table kept up to date by validator.signals. With
+        QUESTION_FACETS_CACHE_ENABLED, responses are cached per facet version and carry it as an etag.
         """
         is_admin = user.is_superuser and user.is_staff
 
-        questions = Question.objects.all()
+        if not settings.QUESTION_FACETS_CACHE_ENABLED:
+            return self._field_values(is_admin=is_admin)
 
-        values = {
-            "judul": set(),
-            "topik": set()
-        }
+        version = facets.version()
+        etag = f'"{version}-{int(is_admin)}"'
+        return facets.cached(version, etag, lambda: self._field_values(is_admin=is_admin, etag=etag))
 
-        # extract usernames if user is admin to allow filtering by pengguna
-        if is_admin: values['pengguna'] = set()
-        
-        for question in questions:
-            if is_admin:
-                values['pengguna'].add(question.user.username)
-            values['judul'].add(question.title)
-            # extract list of tags from question
-            tags = [tag.name for tag in question.tags.all()]
-            values['topik'].update(tags)
-
-        response = FieldValuesDataClass(
-            pengguna=[],
-            judul=list(values['judul']), 
-            topik=list(values['topik'])
+    def _field_values(self, is_admin: bool, etag: str = None) -> FieldValuesDataClass:
+        # usernames are only listed to admins, who are the only ones allowed to filter by pengguna
+        return FieldValuesDataClass(
+            pengguna=facets.values(facets.PENGGUNA) if is_admin else [],
+            judul=facets.values(facets.JUDUL),
+            topik=facets.values(facets.TOPIK),
+            etag=etag,
         )
 
-        if is_admin:
-            response.pengguna=list(values['pengguna'])    
-
-        return response 
-
     def update_question(self, user: CustomUser, pk: uuid, **fields):
         try:
             question_object = Question.objects.get(pk=pk)
@@ -237,6 +243,13 @@ class QuestionService():
     """
     Utility functions.
     """
+    def _with_response_relations(self, questions):
+        """
+        Loads the user and tags that _make_question_response reads with the questions,
+        in two queries whatever the number of questions.
+        """
+        return questions.select_related('user').prefetch_related('tags')
+
     def _make_question_response(self, questions) -> list:
         response = []
         if len(questions) == 0:
@@ -260,27 +273,65 @@ class QuestionService():
         """
         Returns where clause for questions with specified filters/keywords.
         Only allow superusers/admin to filter by user.
+        Words are matched by prefix on the search vector, substrings by icontains, which the
+        trigram indexes serve. Matches on tags and users select question ids from their own tables
+        and are combined with the question matches in a UNION, since an OR across tables can only
+        be applied as a filter over a scan of every question.
         """
         match filter.lower():
             case FilterType.PENGGUNA.value:
-                clause = (Q(user__username__icontains=keyword) | 
-                          Q(user__first_name__icontains=keyword) | 
-                          Q(user__last_name__icontains=keyword))
+                clause, others = None, [self._by_user(keyword, first_and_last_name=True)]
             case FilterType.JUDUL.value:
-                clause = (Q(title__icontains=keyword) |
-                          Q(question__icontains=keyword))
+                clause, others = Q(title__icontains=keyword) | Q(question__icontains=keyword), []
             case FilterType.TOPIK.value:
-                clause = Q(tags__name__icontains=keyword)
+                clause, others = None, [self._tagged(keyword)]
             case FilterType.SEMUA.value:
-                clause = (Q(title__icontains=keyword) |
-                          Q(question__icontains=keyword) |
-                          Q(tags__name__icontains=keyword))
+                clause, others = Q(title__icontains=keyword) | Q(question__icontains=keyword), [self._tagged(keyword)]
                 if is_admin:
-                    clause |= Q(user__username__icontains=keyword)
+                    others.append(self._by_user(keyword))
             case _:
                 raise InvalidFiltersException(ErrorMsg.INVALID_FILTERS)
         
-        return clause
+        # every title and question holds the empty string
+        if keyword == '' and clause is not None:
+            return Q()
+        
+        query = self._search_query(filter, keyword)
+        if query is not None:
+            clause = clause | Q(search_vector=query) if clause is not None else Q(search_vector=query)
+        
+        if not others:
+            return clause
+        ids = ([Question.objects.filter(clause).order_by().values('pk')] if clause is not None else []) + others
+        return Q(pk__in=ids[0].union(*ids[1:])) if len(ids) > 1 else Q(pk__in=ids[0])
+    
+    def _search_query(self, filter: str, keyword: str):
+        # filters without weights, such as pengguna, never match the search vector
+        weights = self.FILTER_WEIGHTS.get(filter.lower())
+        if not weights:
+            return None
+        return search_query(keyword, weights)
+    
+    def _tagged(self, keyword: str):
+        return Question.tags.through.objects.filter(tag__name__icontains=keyword).order_by().values('question_id')
+    
+    def _by_user(self, keyword: str, first_and_last_name: bool = False):
+        names = Q(username__icontains=keyword)
+        if first_and_last_name:
+            names |= Q(first_name__icontains=keyword) | Q(last_name__icontains=keyword)
+        return Question.objects.filter(user__in=CustomUser.objects.filter(names).values('pk')).order_by().values('pk')
+    
+    def _order_by_relevance(self, questions, filter: str, keyword: str):
+        """
+        Orders the questions by the rank of the keyword in their search vector, then newest first.
+        Filters without a search vector, or keywords without a word, keep the newest first order.
+        """
+        query = self._search_query(filter, keyword)
+        if query is None:
+            return questions.order_by('-created_at')
+        # ts_rank is a real, read back as a double it round-trips exactly through a pagination cursor
+        rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+        return questions.annotate(rank=rank).order_by('-rank', '-created_at')
     
     def _resolve_time_range(self, time_range: str, today_datetime: datetime, last_week_datetime: datetime) -> Q:
         """
@@ -0,0 +1,169 @@
+import os
+import uuid
+import logging
+import threading
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from authentication.models import CustomUser
+
+from validator.constants import ErrorMsg
+from validator.models.question import Question
+from validator.models.validation_job import ValidationJob
+from validator.services.causes import CausesService
+from validator.dataclasses.create_cause import CreateCauseDataClass
+from validator.dataclasses.validation_job import ValidationJobDataClass
+from validator.exceptions import NotFoundRequestException, ForbiddenRequestException
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the job thread pool of this process, a forked worker builds its own.
+    """
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=settings.VALIDATION_JOB_WORKERS, thread_name_prefix='validation-job')
+            _executor_pid = os.getpid()
+        return _executor
+
+
+class ValidationJobService:
+    def enqueue(self, user: CustomUser, question_id: uuid) -> ValidationJobDataClass:
+        try:
+            problem = Question.objects.get(pk=question_id)
+        except Question.DoesNotExist:
+            raise NotFoundRequestException(ErrorMsg.NOT_FOUND)
+
+        if problem.user_id != user.uuid:
+            raise ForbiddenRequestException(ErrorMsg.FORBIDDEN_UPDATE)
+
+        job = ValidationJob.objects.create(problem_id=question_id, user=user)
+
+        match settings.VALIDATION_JOB_BACKEND:
+            case 'inline':
+                self.run(job.id)
+                job.refresh_from_db()
+            case 'thread':
+                transaction.on_commit(lambda: _get_executor().submit(self._run_in_thread, job.id))
+            # the worker backend leaves the job to the run_validation_worker command
+
+        return self._make_job_response(job)
+
+    def get(self, user: CustomUser, question_id: uuid, pk: uuid) -> ValidationJobDataClass:
+        try:
+            job = ValidationJob.objects.get(pk=pk, problem_id=question_id)
+        except ValidationJob.DoesNotExist:
+            raise NotFoundRequestException(ErrorMsg.JOB_NOT_FOUND)
+
+        if job.user_id != user.uuid:
+            raise ForbiddenRequestException(ErrorMsg.FORBIDDEN_GET)
+
+        # the worker command picks abandoned jobs up again, the thread pool of a dead process never will
+        if settings.VALIDATION_JOB_BACKEND != 'worker':
+            self._fail_if_abandoned(job)
+
+        return self._make_job_response(job)
+
+    def claim(self) -> uuid.UUID | None:
+        """
+        Marks the oldest pending (or abandoned running) job as running and returns its id.
+        Safe to call from several worker processes at once.
+        """
+        stale = timezone.now() - timedelta(seconds=settings.VALIDATION_JOB_TIMEOUT)
+        with transaction.atomic():
+            job = (ValidationJob.objects
+                   .select_for_update(skip_locked=True)
+                   .filter(Q(status=ValidationJob.StatusChoices.PENDING) |
+                           Q(status=ValidationJob.StatusChoices.RUNNING, updated_at__lt=stale))
+                   .order_by('created_at')
+                   .first())
+            if job is None:
+                return None
+            job.status = ValidationJob.StatusChoices.RUNNING
+            job.save(update_fields=['status', 'updated_at'])
+        return job.id
+
+    def run(self, pk: uuid):
+        job = ValidationJob.objects.get(pk=pk)
+        # a job failed as abandoned while it was queued is not run anymore
+        started = ValidationJob.objects.filter(
+            pk=pk, status__in=[ValidationJob.StatusChoices.PENDING, ValidationJob.StatusChoices.RUNNING]
+        ).update(status=ValidationJob.StatusChoices.RUNNING, updated_at=timezone.now())
+        if not started:
+            return
+
+        def on_progress(done, total):
+            ValidationJob.objects.filter(pk=pk).update(progress=done, total=total, updated_at=timezone.now())
+
+        try:
+            causes = CausesService.validate(self=CausesService, question_id=job.problem_id, on_progress=on_progress)
+        except Exception as error:
+            logger.exception('Validation job %s failed', pk)
+            ValidationJob.objects.filter(pk=pk).update(
+                status=ValidationJob.StatusChoices.FAILED,
+                error=self._error_message(error),
+                updated_at=timezone.now()
+            )
+            return
+
+        ValidationJob.objects.filter(pk=pk).update(
+            status=ValidationJob.StatusChoices.SUCCEEDED,
+            result=[cause.dict() for cause in causes],
+            updated_at=timezone.now()
+        )
+
+    def _fail_if_abandoned(self, job: ValidationJob):
+        """
+        Marks a pending or running job failed when it has not been updated for VALIDATION_JOB_TIMEOUT
+        seconds, e.g. when it was still queued or running in the thread pool of a process that died.
+        """
+        unfinished = [ValidationJob.StatusChoices.PENDING, ValidationJob.StatusChoices.RUNNING]
+        stale = timezone.now() - timedelta(seconds=settings.VALIDATION_JOB_TIMEOUT)
+        if job.status not in unfinished or job.updated_at >= stale:
+            return
+        abandoned = ValidationJob.objects.filter(
+            pk=job.pk, status__in=unfinished, updated_at__lt=stale
+        ).update(status=ValidationJob.StatusChoices.FAILED, error=ErrorMsg.JOB_ABANDONED, updated_at=timezone.now())
+        if abandoned:
+            logger.warning('Validation job %s was abandoned', job.pk)
+        job.refresh_from_db()
+
+    def _error_message(self, error: Exception) -> str:
+        # the job is read back by the client, which only gets the messages meant for it
+        if isinstance(error, APIException):
+            return str(error.detail)[:255]
+        return ErrorMsg.JOB_FAILED
+
+    def _run_in_thread(self, pk: uuid):
+        try:
+            self.run(pk)
+        finally:
+            connections.close_all()
+
+    """
+    Utility functions.
+    """
+    def _make_job_response(self, job: ValidationJob) -> ValidationJobDataClass:
+        return ValidationJobDataClass(
+            id=job.id,
+            question_id=job.problem_id,
+            status=job.status,
+            progress=job.progress,
+            total=job.total,
+            error=job.error,
+            created_at=job.created_at,
+            updated_at=job.updated_at,
+            result=[CreateCauseDataClass(**cause) for cause in job.result]
+        )
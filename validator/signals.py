@@ -0,0 +1,119 @@
+from collections import Counter
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from authentication.models import CustomUser
+from validator import facets
+from validator.models.question import Question
+from validator.models.tag import Tag
+from validator.search import refresh_search_vectors
+
+
+@receiver(post_save, sender=Question)
+def refresh_question_search_vector(sender, instance, raw=False, **kwargs):
+    # fixtures are loaded as is
+    if raw:
+        return
+    refresh_search_vectors(Question.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def refresh_tagged_search_vectors(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # the questions losing the tag are unknown once it is cleared
+        instance._cleared_question_ids = list(instance.question_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        question_ids = [instance.pk]
+    elif action == 'post_clear':
+        question_ids = instance.__dict__.pop('_cleared_question_ids', [])
+    else:
+        question_ids = pk_set
+    refresh_search_vectors(Question.objects.filter(pk__in=question_ids))
+
+
+@receiver(post_save, sender=Tag)
+def refresh_renamed_tag_search_vectors(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    refresh_search_vectors(Question.objects.filter(tags=instance))
+
+
+@receiver(pre_save, sender=Question)
+def remember_question_facets(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._facet_previous = Question.objects.filter(pk=instance.pk).values_list('title', 'user__username').first()
+
+
+@receiver(post_save, sender=Question)
+def count_question_facets(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current = (instance.title, instance.user.username if instance.user_id else None)
+    previous = None if created else instance.__dict__.pop('_facet_previous', None)
+    if previous == current:
+        return
+
+    changes = Counter({(facets.JUDUL, current[0]): 1, (facets.PENGGUNA, current[1]): 1})
+    if previous is not None:
+        changes.update({(facets.JUDUL, previous[0]): -1, (facets.PENGGUNA, previous[1]): -1})
+    facets.apply(changes)
+
+
+@receiver(pre_delete, sender=Question)
+def uncount_question_facets(sender, instance, **kwargs):
+    # the tag links are deleted along the question without an m2m_changed signal
+    changes = Counter({(facets.JUDUL, instance.title): -1})
+    changes.update({(facets.TOPIK, name): -1 for name in instance.tags.values_list('name', flat=True)})
+    username = CustomUser.objects.filter(pk=instance.user_id).values_list('username', flat=True).first()
+    changes[(facets.PENGGUNA, username)] -= 1
+    facets.apply(changes)
+
+
+@receiver(m2m_changed, sender=Question.tags.through)
+def count_tag_facets(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action in ('pre_remove', 'pre_clear'):
+        # only the links that exist are removed, whatever pk_set holds
+        links = sender.objects.filter(**{'tag' if reverse else 'question': instance})
+        if action == 'pre_remove':
+            links = links.filter(**{'question__in' if reverse else 'tag__in': pk_set})
+        instance._facet_removed_tags = Counter(links.values_list('tag__name', flat=True))
+        return
+
+    if action == 'post_add':
+        names = Counter([instance.name] * len(pk_set)) if reverse else Counter(model.objects.filter(pk__in=pk_set).values_list('name', flat=True))
+        facets.apply(Counter({(facets.TOPIK, name): count for name, count in names.items()}))
+    elif action in ('post_remove', 'post_clear'):
+        names = instance.__dict__.pop('_facet_removed_tags', Counter())
+        facets.apply(Counter({(facets.TOPIK, name): -count for name, count in names.items()}))
+
+
+@receiver(pre_save, sender=Tag)
+@receiver(pre_save, sender=CustomUser)
+def remember_facet_name(sender, instance, raw=False, update_fields=None, **kwargs):
+    field = 'name' if sender is Tag else 'username'
+    # e.g. logins only save last_login
+    if raw or instance._state.adding or (update_fields is not None and field not in update_fields):
+        return
+    instance._facet_previous_name = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=CustomUser)
+def rename_facet(sender, instance, created, raw=False, **kwargs):
+    previous = instance.__dict__.pop('_facet_previous_name', None)
+    current = instance.name if sender is Tag else instance.username
+    if created or raw or previous is None or previous == current:
+        return
+    facets.rename(facets.TOPIK if sender is Tag else facets.PENGGUNA, previous, current)
+
+
+@receiver(post_delete, sender=CustomUser)
+def drop_user_facet(sender, instance, **kwargs):
+    # the questions of a deleted user are kept without a user, through an update sending no signal
+    facets.rename(facets.PENGGUNA, instance.username, None)
@@ -0,0 +1,44 @@
+import re
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from authentication.models import CustomUser
+from validator.management.commands.benchmark_validation import percentile
+from validator.models.question import Question
+
+
+class BenchmarkValidationTest(TransactionTestCase):
+    def test_reports_latency_and_calls_per_validation(self):
+        out = StringIO()
+
+        call_command('benchmark_validation', questions=4, causes=2, concurrency=2, latency=0.01, stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('validations: 4', output)
+        self.assertIn('0 failed', output)
+        self.assertIn('p99', output)
+        self.assertIn('LLM calls per validation: 2.00', output)
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(CustomUser.objects.exists())
+
+    def test_streaming_generates_fewer_completion_tokens(self):
+        tokens_per_call = {}
+        for streaming in (False, True):
+            out = StringIO()
+            call_command(
+                'benchmark_validation', questions=2, causes=1, concurrency=1, latency=0, token_latency=0.01,
+                answer='True, the cause explains the problem', streaming=streaming, stdout=out
+            )
+            tokens_per_call[streaming] = float(re.search(r'completion tokens per LLM call: ([\d.]+)', out.getvalue()).group(1))
+
+        self.assertEqual(tokens_per_call[False], 6)
+        self.assertLess(tokens_per_call[True], tokens_per_call[False])
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([], 95), 0)
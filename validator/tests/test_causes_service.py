@@ -1,4 +1,8 @@
-from django.test import TestCase
+import re
+import json
+import threading
+import time
+from django.test import TestCase, override_settings
 from unittest.mock import patch, Mock
 from django.conf import settings
 from validator.services.causes import CausesService
@@ -7,11 +11,17 @@ from validator.models.question import Question
 from validator.enums import ValidationType
 from validator.constants import FeedbackMsg
 import uuid
+import groq
 from requests.exceptions import RequestException
 from validator.exceptions import AIServiceErrorException
+from validator.llm.client import llm_clients
+from validator.llm.cache import verdict_cache
+from validator.llm.transport import llm_transport, CircuitBreaker
+from validator.llm.metrics import metrics
+from utils.similarity import tfidf_vectors, cosine
 
 class CausesServiceTest(TestCase):
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_api_call_positive(self, mock_groq):
         mock_client = Mock()
         mock_chat_completion = Mock()
@@ -42,7 +52,7 @@ class CausesServiceTest(TestCase):
             seed=42
         )
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_api_call_returns_false(self, mock_groq):
         mock_client = Mock()
         mock_chat_completion = Mock()
@@ -73,7 +83,7 @@ class CausesServiceTest(TestCase):
             seed=42
         )
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_api_call_request_exception(self, mock_groq):
         mock_client = Mock()
         mock_client.chat.completions.create.side_effect = RequestException("Network error")
@@ -105,7 +115,7 @@ class CausesServiceTest(TestCase):
 
         self.assertTrue("Failed to call the AI service." in str(context.exception))
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_api_call_negative(self, mock_groq):
         mock_client = Mock()
         mock_client.chat.completions.create.side_effect = Exception("API call failed")
@@ -117,7 +127,7 @@ class CausesServiceTest(TestCase):
         with self.assertRaises(Exception):
             service.api_call(system_message, user_prompt, ValidationType.NORMAL)
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_api_call_forbidden_access(self, mock_groq):
         mock_client = Mock()
         mock_client.chat.completions.create.side_effect = Exception("Unauthorized: Invalid API key")
@@ -160,8 +170,12 @@ class CausesServiceTest(TestCase):
 
     def setUp(self):
         self.problem = Question.objects.create(question="Test problem")
+        llm_clients.reset()
+        llm_transport.reset()
+        verdict_cache.clear()
+        metrics.reset()
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_check_root_cause_with_corruption_category(self, mock_groq):
         mock_client = Mock()
         mock_chat_completion = Mock()
@@ -182,7 +196,7 @@ class CausesServiceTest(TestCase):
         expected_feedback = f"{FeedbackMsg.ROOT_FOUND.format(column='B')} Korupsi Harta."
         self.assertEqual(cause.feedback, expected_feedback, "The feedback should indicate the correct corruption category.")
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_retrieve_feedback_not_cause_1_row(self, mock_groq):
         mock_client = Mock()
         mock_chat_completion = Mock()
@@ -197,7 +211,7 @@ class CausesServiceTest(TestCase):
         service.retrieve_feedback(cause, problem, None)
         self.assertEqual(cause.feedback, FeedbackMsg.FALSE_ROW_1_NOT_CAUSE.format(column='B'))
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_retrieve_feedback_positive_neutral_1_row(self, mock_groq):
         mock_client = Mock()
         mock_chat_completion = Mock()
@@ -212,7 +226,7 @@ class CausesServiceTest(TestCase):
         service.retrieve_feedback(cause, problem, None)
         self.assertEqual(cause.feedback, FeedbackMsg.FALSE_ROW_N_POSITIVE_NEUTRAL.format(column='B', row=1))
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_retrieve_feedback_not_cause_n_row(self, mock_groq):
         mock_client = Mock()
         mock_chat_completion = Mock()
@@ -228,7 +242,7 @@ class CausesServiceTest(TestCase):
         service.retrieve_feedback(cause, problem, prev_cause)
         self.assertEqual(cause.feedback, FeedbackMsg.FALSE_ROW_N_NOT_CAUSE.format(column='B', row=2, prev_row=1))
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_retrieve_feedback_positive_neutral_n_row(self, mock_groq):
         mock_client = Mock()
         mock_chat_completion = Mock()
@@ -244,7 +258,7 @@ class CausesServiceTest(TestCase):
         service.retrieve_feedback(cause, problem, prev_cause)
         self.assertEqual(cause.feedback, FeedbackMsg.FALSE_ROW_N_POSITIVE_NEUTRAL.format(column='B', row=2))
 
-    @patch('validator.services.causes.Groq')
+    @patch('validator.llm.client.Groq')
     def test_retrieve_feedback_similar_previous_n_row(self, mock_groq):
         mock_client = Mock()
         mock_chat_completion = Mock()
@@ -270,4 +284,541 @@ class CausesServiceTest(TestCase):
             service = CausesService()
             service.validate(question_id)
 
-        self.assertTrue(cause1.status)
\ No newline at end of file
+        self.assertTrue(cause1.status)
+
+    def test_validate_runs_columns_concurrently(self):
+        question = Question.objects.create(question='Test question')
+        causes = [
+            Causes.objects.create(problem=question, row=1, column=column, mode='PRIBADI', cause=f'Cause {column}')
+            for column in range(5)
+        ]
+        # every column has to reach the barrier before any of them can answer
+        barrier = threading.Barrier(len(causes), timeout=5)
+
+        def api_call(**kwargs):
+            barrier.wait()
+            return 1
+
+        with patch.object(CausesService, 'api_call', side_effect=api_call):
+            response = CausesService().validate(question.id)
+
+        self.assertEqual([cause.column for cause in response], [0, 1, 2, 3, 4])
+        for cause in causes:
+            cause.refresh_from_db()
+            self.assertTrue(cause.status)
+
+    @override_settings(VALIDATION_MAX_CONCURRENCY=2)
+    def test_validate_respects_concurrency_cap(self):
+        question = Question.objects.create(question='Test question')
+        for column in range(5):
+            Causes.objects.create(problem=question, row=1, column=column, mode='PRIBADI', cause=f'Cause {column}')
+        lock = threading.Lock()
+        running = {'now': 0, 'max': 0}
+
+        def api_call(**kwargs):
+            with lock:
+                running['now'] += 1
+                running['max'] = max(running['max'], running['now'])
+            time.sleep(0.05)
+            with lock:
+                running['now'] -= 1
+            return 1
+
+        with patch.object(CausesService, 'api_call', side_effect=api_call):
+            CausesService().validate(question.id)
+
+        self.assertEqual(running['max'], 2)
+
+    def test_validate_saves_other_columns_when_one_fails(self):
+        question = Question.objects.create(question='Test question')
+        cause1 = Causes.objects.create(problem=question, row=1, column=0, mode='PRIBADI', cause='Cause 1')
+        cause2 = Causes.objects.create(problem=question, row=1, column=1, mode='PRIBADI', cause='Cause 2')
+
+        def api_call(**kwargs):
+            if 'Cause 2' in kwargs['user_prompt']:
+                raise AIServiceErrorException("Failed to call the AI service.")
+            return 1
+
+        with patch.object(CausesService, 'api_call', side_effect=api_call):
+            with self.assertRaises(AIServiceErrorException):
+                CausesService().validate(question.id)
+
+        cause1.refresh_from_db()
+        cause2.refresh_from_db()
+        self.assertTrue(cause1.status)
+        self.assertFalse(cause2.status)
+
+    def _mock_answers(self, mock_groq, *answers):
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = [
+            Mock(choices=[Mock(message=Mock(content=answer))]) for answer in answers
+        ]
+        mock_groq.return_value = mock_client
+        return mock_client
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(VALIDATION_EVALUATION_MODE='combined')
+    def test_combined_mode_root_cause_in_one_call(self, mock_groq):
+        mock_client = self._mock_answers(mock_groq, '{"is_cause": true, "is_root": true, "category": 2, "false_reason": null}')
+        prev_cause = Causes(problem=self.problem, cause="Base Cause", row=1, column=1)
+        cause = Causes(problem=self.problem, cause="Root Cause", row=2, column=1)
+
+        CausesService().evaluate_cause(cause, self.problem, prev_cause)
+
+        self.assertTrue(cause.status)
+        self.assertTrue(cause.root_status)
+        self.assertEqual(cause.feedback, f"{FeedbackMsg.ROOT_FOUND.format(column='B')} Korupsi Tahta.")
+        mock_client.chat.completions.create.assert_called_once()
+        self.assertEqual(mock_client.chat.completions.create.call_args.kwargs['response_format'], {"type": "json_object"})
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(VALIDATION_EVALUATION_MODE='combined')
+    def test_combined_mode_false_cause_in_one_call(self, mock_groq):
+        mock_client = self._mock_answers(mock_groq, '{"is_cause": false, "is_root": false, "category": null, "false_reason": 3}')
+        prev_cause = Causes(problem=self.problem, cause="Base Cause", row=1, column=1)
+        cause = Causes(problem=self.problem, cause="Similar Cause", row=2, column=1)
+
+        CausesService().evaluate_cause(cause, self.problem, prev_cause)
+
+        self.assertFalse(cause.status)
+        self.assertEqual(cause.feedback, FeedbackMsg.FALSE_ROW_N_SIMILAR_PREVIOUS.format(column='B', row=2))
+        mock_client.chat.completions.create.assert_called_once()
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(VALIDATION_EVALUATION_MODE='combined')
+    def test_combined_mode_falls_back_on_malformed_answer(self, mock_groq):
+        mock_client = self._mock_answers(mock_groq, 'True, it is the root cause', 'true', 'true', '3')
+        prev_cause = Causes(problem=self.problem, cause="Base Cause", row=1, column=1)
+        cause = Causes(problem=self.problem, cause="Root Cause", row=2, column=1)
+
+        CausesService().evaluate_cause(cause, self.problem, prev_cause)
+
+        self.assertTrue(cause.root_status)
+        self.assertEqual(cause.feedback, f"{FeedbackMsg.ROOT_FOUND.format(column='B')} Korupsi Cinta.")
+        self.assertEqual(mock_client.chat.completions.create.call_count, 4)
+
+    def test_parse_combined_answer_rejects_invalid_schema(self):
+        service = CausesService()
+
+        self.assertIsNone(service.parse_combined_answer('not json', has_prev_cause=True))
+        self.assertIsNone(service.parse_combined_answer('[true]', has_prev_cause=True))
+        self.assertIsNone(service.parse_combined_answer('{"is_cause": "yes"}', has_prev_cause=True))
+        self.assertIsNone(service.parse_combined_answer('{"is_cause": true}', has_prev_cause=True))
+        self.assertIsNone(service.parse_combined_answer('{"is_cause": true, "is_root": true, "category": true}', has_prev_cause=True))
+        self.assertIsNone(service.parse_combined_answer('{"is_cause": false, "false_reason": 3}', has_prev_cause=False))
+        self.assertEqual(service.parse_combined_answer('{"is_cause": true}', has_prev_cause=False), {'is_cause': True})
+
+    def _create_row_2(self, count):
+        question = Question.objects.create(question='Test question')
+        causes = []
+        for column in range(count):
+            Causes.objects.create(problem=question, row=1, column=column, mode='PRIBADI', cause=f'Base {column}', status=True)
+            causes.append(Causes.objects.create(problem=question, row=2, column=column, mode='PRIBADI', cause=f'Cause {column}'))
+        return question, causes
+
+    def _mock_batch(self, mock_groq, batch_answer):
+        def create(**kwargs):
+            answer = batch_answer if 'response_format' in kwargs else 'false' if 'FALSE' not in kwargs['messages'][1]['content'] else '2'
+            return Mock(choices=[Mock(message=Mock(content=answer))])
+
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = create
+        mock_groq.return_value = mock_client
+        return mock_client
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(VALIDATION_EVALUATION_MODE='batched')
+    def test_batched_mode_evaluates_row_in_one_call(self, mock_groq):
+        question, causes = self._create_row_2(3)
+        mock_client = self._mock_batch(mock_groq, json.dumps({'results': [
+            {'index': 2, 'is_cause': False, 'is_root': False, 'category': None, 'false_reason': 1},
+            {'index': 0, 'is_cause': True, 'is_root': False, 'category': None, 'false_reason': None},
+            {'index': 1, 'is_cause': True, 'is_root': True, 'category': 1, 'false_reason': None},
+        ]}))
+
+        CausesService().validate(question.id)
+
+        for cause in causes:
+            cause.refresh_from_db()
+        self.assertEqual([cause.status for cause in causes], [True, True, False])
+        self.assertEqual([cause.root_status for cause in causes], [False, True, False])
+        self.assertEqual(causes[1].feedback, f"{FeedbackMsg.ROOT_FOUND.format(column='B')} Korupsi Harta.")
+        self.assertEqual(causes[2].feedback, FeedbackMsg.FALSE_ROW_N_NOT_CAUSE.format(column='C', row=2, prev_row=1))
+        mock_client.chat.completions.create.assert_called_once()
+
+    @patch('validator.llm.client.Groq')
+    # fallback calls stay on the test thread, whose transaction holds the cache rows they write
+    @override_settings(VALIDATION_EVALUATION_MODE='batched', VALIDATION_MAX_CONCURRENCY=1)
+    def test_batched_mode_falls_back_when_column_count_differs(self, mock_groq):
+        question, causes = self._create_row_2(3)
+        mock_client = self._mock_batch(mock_groq, json.dumps({'results': [
+            {'index': 0, 'is_cause': True, 'is_root': False, 'category': None, 'false_reason': None},
+        ]}))
+
+        CausesService().validate(question.id)
+
+        for cause in causes:
+            cause.refresh_from_db()
+            self.assertFalse(cause.status)
+            self.assertEqual(cause.feedback, FeedbackMsg.FALSE_ROW_N_POSITIVE_NEUTRAL.format(column='ABCDE'[cause.column], row=2))
+        # one batched call, then the verdict and the false reason of every cause
+        self.assertEqual(mock_client.chat.completions.create.call_count, 1 + 2 * 3)
+
+    @patch('validator.llm.client.Groq')
+    # fallback calls stay on the test thread, whose transaction holds the cache rows they write
+    @override_settings(VALIDATION_EVALUATION_MODE='batched', VALIDATION_MAX_CONCURRENCY=1)
+    def test_batched_mode_falls_back_for_invalid_items_only(self, mock_groq):
+        question, causes = self._create_row_2(2)
+        mock_client = self._mock_batch(mock_groq, json.dumps({'results': [
+            {'index': 0, 'is_cause': True, 'is_root': False, 'category': None, 'false_reason': None},
+            {'index': 1, 'is_cause': 'maybe'},
+        ]}))
+
+        CausesService().validate(question.id)
+
+        for cause in causes:
+            cause.refresh_from_db()
+        self.assertEqual([cause.status for cause in causes], [True, False])
+        self.assertEqual(mock_client.chat.completions.create.call_count, 1 + 2)
+
+    def test_parse_batch_answer_rejects_wrong_indexes(self):
+        service = CausesService()
+        pending = [(Causes(cause='a'), None), (Causes(cause='b'), None)]
+        valid = {'is_cause': True}
+
+        self.assertIsNone(service.parse_batch_answer('[]', pending))
+        self.assertIsNone(service.parse_batch_answer(json.dumps({'results': [dict(valid, index=0), dict(valid, index=0)]}), pending))
+        self.assertIsNone(service.parse_batch_answer(json.dumps({'results': [dict(valid, index=0), dict(valid, index=2)]}), pending))
+        self.assertEqual(service.parse_batch_answer(json.dumps({'results': [dict(valid, index=1), dict(valid, index=0)]}), pending),
+                         {1: dict(valid, index=1), 0: dict(valid, index=0)})
+
+    @override_settings(VALIDATION_SIMILARITY_ENABLED=True)
+    @patch('validator.llm.client.Groq')
+    def test_restated_cause_is_marked_similar_without_llm_call(self, mock_groq):
+        mock_client = self._mock_batch(mock_groq, '')
+        question = Question.objects.create(question='Test question')
+        Causes.objects.create(problem=question, row=1, column=0, mode='PRIBADI', cause='Pegawai tidak digaji dengan layak', status=True)
+        Causes.objects.create(problem=question, row=1, column=1, mode='PRIBADI', cause='Pengawasan lemah', status=True)
+        similar = Causes.objects.create(problem=question, row=2, column=0, mode='PRIBADI', cause='pegawai tidak digaji dengan layak.')
+        other = Causes.objects.create(problem=question, row=2, column=1, mode='PRIBADI', cause='Atasan jarang memeriksa laporan')
+
+        with override_settings(VALIDATION_MAX_CONCURRENCY=1):
+            CausesService().validate(question.id)
+
+        similar.refresh_from_db()
+        self.assertFalse(similar.status)
+        self.assertEqual(similar.feedback, FeedbackMsg.FALSE_ROW_N_SIMILAR_PREVIOUS.format(column='A', row=2))
+        # only the verdict and the false reason of the other cause reach the LLM
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+        for call in mock_client.chat.completions.create.call_args_list:
+            self.assertIn(other.cause, call.kwargs['messages'][1]['content'])
+        self.assertEqual(metrics.get('validation_similarity_checks_total'), 2)
+        self.assertEqual(metrics.get('validation_similarity_short_circuits_total'), 1)
+
+    def test_similarity_prefilter_is_disabled_by_default(self):
+        pending = [(Causes(cause='Gaji rendah', row=2, column=0), Causes(cause='Gaji rendah', row=1, column=0))]
+
+        self.assertEqual(CausesService().prefilter_similar(pending), set())
+
+    @override_settings(VALIDATION_SIMILARITY_ENABLED=True)
+    def test_similarity_of_a_pair_does_not_depend_on_its_row(self):
+        pair = (Causes(cause='Gaji pegawai rendah', row=2, column=0), Causes(cause='Pegawai digaji rendah', row=1, column=0))
+        other = (Causes(cause='Gaji pegawai rendah sekali', row=2, column=1), Causes(cause='Gaji pegawai', row=1, column=1))
+
+        score = cosine(*tfidf_vectors([pair[0].cause, pair[1].cause], n=3))
+
+        # the other pair of the row shares n-grams with this one, a row-wide idf would move its score
+        for threshold, expected in ((score, True), (score + 1e-9, False)):
+            with override_settings(VALIDATION_SIMILARITY_THRESHOLD=threshold, VALIDATION_SIMILARITY_NGRAM=3):
+                self.assertEqual(0 in CausesService().prefilter_similar([pair]), expected)
+                self.assertEqual(0 in CausesService().prefilter_similar([pair, other]), expected)
+
+    @override_settings(VALIDATION_SIMILARITY_ENABLED=True)
+    def test_similarity_threshold_comes_from_settings(self):
+        pending = [(Causes(cause='Gaji pegawai rendah', row=2, column=0), Causes(cause='Pegawai digaji rendah', row=1, column=0))]
+
+        with override_settings(VALIDATION_SIMILARITY_THRESHOLD=0.95):
+            self.assertEqual(CausesService().prefilter_similar(pending), set())
+        with override_settings(VALIDATION_SIMILARITY_THRESHOLD=0.5):
+            self.assertEqual(CausesService().prefilter_similar(pending), {0})
+
+    def _validate_counting_calls(self, question_id, answer=1):
+        with patch.object(CausesService, 'api_call', side_effect=self._answer(answer)) as mock_api_call:
+            CausesService().validate(question_id)
+        return mock_api_call.call_count
+
+    def _answer(self, verdict):
+        # false verdicts are explained as "not the cause"
+        return lambda validation_type, **kwargs: 1 if validation_type == ValidationType.FALSE and verdict == 0 else verdict
+
+    def test_unchanged_causes_are_not_revalidated(self):
+        question = Question.objects.create(question='Test question')
+        for column in range(3):
+            Causes.objects.create(problem=question, row=1, column=column, mode='PRIBADI', cause=f'Penyebab {column}')
+
+        # a false verdict and its reason per cause
+        self.assertEqual(self._validate_counting_calls(question.id, answer=0), 6)
+        self.assertEqual(self._validate_counting_calls(question.id, answer=0), 0)
+
+    def test_only_edited_cause_is_revalidated(self):
+        question = Question.objects.create(question='Test question')
+        causes = [
+            Causes.objects.create(problem=question, row=1, column=column, mode='PRIBADI', cause=f'Penyebab {column}')
+            for column in range(3)
+        ]
+        self._validate_counting_calls(question.id)
+
+        Causes.objects.filter(pk=causes[1].pk).update(cause='Penyebab yang diubah')
+
+        self.assertEqual(self._validate_counting_calls(question.id, answer=0), 2)
+        statuses = list(Causes.objects.filter(problem=question).order_by('column').values_list('status', flat=True))
+        self.assertEqual(statuses, [True, False, True])
+
+    def test_editing_a_parent_revalidates_its_dependants(self):
+        question = Question.objects.create(question='Test question')
+        parents = [
+            Causes.objects.create(problem=question, row=1, column=column, mode='PRIBADI', cause=f'Penyebab {column}')
+            for column in range(2)
+        ]
+        self._validate_counting_calls(question.id)
+        children = [
+            Causes.objects.create(problem=question, row=2, column=column, mode='PRIBADI', cause=f'Akar {column}')
+            for column in range(2)
+        ]
+        self._validate_counting_calls(question.id, answer=0)
+
+        Causes.objects.filter(pk=parents[0].pk).update(cause='Penyebab yang diubah')
+
+        with patch.object(CausesService, 'api_call', side_effect=self._answer(0)) as mock_api_call:
+            CausesService().validate(question.id)
+
+        prompts = [call.kwargs['user_prompt'] for call in mock_api_call.call_args_list]
+        self.assertEqual(len(prompts), 4)
+        self.assertTrue(all('Penyebab yang diubah' in prompt for prompt in prompts))
+        parents[0].refresh_from_db()
+        children[1].refresh_from_db()
+        self.assertFalse(parents[0].status)
+        self.assertEqual(children[1].fingerprint, CausesService().fingerprint(children[1], parents[1], question))
+
+    def test_unusable_answer_is_retried(self):
+        question = Question.objects.create(question='Test question')
+        Causes.objects.create(problem=question, row=1, column=0, mode='PRIBADI', cause='Penyebab')
+
+        self.assertEqual(self._validate_counting_calls(question.id, answer=None), 2)
+        self.assertEqual(self._validate_counting_calls(question.id, answer=None), 2)
+
+    def test_validate_query_count_does_not_grow_with_row_size(self):
+        for count in (2, 5):
+            question = Question.objects.create(question='Test question')
+            for column in range(count):
+                Causes.objects.create(problem=question, row=1, column=column, mode='PRIBADI', cause=f'Penyebab {column}', status=True)
+                Causes.objects.create(problem=question, row=2, column=column, mode='PRIBADI', cause=f'Akar masalah {column}')
+
+            # question, causes, savepoint, bulk update, savepoint release
+            with self.assertNumQueries(5), patch.object(CausesService, 'api_call', side_effect=self._answer(0)):
+                CausesService().validate(question.id)
+
+            self.assertEqual(Causes.objects.filter(problem=question, row=2).exclude(fingerprint='').count(), count)
+
+    def _mock_models(self, mock_groq, answers):
+        def create(**kwargs):
+            answer = answers[(kwargs['model'], kwargs['seed'])]
+            if isinstance(answer, Exception):
+                raise answer
+            return Mock(choices=[Mock(message=Mock(content=answer))])
+
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = create
+        mock_groq.return_value = mock_client
+        return mock_client
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_ROUTES={'normal': 'small-model'}, LLM_CACHE_ENABLED=False)
+    def test_routed_call_answered_by_small_model_when_samples_agree(self, mock_groq):
+        mock_client = self._mock_models(mock_groq, {('small-model', 42): 'True', ('small-model', 43): 'true'})
+
+        result = CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL)
+
+        self.assertEqual(result, 1)
+        calls = sorted(mock_client.chat.completions.create.call_args_list, key=lambda call: call.kwargs['seed'])
+        self.assertEqual([call.kwargs['model'] for call in calls], ['small-model'] * 2)
+        self.assertEqual(calls[1].kwargs['temperature'], 0.7)
+        self.assertEqual(metrics.get('llm_route_answers_total', kind='normal', route='small'), 1)
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_ROUTES={'normal': 'small-model'}, LLM_CACHE_ENABLED=False)
+    def test_routed_call_escalates_when_samples_disagree(self, mock_groq):
+        mock_client = self._mock_models(mock_groq, {
+            ('small-model', 42): 'true',
+            ('small-model', 43): 'false',
+            ('llama-3.3-70b-specdec', 42): 'false',
+        })
+
+        result = CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL)
+
+        self.assertEqual(result, 0)
+        self.assertEqual(mock_client.chat.completions.create.call_count, 3)
+        self.assertEqual(metrics.get('llm_route_escalations_total', kind='normal', reason='disagreement'), 1)
+        self.assertEqual(metrics.snapshot()['llm_route_duration_seconds_count'], [
+            {'labels': {'kind': 'normal', 'route': 'large'}, 'value': 1},
+            {'labels': {'kind': 'normal', 'route': 'small'}, 'value': 1},
+        ])
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_ROUTES={'normal': 'small-model'}, LLM_CACHE_ENABLED=False)
+    def test_routed_call_escalates_unparseable_answer(self, mock_groq):
+        mock_client = self._mock_models(mock_groq, {
+            ('small-model', 42): 'maybe',
+            ('small-model', 43): 'true',
+            ('llama-3.3-70b-specdec', 42): 'true',
+        })
+
+        result = CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL)
+
+        self.assertEqual(result, 1)
+        self.assertEqual(mock_client.chat.completions.create.call_count, 3)
+        self.assertEqual(metrics.get('llm_route_escalations_total', reason='unparseable'), 1)
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_ROUTES={'normal': 'small-model'}, LLM_CACHE_ENABLED=False, LLM_MAX_RETRIES=0, LLM_BREAKER_FAILURES=1)
+    def test_routed_call_escalates_when_small_model_fails(self, mock_groq):
+        self._mock_models(mock_groq, {
+            ('small-model', 42): RequestException('model decommissioned'),
+            ('small-model', 43): RequestException('model decommissioned'),
+            ('llama-3.3-70b-specdec', 42): 'true',
+        })
+
+        self.assertEqual(CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL), 1)
+        self.assertEqual(metrics.get('llm_route_escalations_total', reason='error'), 1)
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_ROUTES={'normal': 'small-model'}, LLM_CACHE_ENABLED=False, LLM_MAX_RETRIES=0, LLM_BREAKER_FAILURES=1)
+    def test_small_model_failures_leave_the_large_model_breaker_closed(self, mock_groq):
+        self._mock_models(mock_groq, {
+            ('small-model', 42): groq.InternalServerError('down', response=Mock(status_code=500), body=None),
+            ('small-model', 43): 'true',
+            ('llama-3.3-70b-specdec', 42): 'true',
+        })
+
+        for _ in range(2):
+            self.assertEqual(CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL), 1)
+
+        self.assertEqual(llm_transport.breaker('small-model').state, CircuitBreaker.OPEN)
+        self.assertEqual(llm_transport.breaker('llama-3.3-70b-specdec').state, CircuitBreaker.CLOSED)
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_ROUTES={'normal': 'small-model'}, LLM_CACHE_ENABLED=False)
+    def test_unrouted_type_goes_to_large_model(self, mock_groq):
+        mock_client = self._mock_models(mock_groq, {('llama-3.3-70b-specdec', 42): '2'})
+
+        result = CausesService().api_call('system', 'Why is it false?', ValidationType.FALSE)
+
+        self.assertEqual(result, 2)
+        mock_client.chat.completions.create.assert_called_once()
+
+    def _mock_stream(self, mock_groq, tokens):
+        mock_stream = Mock()
+        mock_stream.__iter__ = Mock(return_value=iter([
+            Mock(choices=[Mock(delta=Mock(content=token))], x_groq=None) for token in tokens
+        ]))
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = mock_stream
+        mock_groq.return_value = mock_client
+        return mock_client, mock_stream
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_STREAMING=True)
+    def test_streaming_stops_once_the_answer_is_final(self, mock_groq):
+        mock_client, mock_stream = self._mock_stream(mock_groq, ['Tr', 'ue', ', it', ' is', ' not'])
+
+        result = CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL)
+
+        self.assertEqual(result, 1)
+        self.assertTrue(mock_client.chat.completions.create.call_args.kwargs['stream'])
+        mock_stream.close.assert_called_once()
+        self.assertEqual(metrics.get('llm_stream_early_exits_total'), 1)
+        # the prefix is cached and parses like the whole answer
+        self.assertEqual(CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL), 1)
+        mock_client.chat.completions.create.assert_called_once()
+
+    @patch('validator.llm.client.Groq')
+    def test_streamed_answers_parse_like_blocking_ones(self, mock_groq):
+        fixtures = [
+            (ValidationType.NORMAL, 'False, not true'),
+            (ValidationType.NORMAL, 'False.'),
+            (ValidationType.ROOT, 'untrue'),
+            (ValidationType.ROOT, 'True'),
+            (ValidationType.FALSE, '2, or maybe 1'),
+            (ValidationType.FALSE, '3'),
+            (ValidationType.FALSE, 'it depends'),
+        ]
+        for validation_type, answer in fixtures:
+            with self.subTest(answer=answer):
+                metrics.reset()
+                llm_clients.reset()
+                mock_groq.return_value = Mock(chat=Mock(completions=Mock(create=Mock(
+                    return_value=Mock(choices=[Mock(message=Mock(content=answer))])
+                ))))
+                with override_settings(LLM_STREAMING=False, LLM_CACHE_ENABLED=False):
+                    blocking = CausesService().api_call('system', answer, validation_type)
+
+                llm_clients.reset()
+                self._mock_stream(mock_groq, list(answer))
+                with override_settings(LLM_STREAMING=True, LLM_CACHE_ENABLED=False):
+                    streamed = CausesService().api_call('system', answer, validation_type)
+
+                self.assertEqual(streamed, blocking)
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_STREAMING=True)
+    def test_streaming_unparseable_answer_is_read_to_the_end(self, mock_groq):
+        mock_client, mock_stream = self._mock_stream(mock_groq, ['it', ' depends'])
+
+        result = CausesService().api_call('system', 'Why is it false?', ValidationType.FALSE)
+
+        self.assertIsNone(result)
+        mock_stream.close.assert_called_once()
+        self.assertEqual(metrics.get('llm_stream_early_exits_total'), 0)
+
+    @override_settings(VALIDATION_SCOPE='tree')
+    def test_tree_scope_schedules_causes_after_their_parent(self):
+        question = Question.objects.create(question='Test question')
+        for row in range(1, 4):
+            for column in range(2):
+                Causes.objects.create(problem=question, row=row, column=column, mode='PRIBADI', cause=f'Sebab {row}-{column}')
+        lock = threading.Lock()
+        calls = {}
+
+        def api_call(user_prompt, validation_type, **kwargs):
+            cause = re.search(r"'([^']*)'", user_prompt).group(1)
+            started = time.monotonic()
+            time.sleep(0.05)
+            with lock:
+                calls.setdefault(cause, []).append((started, time.monotonic()))
+            return 1 if validation_type == ValidationType.NORMAL else 0
+
+        with patch.object(CausesService, 'api_call', side_effect=api_call):
+            started = time.monotonic()
+            response = CausesService().validate(question.id)
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(len(response), 6)
+        self.assertTrue(all(cause.status for cause in response))
+        for row in range(2, 4):
+            for column in range(2):
+                parent_finished = max(end for _, end in calls[f'Sebab {row - 1}-{column}'])
+                self.assertGreaterEqual(min(start for start, _ in calls[f'Sebab {row}-{column}']), parent_finished)
+        # one round trip for row 1, verdict and root check for rows 2 and 3, columns side by side,
+        # evaluating the causes one after the other takes twice as long
+        self.assertLess(elapsed, 0.05 * (1 + 2 + 2) * 1.6)
+
+    def test_row_scope_leaves_unvalidated_lower_rows_alone(self):
+        question = Question.objects.create(question='Test question')
+        Causes.objects.create(problem=question, row=1, column=0, mode='PRIBADI', cause='Sebab 1')
+        Causes.objects.create(problem=question, row=2, column=0, mode='PRIBADI', cause='Sebab 2')
+
+        with patch.object(CausesService, 'api_call', side_effect=self._answer(0)) as mock_api_call:
+            response = CausesService().validate(question.id)
+
+        self.assertEqual([cause.row for cause in response], [2])
+        self.assertEqual(mock_api_call.call_count, 2)
@@ -1,14 +1,24 @@
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
-from unittest.mock import patch
+from django.test import override_settings
+from unittest.mock import patch, Mock
+from django.core.cache import cache
+from rest_framework.throttling import ScopedRateThrottle
+from validator.llm.cache import verdict_cache
+from validator.llm.client import llm_clients
 from validator.models.causes import Causes
 from validator.models.question import Question
+from validator.models.validation_job import ValidationJob
 from validator.services.causes import CausesService
 from authentication.models import CustomUser
 from validator.serializers import BaseCauses
 import uuid
 import json
+import asyncio
+import threading
+from utils.streaming import to_async_iterator
+from validator.exceptions import AIServiceErrorException
 
 class CausesViewTest(APITestCase):
     def setUp(self):
@@ -104,6 +114,9 @@ class CausesViewTest(APITestCase):
         self.patch_url = 'validator:patch_causes'
         self.validate_url = 'validator:validate_causes'
         self.get_list_url = 'validator:get_causes_list'
+        self.job_url = 'validator:get_validation_job'
+        self.stream_url = 'validator:validate_causes_stream'
+        self.prevalidate_url = 'validator:prevalidate_cause'
 
     def test_create_cause_positive(self):
         self.valid_data = {
@@ -206,19 +219,21 @@ class CausesViewTest(APITestCase):
     '''
     validator unittest section
     '''
+    @override_settings(VALIDATION_JOB_BACKEND='inline')
     def test_rca_row_equal_1(self):
         with patch.object(CausesService, 'api_call', return_value=True):
             url = reverse(self.validate_url, kwargs={'question_id': self.question_uuid1})
             response = self.client.patch(url)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.causes1.refresh_from_db()
 
         self.assertTrue(self.causes1.status)
 
+    @override_settings(VALIDATION_JOB_BACKEND='inline')
     def test_rca_row_greater_than_1(self):
         question_id = uuid.uuid4()
-        question = Question.objects.create(pk=question_id, question='Test question')
+        question = Question.objects.create(pk=question_id, user=self.user1, question='Test question')
 
         Causes.objects.create(problem=question, row=1, column=1, mode='PRIBADI', cause='Cause 1', status=True)
         cause2 = Causes.objects.create(problem=question, row=2, column=1, mode='PRIBADI', cause='Cause 2')
@@ -227,10 +242,11 @@ class CausesViewTest(APITestCase):
             url = reverse(self.validate_url, kwargs={'question_id': question_id})
             response = self.client.patch(url)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         cause2.refresh_from_db()
         self.assertTrue(cause2.status)
 
+    @override_settings(VALIDATION_JOB_BACKEND='inline')
     def test_rca_row_not_updated(self):
         Causes.objects.create(problem=Question.objects.get(pk=self.question_uuid1), row=2, column=1, mode='PRIBADI', cause='different cause')
 
@@ -238,9 +254,167 @@ class CausesViewTest(APITestCase):
             url = reverse(self.validate_url, kwargs={'question_id': self.question_uuid1})
             response = self.client.patch(url)
         
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertFalse(Causes.objects.get(problem=Question.objects.get(pk=self.question_uuid1), row=2).status)
 
+    @override_settings(VALIDATION_JOB_BACKEND='inline')
+    def test_validation_job_returns_causes(self):
+        with patch.object(CausesService, 'api_call', return_value=True):
+            response = self.client.patch(reverse(self.validate_url, kwargs={'question_id': self.question_uuid1}))
+
+        url = reverse(self.job_url, kwargs={'question_id': self.question_uuid1, 'pk': response.data['id']})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], ValidationJob.StatusChoices.SUCCEEDED)
+        self.assertEqual(response.data['progress'], response.data['total'])
+        self.assertEqual({cause['id'] for cause in response.data['result']}, {str(self.causes_uuid), str(self.causes_uuid3)})
+        self.assertTrue(all(cause['status'] for cause in response.data['result']))
+
+    @override_settings(VALIDATION_JOB_BACKEND='thread')
+    def test_validation_job_is_dispatched_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.patch(reverse(self.validate_url, kwargs={'question_id': self.question_uuid1}))
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], ValidationJob.StatusChoices.PENDING)
+        self.assertEqual(len(callbacks), 1)
+
+    def test_validate_nonexistent_question(self):
+        response = self.client.patch(reverse(self.validate_url, kwargs={'question_id': uuid.uuid4()}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_validate_question_of_another_user_is_forbidden(self):
+        response = self.client.patch(reverse(self.validate_url, kwargs={'question_id': self.question_uuid2}))
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(ValidationJob.objects.filter(problem_id=self.question_uuid2).exists())
+
+    def test_get_validation_job_not_found(self):
+        url = reverse(self.job_url, kwargs={'question_id': self.question_uuid1, 'pk': uuid.uuid4()})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_validation_job_forbidden(self):
+        job = ValidationJob.objects.create(problem=self.question2, user=self.user2)
+
+        url = reverse(self.job_url, kwargs={'question_id': self.question_uuid2, 'pk': job.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(PREVALIDATION_BACKEND='inline', VALIDATION_JOB_BACKEND='inline', VALIDATION_MAX_CONCURRENCY=1, LLM_CACHE_ENABLED=True)
+    def test_prevalidated_draft_is_validated_from_cache(self):
+        llm_clients.reset()
+        verdict_cache.clear()
+        question = Question.objects.create(user=self.user1, question='Test question')
+        Causes.objects.create(problem=question, row=1, column=0, mode='PRIBADI', cause='Sebab 1', status=True)
+
+        with patch('validator.llm.client.Groq') as mock_groq:
+            # parses as a false verdict and as the "not the cause" reason
+            mock_groq.return_value.chat.completions.create.return_value.choices = [Mock(message=Mock(content='false 1'))]
+            url = reverse(self.prevalidate_url, kwargs={'question_id': question.id})
+            response = self.client.post(url, {'row': 2, 'column': 0, 'cause': 'Sebab 2'}, format='json')
+
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.data['status'], 'done')
+            self.assertFalse(Causes.objects.filter(problem=question, row=2).exists())
+            prevalidation_calls = mock_groq.return_value.chat.completions.create.call_count
+
+            Causes.objects.create(problem=question, row=2, column=0, mode='PRIBADI', cause='Sebab 2')
+            self.client.patch(reverse(self.validate_url, kwargs={'question_id': question.id}))
+
+        self.assertGreater(prevalidation_calls, 0)
+        self.assertEqual(mock_groq.return_value.chat.completions.create.call_count, prevalidation_calls)
+        self.assertFalse(Causes.objects.get(problem=question, row=2).status)
+
+    def test_prevalidate_without_previous_cause(self):
+        url = reverse(self.prevalidate_url, kwargs={'question_id': self.question_uuid1})
+        response = self.client.post(url, {'row': 3, 'column': 1, 'cause': 'Sebab 3'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_prevalidate_question_of_another_user(self):
+        url = reverse(self.prevalidate_url, kwargs={'question_id': self.question_uuid2})
+        response = self.client.post(url, {'row': 1, 'column': 1, 'cause': 'Sebab 1'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(PREVALIDATION_BACKEND='inline')
+    def test_prevalidate_is_throttled_per_user(self):
+        cache.clear()
+        url = reverse(self.prevalidate_url, kwargs={'question_id': self.question_uuid1})
+
+        with patch.object(ScopedRateThrottle, 'THROTTLE_RATES', {'prevalidate': '2/min'}), \
+                patch.object(CausesService, 'api_call', return_value=1):
+            responses = [self.client.post(url, {'row': 1, 'column': 1, 'cause': f'Sebab {index}'}, format='json') for index in range(3)]
+
+        self.assertEqual([response.status_code for response in responses], [202, 202, 429])
+
+    def _stream_events(self, response):
+        events = []
+        for message in b''.join(response.streaming_content).decode().strip().split('\n\n'):
+            event, data = message.split('\n')
+            events.append((event.removeprefix('event: '), json.loads(data.removeprefix('data: '))))
+        return events
+
+    def test_validate_stream_emits_event_per_cause(self):
+        with patch.object(CausesService, 'api_call', return_value=1):
+            url = reverse(self.stream_url, kwargs={'question_id': self.question_uuid1})
+            response = self.client.patch(url, HTTP_ACCEPT='text/event-stream')
+            events = self._stream_events(response)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual([event for event, _ in events], ['cause', 'cause', 'summary'])
+        self.assertEqual({data['id'] for _, data in events[:2]}, {str(self.causes_uuid), str(self.causes_uuid3)})
+        self.assertEqual(events[2][1]['succeeded'], 2)
+        self.assertIsNotNone(events[2][1]['time_to_first_result_ms'])
+        self.causes1.refresh_from_db()
+        self.assertTrue(self.causes1.status)
+
+    def test_validate_stream_reports_failed_cause(self):
+        def api_call(**kwargs):
+            raise AIServiceErrorException('Failed to call the AI service.')
+
+        with patch.object(CausesService, 'api_call', side_effect=api_call):
+            url = reverse(self.stream_url, kwargs={'question_id': self.question_uuid1})
+            events = self._stream_events(self.client.patch(url, HTTP_ACCEPT='text/event-stream'))
+
+        self.assertEqual([event for event, _ in events], ['error', 'error', 'summary'])
+        self.assertEqual(events[0][1]['detail'], 'Failed to call the AI service.')
+        self.assertEqual(events[2][1]['failed'], 2)
+
+    def test_validate_stream_nonexistent_question(self):
+        url = reverse(self.stream_url, kwargs={'question_id': uuid.uuid4()})
+        response = self.client.patch(url, HTTP_ACCEPT='text/event-stream')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(response.content.startswith(b'event: error'))
+
+    def test_validate_stream_forbidden(self):
+        url = reverse(self.stream_url, kwargs={'question_id': self.question_uuid2})
+        with patch.object(CausesService, 'api_call') as mock_api_call:
+            response = self.client.patch(url, HTTP_ACCEPT='text/event-stream')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        mock_api_call.assert_not_called()
+
+    def test_stream_is_drained_on_a_thread_under_asgi(self):
+        def events():
+            yield b'first'
+            yield threading.current_thread().name.encode()
+
+        async def collect():
+            return [item async for item in to_async_iterator(events())]
+
+        first, thread_name = asyncio.run(collect())
+
+        self.assertEqual(first, b'first')
+        self.assertNotEqual(thread_name.decode(), threading.current_thread().name)
+
     '''
     Admin Role Tests
     '''
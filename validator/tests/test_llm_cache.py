@@ -0,0 +1,181 @@
+from datetime import timedelta
+from unittest.mock import patch, Mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from authentication.models import CustomUser
+from validator.enums import ValidationType
+from validator.llm.cache import verdict_cache
+from validator.llm.client import llm_clients
+from validator.llm.metrics import metrics
+from validator.llm.transport import llm_transport
+from validator.models.llm_verdict import LLMVerdict
+from validator.services.causes import CausesService
+
+
+class VerdictCacheTest(TestCase):
+    def setUp(self):
+        llm_clients.reset()
+        llm_transport.reset()
+        verdict_cache.clear()
+        metrics.reset()
+        self.system_message = "You are an AI model."
+        self.user_prompt = "Is 'Example cause' the cause of 'Example problem'? Answer only with True/False"
+
+    def _mock_groq(self, mock_groq, content):
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = Mock(choices=[Mock(message=Mock(content=content))])
+        mock_groq.return_value = mock_client
+        return mock_client
+
+    @patch('validator.llm.client.Groq')
+    def test_repeated_call_is_served_from_memory(self, mock_groq):
+        mock_client = self._mock_groq(mock_groq, 'true')
+
+        first = CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+        second = CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+
+        self.assertEqual(first, 1)
+        self.assertEqual(second, 1)
+        mock_client.chat.completions.create.assert_called_once()
+        self.assertEqual(verdict_cache.stats()['memory_hits'], 1)
+        self.assertEqual(verdict_cache.stats()['misses'], 1)
+
+    @patch('validator.llm.client.Groq')
+    def test_database_tier_survives_memory_loss(self, mock_groq):
+        mock_client = self._mock_groq(mock_groq, 'false')
+
+        CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+        verdict_cache.clear()
+        result = CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+
+        self.assertEqual(result, 0)
+        mock_client.chat.completions.create.assert_called_once()
+        self.assertEqual(verdict_cache.stats()['db_hits'], 1)
+
+    @patch('validator.llm.client.Groq')
+    def test_call_without_cache_asks_again_and_refreshes_the_entry(self, mock_groq):
+        mock_client = self._mock_groq(mock_groq, 'true')
+        CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+
+        mock_client.chat.completions.create.return_value = Mock(choices=[Mock(message=Mock(content='false'))])
+        fresh = CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL, use_cache=False)
+        cached = CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+
+        self.assertEqual(fresh, 0)
+        self.assertEqual(cached, 0)
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+    @patch('validator.llm.client.Groq')
+    def test_expired_entry_is_a_miss(self, mock_groq):
+        mock_client = self._mock_groq(mock_groq, 'true')
+
+        CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+        verdict_cache.clear()
+        LLMVerdict.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+    @patch('validator.llm.client.Groq')
+    def test_unparseable_answer_is_not_cached(self, mock_groq):
+        mock_client = self._mock_groq(mock_groq, 'maybe')
+
+        result = CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+        CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+
+        self.assertIsNone(result)
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+        self.assertFalse(LLMVerdict.objects.exists())
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_CACHE_ENABLED=False)
+    def test_disabled_cache_always_calls(self, mock_groq):
+        mock_client = self._mock_groq(mock_groq, 'true')
+
+        CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+        CausesService().api_call(self.system_message, self.user_prompt, ValidationType.NORMAL)
+
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+    def test_key_depends_on_sampling_parameters(self):
+        key = verdict_cache.make_key(model='a', temperature=0.1, seed=42)
+
+        self.assertEqual(key, verdict_cache.make_key(seed=42, temperature=0.1, model='a'))
+        self.assertNotEqual(key, verdict_cache.make_key(model='a', temperature=0.2, seed=42))
+        self.assertNotEqual(key, verdict_cache.make_key(model='b', temperature=0.1, seed=42))
+
+    @override_settings(LLM_CACHE_MAX_ENTRIES=2)
+    def test_memory_tier_evicts_least_recently_used(self):
+        for key in ('a', 'b', 'c'):
+            verdict_cache.set(key, key, 'model')
+        LLMVerdict.objects.all().delete()
+
+        self.assertIsNone(verdict_cache.get('a'))
+        self.assertEqual(verdict_cache.get('b'), 'b')
+        self.assertEqual(verdict_cache.get('c'), 'c')
+
+    @override_settings(LLM_CACHE_DB_MAX_ENTRIES=2)
+    def test_evict_trims_database_tier(self):
+        now = timezone.now()
+        for index, key in enumerate(('a', 'b', 'c')):
+            LLMVerdict.objects.create(key=key, model='model', answer='true', expires_at=now + timedelta(days=1))
+            LLMVerdict.objects.filter(key=key).update(last_used_at=now - timedelta(hours=1) + timedelta(seconds=index))
+        LLMVerdict.objects.create(key='expired', model='model', answer='true', expires_at=now - timedelta(days=1))
+
+        verdict_cache.evict()
+
+        self.assertEqual(set(LLMVerdict.objects.values_list('key', flat=True)), {'b', 'c'})
+
+
+    @override_settings(LLM_CACHE_DB_MAX_ENTRIES=2)
+    def test_evict_keeps_the_recently_read_rows(self):
+        now = timezone.now()
+        for index, key in enumerate(('a', 'b', 'c')):
+            LLMVerdict.objects.create(key=key, model='model', answer='true', expires_at=now + timedelta(days=1))
+            LLMVerdict.objects.filter(key=key).update(last_used_at=now - timedelta(hours=1) + timedelta(seconds=index))
+
+        # the oldest row is read from the database tier, the next one only from memory
+        self.assertEqual(verdict_cache.get('a'), 'true')
+        verdict_cache._remember('b', 'true', now + timedelta(days=1), now - timedelta(hours=1))
+        self.assertEqual(verdict_cache.get('b'), 'true')
+        verdict_cache.evict()
+
+        self.assertEqual(set(LLMVerdict.objects.values_list('key', flat=True)), {'a', 'b'})
+
+class LLMStatsViewTest(APITestCase):
+    def setUp(self):
+        self.url = reverse('validator:llm_stats')
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'adminpassword')
+        self.user = CustomUser.objects.create_user('user', 'user@example.com', 'userpassword')
+        metrics.reset()
+
+    def test_admin_can_read_stats(self):
+        metrics.increment('llm_cache_requests_total', tier='memory', result='hit')
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['cache']['memory_hits'], 1)
+        self.assertIn('llm_cache_requests_total', response.data['counters'])
+
+    def test_similarity_short_circuit_rate(self):
+        metrics.increment('validation_similarity_checks_total', 4)
+        metrics.increment('validation_similarity_short_circuits_total')
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['similarity']['short_circuit_rate'], 0.25)
+
+    def test_regular_user_is_forbidden(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
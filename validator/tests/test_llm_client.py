@@ -0,0 +1,104 @@
+import threading
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+
+from validator.llm.client import llm_clients
+from validator.llm.stub_server import StubLLMServer
+
+
+@override_settings(GROQ_API_KEY='test')
+class LLMClientManagerTest(TestCase):
+    def setUp(self):
+        llm_clients.reset()
+        self.stub = StubLLMServer()
+        self.base_url = self.stub.start()
+
+    def tearDown(self):
+        llm_clients.reset()
+        self.stub.stop()
+
+    def _complete(self):
+        return llm_clients.get().chat.completions.create(
+            messages=[{'role': 'user', 'content': 'prompt'}],
+            model='llama-3.3-70b-specdec',
+        )
+
+    def test_client_is_reused(self):
+        with override_settings(GROQ_BASE_URL=self.base_url):
+            self.assertIs(llm_clients.get(), llm_clients.get())
+
+    def test_connections_are_kept_alive(self):
+        with override_settings(GROQ_BASE_URL=self.base_url):
+            for _ in range(5):
+                completion = self._complete()
+
+        self.assertEqual(completion.choices[0].message.content, 'true')
+        self.assertEqual(self.stub.requests, 5)
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_client_is_rebuilt_after_fork(self):
+        with override_settings(GROQ_BASE_URL=self.base_url):
+            parent_client = llm_clients.get()
+            with patch('validator.llm.client.os.getpid', return_value=-1):
+                child_client = llm_clients.get()
+
+        self.assertIsNot(parent_client, child_client)
+
+    @override_settings(LLM_MAX_CONNECTIONS=3, LLM_MAX_KEEPALIVE_CONNECTIONS=2)
+    def test_pool_limits_come_from_settings(self):
+        with override_settings(GROQ_BASE_URL=self.base_url):
+            pool = llm_clients.get()._client._transport._pool
+
+        self.assertEqual(pool._max_connections, 3)
+        self.assertEqual(pool._max_keepalive_connections, 2)
+
+
+@override_settings(GROQ_API_KEY='test')
+class StubLLMServerTest(TestCase):
+    def setUp(self):
+        llm_clients.reset()
+
+    def tearDown(self):
+        llm_clients.reset()
+
+    def test_scripted_answers_match_the_prompt(self):
+        stub = StubLLMServer(answer='false', script=[('root cause', 'Harta')])
+
+        self.assertEqual(stub.answer_for({'messages': [{'role': 'user', 'content': 'Is this the ROOT CAUSE?'}]}), 'Harta')
+        self.assertEqual(stub.answer_for({'messages': [{'role': 'user', 'content': 'Is this the cause?'}]}), 'false')
+        stub.stop()
+
+    def test_latency_distributions_keep_the_mean(self):
+        for distribution in StubLLMServer.DISTRIBUTIONS:
+            stub = StubLLMServer(latency=0.2, distribution=distribution)
+            samples = [stub.sample_latency() for _ in range(5000)]
+
+            self.assertAlmostEqual(sum(samples) / len(samples), 0.2, delta=0.02, msg=distribution)
+            stub.stop()
+
+    def test_unknown_distribution_is_rejected(self):
+        with self.assertRaises(ValueError):
+            StubLLMServer(distribution='gaussian')
+
+    def test_peak_concurrent_requests_are_counted(self):
+        stub = StubLLMServer(latency=0.2)
+        base_url = stub.start()
+
+        with override_settings(GROQ_BASE_URL=base_url):
+            threads = [threading.Thread(target=_complete) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        stub.stop()
+
+        self.assertEqual(stub.requests, 3)
+        self.assertEqual(stub.peak_in_flight, 3)
+        self.assertEqual(stub.in_flight, 0)
+
+
+def _complete():
+    return llm_clients.get().chat.completions.create(
+        messages=[{'role': 'user', 'content': 'prompt'}],
+        model='llama-3.3-70b-specdec',
+    )
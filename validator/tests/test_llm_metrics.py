@@ -0,0 +1,193 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from unittest.mock import patch, Mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from validator.enums import ValidationType
+from validator.llm.cache import verdict_cache
+from validator.llm.client import llm_clients
+from validator.llm.metrics import MetricsRegistry, metrics, _process_key
+from validator.llm.transport import llm_transport
+from validator.services.causes import CausesService
+
+
+class MetricsRegistryTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.override = override_settings(METRICS_DIR=self.directory)
+        self.override.enable()
+        self.registry = MetricsRegistry()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.directory)
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.01, 0.2, 3):
+            self.registry.histogram('latency_seconds', value, buckets=(0.1, 1), kind='normal')
+
+        text = self.registry.render_prometheus()
+
+        self.assertIn('# TYPE latency_seconds histogram', text)
+        self.assertIn('latency_seconds_bucket{kind="normal",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{kind="normal",le="1"} 2', text)
+        self.assertIn('latency_seconds_bucket{kind="normal",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{kind="normal"} 3', text)
+
+    def test_counter_types(self):
+        self.registry.increment('calls_total', kind='root')
+        self.registry.increment('queue_depth', 2)
+
+        text = self.registry.render_prometheus()
+
+        self.assertIn('# TYPE calls_total counter\ncalls_total{kind="root"} 1', text)
+        self.assertIn('# TYPE queue_depth gauge\nqueue_depth 2', text)
+
+    def test_aggregate_merges_live_workers_and_archives_exited_ones(self):
+        self.registry.increment('calls_total', kind='root')
+        worker = MetricsRegistry()
+        worker.increment('calls_total', 2, kind='root')
+        worker.increment('queue_depth', 4)
+        worker.histogram('latency_seconds', 0.2, buckets=(1,))
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        for key in (_process_key(os.getppid()), _process_key(exited.pid)):
+            with open(os.path.join(self.directory, f'metrics-{key}.json'), 'w') as file:
+                json.dump(worker.dump(), file)
+
+        aggregated = self.registry.aggregate()
+
+        self.assertEqual(aggregated.get('calls_total', kind='root'), 5)
+        self.assertEqual(aggregated.get('queue_depth'), 4)
+        self.assertIn('latency_seconds_count 2', aggregated.render_prometheus())
+        self.assertFalse(os.path.exists(os.path.join(self.directory, f'metrics-{_process_key(exited.pid)}.json')))
+
+        # the totals of the exited worker do not go down once its file is gone
+        aggregated = self.registry.aggregate()
+        self.assertEqual(aggregated.get('calls_total', kind='root'), 5)
+
+    def test_file_of_a_recycled_pid_is_archived(self):
+        worker = MetricsRegistry()
+        worker.increment('calls_total', 2)
+        # the parent process runs, but not the one that wrote this file under its pid
+        pid, _, started = _process_key(os.getppid()).partition('-')
+        path = os.path.join(self.directory, f'metrics-{pid}-{int(started) - 1}.json')
+        with open(path, 'w') as file:
+            json.dump(worker.dump(), file)
+
+        aggregated = self.registry.aggregate()
+
+        self.assertEqual(aggregated.get('calls_total'), 2)
+        self.assertFalse(os.path.exists(path))
+
+    def test_aggregate_flushes_the_values_of_its_process(self):
+        self.registry.increment('calls_total')
+        self.registry.increment('calls_total')
+
+        self.registry.aggregate()
+
+        with open(os.path.join(self.directory, f'metrics-{_process_key(os.getpid())}.json')) as file:
+            self.assertEqual(json.load(file)['counters'], [['calls_total', [], 2]])
+
+    def test_concurrent_flushes_leave_a_complete_file(self):
+        for index in range(50):
+            self.registry.increment('calls_total', kind=str(index))
+        threads = [threading.Thread(target=self.registry.flush) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with open(os.path.join(self.directory, f'metrics-{_process_key(os.getpid())}.json')) as file:
+            self.assertEqual(len(json.load(file)['counters']), 50)
+        self.assertEqual([name for name in os.listdir(self.directory) if name.endswith('.tmp')], [])
+
+    @override_settings(METRICS_FLUSH_INTERVAL=0)
+    def test_updates_are_flushed(self):
+        self.registry.increment('calls_total')
+
+        with open(os.path.join(self.directory, f'metrics-{_process_key(os.getpid())}.json')) as file:
+            self.assertEqual(json.load(file)['counters'], [['calls_total', [], 1]])
+
+
+class LLMCallInstrumentationTest(TestCase):
+    def setUp(self):
+        llm_clients.reset()
+        llm_transport.reset()
+        verdict_cache.clear()
+        metrics.reset()
+
+    def _mock_groq(self, mock_groq, content='true'):
+        mock_client = Mock()
+        usage = Mock(prompt_tokens=40, completion_tokens=1)
+        mock_client.chat.completions.create.return_value = Mock(choices=[Mock(message=Mock(content=content))], usage=usage)
+        mock_groq.return_value = mock_client
+        return mock_client
+
+    @patch('validator.llm.client.Groq')
+    def test_latency_tokens_and_cache_hits_per_validation_type(self, mock_groq):
+        self._mock_groq(mock_groq)
+
+        for _ in range(2):
+            CausesService().api_call('system', 'Is it the root cause?', ValidationType.ROOT)
+
+        self.assertEqual(metrics.get('llm_calls_total', kind='root', source='llm'), 1)
+        self.assertEqual(metrics.get('llm_calls_total', kind='root', source='cache'), 1)
+        self.assertEqual(metrics.get('llm_tokens_total', kind='root', type='prompt'), 40)
+        self.assertEqual(metrics.get('llm_tokens_total', kind='root', type='completion'), 1)
+        self.assertEqual(metrics.snapshot()['llm_call_duration_seconds_count'], [{'labels': {'kind': 'root'}, 'value': 1}])
+
+    @patch('validator.llm.client.Groq')
+    def test_errors_are_counted(self, mock_groq):
+        self._mock_groq(mock_groq).chat.completions.create.side_effect = ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL)
+
+        self.assertEqual(metrics.get('llm_errors_total', kind='normal', error='ValueError'), 1)
+
+    @patch('validator.llm.client.Groq')
+    def test_call_is_traced_as_sentry_span(self, mock_groq):
+        self._mock_groq(mock_groq)
+
+        with patch('validator.services.causes.sentry_sdk.start_span') as mock_start_span:
+            CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL)
+
+        mock_start_span.assert_called_once_with(op='llm.call', description='normal')
+        mock_start_span.return_value.__enter__.return_value.set_data.assert_any_call('tokens.prompt', 40)
+
+
+class LLMMetricsViewTest(APITestCase):
+    def setUp(self):
+        self.url = reverse('validator:llm_metrics')
+        metrics.reset()
+
+    @override_settings(METRICS_TOKEN='secret', METRICS_DIR=None)
+    def test_exports_prometheus_text(self):
+        metrics.increment('llm_calls_total', kind='normal', source='llm')
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(b'llm_calls_total{kind="normal",source="llm"} 1', response.content)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_wrong_token_is_forbidden(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_closed_without_token(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,92 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from validator.exceptions import AIServiceErrorException
+from validator.llm.metrics import metrics
+from validator.llm.rate_limit import rate_limiter, take, estimate_tokens
+from validator.models.llm_rate_bucket import LLMRateBucket
+
+
+class TokenBucketTest(TestCase):
+    def setUp(self):
+        self.needs = {'requests': (1, 2, 1)}
+
+    def test_full_bucket_grants_until_empty(self):
+        state = {}
+
+        self.assertEqual(take(state, self.needs, 0), 0)
+        self.assertEqual(take(state, self.needs, 0), 0)
+        self.assertEqual(take(state, self.needs, 0), 1)
+
+    def test_bucket_refills_over_time(self):
+        state = {'requests': [0, 0]}
+
+        self.assertEqual(take(state, self.needs, 0.5), 0.5)
+        self.assertEqual(take(state, self.needs, 1), 0)
+
+    def test_nothing_is_taken_unless_every_bucket_allows(self):
+        state = {'requests': [2, 0], 'tokens': [10, 0]}
+        needs = {'requests': (1, 2, 1), 'tokens': (50, 100, 10)}
+
+        self.assertEqual(take(state, needs, 0), 4)
+        self.assertEqual(state['requests'][0], 2)
+
+    def test_estimate_tokens(self):
+        request = {'messages': [{'role': 'user', 'content': 'x' * 40}], 'max_tokens': 50}
+
+        self.assertEqual(estimate_tokens(request), 60)
+
+
+class RateLimiterTest(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.request = {'messages': [{'role': 'user', 'content': 'prompt'}], 'max_tokens': 50}
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_disabled_by_default(self):
+        with patch('validator.llm.rate_limit.time.sleep') as mock_sleep:
+            for _ in range(100):
+                rate_limiter.acquire(self.request)
+
+        mock_sleep.assert_not_called()
+        self.assertFalse(rate_limiter.enabled)
+
+    def _acquire_over_budget(self):
+        with patch('validator.llm.rate_limit.time.sleep') as mock_sleep:
+            rate_limiter.acquire(self.request)
+            rate_limiter.acquire(self.request)
+            with self.assertRaises(AIServiceErrorException):
+                rate_limiter.acquire(self.request)
+        mock_sleep.assert_not_called()
+
+    @override_settings(LLM_RATE_LIMIT_BACKEND='file', LLM_RATE_LIMIT_RPM=2, LLM_RATE_LIMIT_MAX_WAIT=1)
+    def test_file_backend_rejects_past_max_wait(self):
+        with override_settings(LLM_RATE_LIMIT_FILE=self.path):
+            self._acquire_over_budget()
+
+        self.assertEqual(metrics.get('llm_rate_limit_rejections_total'), 1)
+        self.assertEqual(rate_limiter.queue_depth, 0)
+
+    @override_settings(LLM_RATE_LIMIT_BACKEND='database', LLM_RATE_LIMIT_RPM=2, LLM_RATE_LIMIT_MAX_WAIT=1)
+    def test_database_backend_rejects_past_max_wait(self):
+        self._acquire_over_budget()
+
+        self.assertLess(LLMRateBucket.objects.get(name='requests').level, 1)
+
+    @override_settings(LLM_RATE_LIMIT_BACKEND='file', LLM_RATE_LIMIT_RPM=60, LLM_RATE_LIMIT_MAX_WAIT=5)
+    def test_caller_queues_until_budget_refills(self):
+        with override_settings(LLM_RATE_LIMIT_FILE=self.path):
+            for _ in range(60):
+                rate_limiter.acquire(self.request)
+            rate_limiter.acquire(self.request)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['llm_rate_limit_wait_seconds_count'][0]['value'], 61)
+        self.assertGreater(snapshot['llm_rate_limit_wait_seconds_sum'][0]['value'], 0.5)
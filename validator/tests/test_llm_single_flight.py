@@ -0,0 +1,149 @@
+import threading
+from datetime import timedelta
+from unittest.mock import patch, Mock
+
+import psycopg
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from validator.enums import ValidationType
+from validator.llm.cache import verdict_cache
+from validator.llm.client import llm_clients
+from validator.llm.metrics import metrics
+from validator.llm.single_flight import llm_flights
+from validator.llm.transport import llm_transport
+from validator.services.causes import CausesService
+
+
+class SingleFlightTest(TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def _run_followers(self, fn, count):
+        results, errors = [], []
+
+        def call():
+            try:
+                results.append(llm_flights.do('key', fn=fn, lookup=lambda: None))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def _wait_for_followers(self, count):
+        for _ in range(200):
+            if metrics.get('llm_coalesced_calls_total', scope='process') == count:
+                return
+            threading.Event().wait(0.01)
+
+    def test_concurrent_calls_share_one_execution(self):
+        release = threading.Event()
+        fn = Mock(side_effect=lambda: release.wait(5) and 'answer')
+
+        threads, results, errors = self._run_followers(fn, 4)
+        self._wait_for_followers(3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        fn.assert_called_once()
+        self.assertEqual(sorted(results), [('answer', False)] + [('answer', True)] * 3)
+        self.assertEqual(errors, [])
+
+    def test_error_is_shared_with_followers(self):
+        release = threading.Event()
+
+        def fail():
+            release.wait(5)
+            raise ValueError('boom')
+
+        threads, results, errors = self._run_followers(fail, 3)
+        self._wait_for_followers(2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(results, [])
+
+    def test_sequential_calls_are_not_coalesced(self):
+        fn = Mock(return_value='answer')
+
+        llm_flights.do('key', fn=fn, lookup=lambda: None)
+        llm_flights.do('key', fn=fn, lookup=lambda: None)
+
+        self.assertEqual(fn.call_count, 2)
+
+
+class CoalescedApiCallTest(TestCase):
+    def setUp(self):
+        llm_clients.reset()
+        llm_transport.reset()
+        verdict_cache.clear()
+        metrics.reset()
+
+    @patch('validator.llm.client.Groq')
+    # answers written by pool threads would bypass the test transaction
+    @override_settings(LLM_CACHE_ENABLED=False)
+    def test_identical_prompts_share_one_upstream_request(self, mock_groq):
+        release = threading.Event()
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = lambda **kwargs: release.wait(5) and Mock(choices=[Mock(message=Mock(content='true'))])
+        mock_groq.return_value = mock_client
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL)))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for _ in range(200):
+            if metrics.get('llm_coalesced_calls_total') == 2:
+                break
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [1, 1, 1])
+        mock_client.chat.completions.create.assert_called_once()
+        self.assertEqual(metrics.get('llm_calls_total', kind='normal', source='coalesced'), 2)
+
+    @patch('validator.llm.client.Groq')
+    @override_settings(LLM_SINGLE_FLIGHT_BACKEND='database', LLM_SINGLE_FLIGHT_POLL_INTERVAL=0.01)
+    def test_waits_for_another_worker_holding_the_advisory_lock(self, mock_groq):
+        mock_client = Mock()
+        mock_groq.return_value = mock_client
+        request = CausesService()._make_request(system_message='system', user_prompt='Is it the cause?')
+        key = verdict_cache.make_key(**request)
+        lock_id = int.from_bytes(bytes.fromhex(key[:16]), 'big', signed=True)
+
+        # another worker: its own connection holds the lock, then stores the answer and releases it
+        params = connection.get_connection_params()
+        other = psycopg.connect(**{name: value for name, value in params.items() if name != 'cursor_factory'}, autocommit=True)
+        other.execute("SELECT pg_advisory_lock(%s)", [lock_id])
+
+        def finish():
+            other.execute(
+                "INSERT INTO validator_llmverdict (key, model, answer, created_at, expires_at, last_used_at) VALUES (%s, %s, %s, %s, %s, %s)",
+                [key, request['model'], 'false', timezone.now(), timezone.now() + timedelta(hours=1), timezone.now()],
+            )
+            other.execute("SELECT pg_advisory_unlock(%s)", [lock_id])
+
+        timer = threading.Timer(0.2, finish)
+        timer.start()
+        try:
+            result = CausesService().api_call('system', 'Is it the cause?', ValidationType.NORMAL)
+        finally:
+            timer.join()
+            other.execute("DELETE FROM validator_llmverdict WHERE key = %s", [key])
+            other.close()
+
+        self.assertEqual(result, 0)
+        mock_client.chat.completions.create.assert_not_called()
+        self.assertEqual(metrics.get('llm_coalesced_calls_total', scope='database'), 1)
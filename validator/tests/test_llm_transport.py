@@ -0,0 +1,188 @@
+import os
+import time
+import tempfile
+from unittest.mock import patch, Mock
+
+from django.test import TestCase, override_settings
+
+from validator.exceptions import AIServiceErrorException
+from validator.llm.client import llm_clients
+from validator.llm.metrics import metrics
+from validator.llm.stub_server import StubLLMServer
+from validator.llm.transport import llm_transport, CircuitBreaker
+
+
+@override_settings(GROQ_API_KEY='test', LLM_RETRY_BACKOFF=0, LLM_HEDGE_ENABLED=False)
+class LLMTransportTest(TestCase):
+    def setUp(self):
+        llm_clients.reset()
+        llm_transport.reset()
+        metrics.reset()
+        self.stub = StubLLMServer()
+        self.base_url = self.stub.start()
+        self.request = {'messages': [{'role': 'user', 'content': 'prompt'}], 'model': 'llama-3.3-70b-specdec'}
+
+    def tearDown(self):
+        llm_clients.reset()
+        llm_transport.reset()
+        self.stub.stop()
+
+    def test_transient_errors_are_retried(self):
+        self.stub.fail_next(2)
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_MAX_RETRIES=2):
+            completion = llm_transport.create(self.request)
+
+        self.assertEqual(completion.choices[0].message.content, 'true')
+        self.assertEqual(self.stub.requests, 3)
+        self.assertEqual(metrics.get('llm_retries_total'), 2)
+
+    def test_exhausted_retries_raise_ai_service_error(self):
+        self.stub.fail_next(10)
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_MAX_RETRIES=2):
+            with self.assertRaises(AIServiceErrorException):
+                llm_transport.create(self.request)
+
+        self.assertEqual(self.stub.requests, 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.stub.fail_next(1, status=400)
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_MAX_RETRIES=2):
+            with self.assertRaises(AIServiceErrorException):
+                llm_transport.create(self.request)
+
+        self.assertEqual(self.stub.requests, 1)
+        self.assertEqual(llm_transport.breaker(self.request['model']).state, CircuitBreaker.CLOSED)
+
+    def test_slow_upstream_times_out(self):
+        self.stub.latency = 0.5
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_TIMEOUT=0.1, LLM_MAX_RETRIES=0):
+            started = time.monotonic()
+            with self.assertRaises(AIServiceErrorException):
+                llm_transport.create(self.request)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+
+    def test_deadline_bounds_the_rate_limiter_queue(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_RATE_LIMIT_BACKEND='file', LLM_RATE_LIMIT_FILE=path,
+                               LLM_RATE_LIMIT_RPM=1, LLM_DEADLINE=0.3):
+            llm_transport.create(self.request)
+            started = time.monotonic()
+            with self.assertRaises(AIServiceErrorException):
+                llm_transport.create(self.request)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(self.stub.requests, 1)
+        self.assertEqual(llm_transport.breaker(self.request['model']).state, CircuitBreaker.CLOSED)
+
+    def test_deadline_shortens_the_request_timeout(self):
+        self.stub.latency = 1
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_TIMEOUT=5, LLM_DEADLINE=0.3, LLM_MAX_RETRIES=2):
+            started = time.monotonic()
+            with self.assertRaises(AIServiceErrorException):
+                llm_transport.create(self.request)
+
+        self.assertLess(time.monotonic() - started, 0.8)
+
+    def test_breaker_fails_fast_while_open(self):
+        self.stub.fail_next(2)
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_MAX_RETRIES=0, LLM_BREAKER_FAILURES=2):
+            for _ in range(3):
+                with self.assertRaises(AIServiceErrorException):
+                    llm_transport.create(self.request)
+
+        self.assertEqual(self.stub.requests, 2)
+        self.assertEqual(llm_transport.breaker(self.request['model']).state, CircuitBreaker.OPEN)
+        self.assertEqual(metrics.get('llm_breaker_rejections_total'), 1)
+
+    def test_breaker_closes_after_successful_trial(self):
+        self.stub.fail_next(2)
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_MAX_RETRIES=0, LLM_BREAKER_FAILURES=2):
+            for _ in range(2):
+                with self.assertRaises(AIServiceErrorException):
+                    llm_transport.create(self.request)
+
+            with override_settings(LLM_BREAKER_RESET_TIMEOUT=0):
+                self.assertEqual(llm_transport.breaker(self.request['model']).state, CircuitBreaker.HALF_OPEN)
+                llm_transport.create(self.request)
+
+        self.assertEqual(llm_transport.breaker(self.request['model']).state, CircuitBreaker.CLOSED)
+
+    def test_breaker_trial_failing_before_the_upstream_is_released(self):
+        self.stub.fail_next(1)
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_MAX_RETRIES=0, LLM_BREAKER_FAILURES=1):
+            with self.assertRaises(AIServiceErrorException):
+                llm_transport.create(self.request)
+
+            with override_settings(LLM_BREAKER_RESET_TIMEOUT=0):
+                with patch('validator.llm.transport.rate_limiter.acquire', side_effect=AIServiceErrorException('rate limited')):
+                    with self.assertRaises(AIServiceErrorException):
+                        llm_transport.create(self.request)
+
+                llm_transport.create(self.request)
+
+        self.assertEqual(llm_transport.breaker(self.request['model']).state, CircuitBreaker.CLOSED)
+
+    @override_settings(LLM_HEDGE_ENABLED=True, LLM_HEDGE_MIN_SAMPLES=1, LLM_HEDGE_MIN_DELAY=0.05)
+    @patch('validator.llm.client.Groq')
+    def test_slow_request_is_hedged(self, mock_groq):
+        fast = Mock(choices=[Mock(message=Mock(content='hedged'))])
+        slow = Mock(choices=[Mock(message=Mock(content='slow'))])
+
+        def create(**kwargs):
+            if mock_client.chat.completions.create.call_count == 1:
+                time.sleep(0.5)
+                return slow
+            return fast
+
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = create
+        mock_groq.return_value = mock_client
+        llm_transport.latency.record(0.01)
+
+        completion = llm_transport.create(self.request)
+
+        self.assertEqual(completion.choices[0].message.content, 'hedged')
+        self.assertEqual(metrics.get('llm_hedged_requests_total'), 1)
+
+    def test_stream_stops_once_answer_is_known(self):
+        self.stub.answer = 'False, the cause does not explain the problem at all'
+        self.stub.token_latency = 0.2
+
+        started = time.monotonic()
+        with override_settings(GROQ_BASE_URL=self.base_url):
+            text, usage = llm_transport.stream(self.request, until=lambda text: 'false' in text.lower())
+
+        self.assertEqual(text, 'False,')
+        self.assertIsNone(usage)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(metrics.get('llm_stream_early_exits_total'), 1)
+
+    def test_stream_read_to_the_end_reports_usage(self):
+        self.stub.answer = 'no verdict here'
+
+        with override_settings(GROQ_BASE_URL=self.base_url):
+            text, usage = llm_transport.stream(self.request, until=lambda text: 'false' in text.lower())
+
+        self.assertEqual(text, 'no verdict here')
+        self.assertEqual(usage.completion_tokens, 3)
+
+    def test_stream_errors_are_retried(self):
+        self.stub.fail_next(1)
+
+        with override_settings(GROQ_BASE_URL=self.base_url, LLM_MAX_RETRIES=1):
+            text, _ = llm_transport.stream(self.request, until=lambda text: 'true' in text)
+
+        self.assertEqual(text, 'true')
+        self.assertEqual(self.stub.requests, 2)
@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from authentication.models import CustomUser
+from validator.exceptions import TooManyDraftsException
+from validator.llm.metrics import metrics
+from validator.models.causes import Causes
+from validator.models.question import Question
+from validator.services import prevalidation
+from validator.services.prevalidation import PrevalidationService
+
+
+@override_settings(PREVALIDATION_BACKEND='thread', PREVALIDATION_MAX_PENDING=2)
+class PrevalidationServiceTest(TestCase):
+    def setUp(self):
+        metrics.reset()
+        self.service = PrevalidationService()
+        self.user = CustomUser.objects.create(username='test-username', email='test@email.com')
+        self.question = Question.objects.create(user=self.user, question='Test question')
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.release = threading.Event()
+        self.evaluated = []
+
+        def run(draft, prev_cause):
+            self.release.wait(5)
+            self.evaluated.append(draft.cause)
+
+        patch.object(prevalidation, '_get_executor', return_value=self.executor).start()
+        patch.object(PrevalidationService, 'run', side_effect=run).start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+    def _prevalidate(self, column: int, cause: str):
+        return self.service.prevalidate(user=self.user, question_id=self.question.id, row=1, column=column, cause=cause)
+
+    def test_newer_draft_of_a_cell_cancels_the_queued_one(self):
+        self.assertEqual(self._prevalidate(0, 'Running').status, 'scheduled')
+        self._prevalidate(1, 'Superseded')
+        self._prevalidate(1, 'Newest')
+
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+        self.assertEqual(self.evaluated, ['Running', 'Newest'])
+        self.assertEqual(metrics.get('prevalidation_superseded_total'), 1)
+        self.assertFalse(Causes.objects.exists())
+
+    def test_pending_drafts_are_bounded_per_user(self):
+        self._prevalidate(0, 'Running')
+        self._prevalidate(1, 'Queued')
+
+        with self.assertRaises(TooManyDraftsException):
+            self._prevalidate(2, 'Rejected')
+
+        # other users have quotas of their own
+        other = CustomUser.objects.create(username='other-username', email='other@email.com')
+        other_question = Question.objects.create(user=other, question='Other question')
+        self.service.prevalidate(user=other, question_id=other_question.id, row=1, column=0, cause='Other')
+        self.assertEqual(metrics.get('prevalidation_rejections_total'), 1)
+
+    def test_rejected_draft_keeps_the_queued_one_of_its_cell(self):
+        self._prevalidate(0, 'Running')
+        self._prevalidate(1, 'Queued')
+
+        with override_settings(PREVALIDATION_MAX_PENDING=1), self.assertRaises(TooManyDraftsException):
+            self._prevalidate(1, 'Rejected')
+
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+        self.assertEqual(self.evaluated, ['Running', 'Queued'])
+        self.assertEqual(metrics.get('prevalidation_superseded_total'), 0)
+
+    def test_parent_of_duplicated_cells_is_the_one_validation_picks(self):
+        first, second = sorted(
+            [Causes.objects.create(problem=self.question, row=1, column=0, mode='PRIBADI', cause=cause) for cause in ('A', 'B')],
+            key=lambda cause: cause.pk
+        )
+        parents = []
+        patch.object(PrevalidationService, '_submit', side_effect=lambda key, draft, prev_cause: parents.append(prev_cause)).start()
+
+        self.service.prevalidate(user=self.user, question_id=self.question.id, row=2, column=0, cause='Draft')
+
+        self.assertEqual(parents, [first])
@@ -1,6 +1,8 @@
 from django.test import TestCase
 from validator.models.question import Question
 from validator.models.tag import Tag
+from validator.models.question_facet import QuestionFacet, QuestionFacetVersion
+from validator.search import search_query
 from authentication.models import CustomUser
 from django.core.exceptions import ValidationError
 import uuid
@@ -40,3 +42,56 @@ class QuestionModelTest(TestCase):
         self.assertEqual(question.question, 'pertanyaan')
         self.assertEqual(question.mode, Question.ModeChoices.PRIBADI)
         self.assertEqual(question.tags.first().name, self.tag_name)
+
+    def test_search_vector_follows_title_and_tags(self):
+        def searchable(keyword):
+            return Question.objects.filter(id=self.question_uuid, search_vector=search_query(keyword, 'ABC')).exists()
+
+        self.assertTrue(searchable('economy'))
+        self.assertTrue(searchable('pertanyaan'))
+
+        question = Question.objects.get(id=self.question_uuid)
+        question.title = 'Banjir'
+        question.save()
+        self.assertTrue(searchable('banjir'))
+        self.assertFalse(searchable('title'))
+
+        tag = Tag.objects.get(name=self.tag_name)
+        tag.name = 'ekonomi'
+        tag.save()
+        self.assertTrue(searchable('ekonomi'))
+
+        tag.question_set.clear()
+        self.assertFalse(searchable('ekonomi'))
+
+    def test_facets_follow_questions_and_tags(self):
+        def facet_counts():
+            return {(facet.kind, facet.value): facet.count for facet in QuestionFacet.objects.all()}
+
+        self.assertEqual(facet_counts(), {('judul', 'Test Title'): 1, ('topik', 'economy'): 1, ('pengguna', 'test'): 1})
+
+        question = Question.objects.get(id=self.question_uuid)
+        question.title = 'Banjir'
+        question.save()
+        other = Question.objects.create(user=self.valid_user, title='Banjir', question='lain', mode=Question.ModeChoices.PRIBADI)
+        other.tags.set([Tag.objects.get(name=self.tag_name), Tag.objects.create(name='sosial')])
+        self.assertEqual(facet_counts(), {('judul', 'Banjir'): 2, ('topik', 'economy'): 2, ('topik', 'sosial'): 1, ('pengguna', 'test'): 2})
+
+        tag = Tag.objects.get(name=self.tag_name)
+        tag.name = 'ekonomi'
+        tag.save()
+        self.valid_user.username = 'renamed'
+        self.valid_user.save()
+        other.tags.remove(tag)
+        # removing a tag the question does not have changes nothing
+        other.tags.remove(tag)
+        self.assertEqual(facet_counts(), {('judul', 'Banjir'): 2, ('topik', 'ekonomi'): 1, ('topik', 'sosial'): 1, ('pengguna', 'renamed'): 2})
+
+        version = QuestionFacetVersion.objects.get().version
+        other.delete()
+        self.assertEqual(facet_counts(), {('judul', 'Banjir'): 1, ('topik', 'ekonomi'): 1, ('pengguna', 'renamed'): 1})
+        self.assertGreater(QuestionFacetVersion.objects.get().version, version)
+
+        # questions outlive their user
+        self.valid_user.delete()
+        self.assertEqual(facet_counts(), {('judul', 'Banjir'): 1, ('topik', 'ekonomi'): 1})
@@ -1,8 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 import uuid
 
+from django.db import connection
+from django.db.models import Q
 from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
 
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -12,6 +15,8 @@ from validator.enums import QuestionType
 from validator.models.question import Question
 from validator.models.causes import Causes
 from validator.models.tag import Tag
+from validator.search import refresh_search_vectors
+from validator.services.question import QuestionService
 from validator.serializers import (
     QuestionRequest, BaseQuestion, QuestionTitleRequest
 )
@@ -692,3 +697,208 @@ class QuestionViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('judul', response.data)
         self.assertIn('topik', response.data)
+
+    def test_get_field_values_follow_question_changes(self):
+        url = reverse(self.get_field_values)
+        response = self.client.get(url)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self._add_questions(1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('test 0', response.data['judul'])
+        self.assertTrue({'bulk0', 'bulk1', 'bulk2'} <= set(response.data['topik']))
+
+    def _count_queries(self, url: str) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def _add_questions(self, count: int):
+        tags = [Tag.objects.get_or_create(name=f'bulk{index}')[0] for index in range(3)]
+        for index in range(count):
+            question = Question.objects.create(user=self.user1, title=f'test {index}', question='Test question',
+                                               mode=Question.ModeChoices.PENGAWASAN)
+            question.tags.set(tags)
+
+    def test_list_endpoints_use_a_constant_number_of_queries(self):
+        urls = [
+            reverse(self.get_all) + '?time_range=last_week&count=5',
+            reverse(self.get_matched) + '?filter=semua&keyword=test&time_range=last_week&count=5',
+            reverse(self.get_pengawasan) + '?filter=semua&keyword=&count=5',
+            reverse(self.get_field_values),
+        ]
+        self._add_questions(2)
+        budgets = [self._count_queries(url) for url in urls]
+
+        self._add_questions(20)
+
+        self.assertEqual([self._count_queries(url) for url in urls], budgets)
+        # authentication, count, one page of questions with their user, their tags
+        self.assertEqual(budgets[:3], [4, 4, 4])
+
+    def test_list_endpoints_fetch_only_the_requested_page(self):
+        self._add_questions(12)
+        expected = list(Question.objects.filter(mode=Question.ModeChoices.PENGAWASAN).order_by('-created_at').values_list('id', flat=True))
+
+        url = reverse(self.get_pengawasan) + '?filter=semua&keyword=&count=5&p=2'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], len(expected))
+        self.assertIn('p=3', response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
+        self.assertEqual([item['id'] for item in response.data['results']], [str(pk) for pk in expected[5:10]])
+        self.assertTrue(any('LIMIT 5 OFFSET 5' in query['sql'] for query in queries.captured_queries))
+
+    def test_cursor_pagination_walks_every_question_once(self):
+        self._add_questions(12)
+        # questions created in the same instant are ordered by id
+        Question.objects.filter(title__in=['test 3', 'test 4', 'test 5', 'test 6']).update(created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        expected = [str(pk) for pk in Question.objects.filter(mode=Question.ModeChoices.PENGAWASAN)
+                    .order_by('-created_at', '-id').values_list('id', flat=True)]
+
+        url = reverse(self.get_pengawasan) + '?filter=semua&keyword=&pagination=cursor&count=5'
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIsNone(response.data['count'])
+            self.assertFalse(any('OFFSET' in query['sql'] or 'COUNT(' in query['sql'] for query in queries.captured_queries))
+            pages.append(response.data)
+            url = response.data['next']
+
+        self.assertEqual([item['id'] for page in pages for item in page['results']], expected)
+        self.assertIsNone(pages[0]['previous'])
+
+        response = self.client.get(pages[2]['previous'])
+        self.assertEqual(response.data['results'], pages[1]['results'])
+        self.assertEqual(response.data['next'], pages[1]['next'])
+
+    def test_cursor_pagination_counts_on_request(self):
+        url = reverse(self.get_all) + '?time_range=last_week&pagination=cursor&with_count=true'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], Question.objects.filter(user=self.user1).count())
+
+    def test_cursor_pagination_invalid_cursor(self):
+        url = reverse(self.get_matched) + '?filter=semua&time_range=last_week&pagination=cursor&cursor=invalid'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_pagination_keeps_the_relevance_order_of_a_search(self):
+        self._add_questions(12)
+        # the same rank for several questions is broken by created_at then id
+        Question.objects.filter(title__in=['test 3', 'test 4']).update(title='banjir', created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        Question.objects.filter(title__in=['test 5', 'test 6']).update(question='banjir', created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        Question.objects.filter(title='test 7').update(question='banjir banjir')
+        refresh_search_vectors(Question.objects.all())
+        matching = Question.objects.filter(Q(title='banjir') | Q(question__contains='banjir'))
+        expected = [str(pk) for pk in QuestionService()._order_by_relevance(matching, 'semua', 'banjir')
+                    .order_by('-rank', '-created_at', '-id').values_list('id', flat=True)]
+
+        url = reverse(self.get_pengawasan) + '?filter=semua&keyword=banjir&pagination=cursor&count=2'
+        results = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            results += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(len(expected), 5)
+        self.assertEqual(results, expected)
+
+    def test_cursor_pagination_compares_the_position_as_a_row(self):
+        self._add_questions(6)
+        response = self.client.get(reverse(self.get_pengawasan) + '?filter=semua&keyword=&pagination=cursor&count=2')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data['next'])
+
+        # a row value comparison is an index condition, an OR of the keys is a filter over every earlier row
+        page_query = next(query['sql'] for query in queries.captured_queries if 'LIMIT 3' in query['sql'])
+        self.assertIn('ROW("validator_question"."created_at", "validator_question"."id") < (ROW(', page_query)
+
+    def test_cursor_of_another_search_is_invalid(self):
+        self._add_questions(6)
+        response = self.client.get(reverse(self.get_pengawasan) + '?filter=semua&keyword=&pagination=cursor&count=2')
+        url = response.data['next'].replace('keyword=', 'keyword=test')
+
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search_ranks_title_matches_first(self):
+        Question.objects.all().delete()
+        in_question = Question.objects.create(user=self.user1, title='lain', question='masalah banjir di kota',
+                                              mode=Question.ModeChoices.PENGAWASAN)
+        in_title = Question.objects.create(user=self.user1, title='banjir', question='masalah lain',
+                                           mode=Question.ModeChoices.PENGAWASAN)
+        Question.objects.create(user=self.user1, title='kemacetan', question='masalah lalu lintas',
+                                mode=Question.ModeChoices.PENGAWASAN)
+
+        response = self.client.get(reverse(self.get_pengawasan) + '?filter=judul&keyword=banj')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # the newest question comes last, a title match outranks a question match
+        self.assertEqual([item['id'] for item in response.data['results']], [str(in_title.id), str(in_question.id)])
+
+    def test_search_by_pengguna_only_matches_usernames(self):
+        Question.objects.all().delete()
+        budi = CustomUser.objects.create(username='budi', email='budi@email.com')
+        mentioned = Question.objects.create(user=self.user2, title='Budi korupsi', question='masalah',
+                                            mode=Question.ModeChoices.PENGAWASAN)
+        mentioned.tags.set([Tag.objects.create(name='budi')])
+        owned = Question.objects.create(user=budi, title='Masalah A', question='masalah',
+                                        mode=Question.ModeChoices.PENGAWASAN)
+
+        response = self.client.get(reverse(self.get_pengawasan) + '?filter=pengguna&keyword=budi')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [str(owned.id)])
+
+    def _search_plan(self, q_filter: str, keyword: str) -> str:
+        searched = []
+        QuestionService().get_privileged(q_filter=q_filter, user=self.user1, keyword=keyword,
+                                         paginate=lambda queryset: searched.append(queryset) or [])
+        with connection.cursor() as cursor:
+            # an empty table is cheapest to scan whatever its indexes
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        return searched[0].explain()
+
+    def test_search_selects_questions_through_the_search_vector_index(self):
+        self._add_questions(3)
+        plan = self._search_plan('topik', 'bulk')
+
+        self.assertIn('validator_q_search__e9250a_gin', plan)
+        self.assertNotRegex(plan, r'Seq Scan on validator_question\b')
+
+    def test_search_arms_are_all_served_by_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                self.skipTest('the icontains matches are only indexed with pg_trgm')
+        self._add_questions(3)
+
+        for q_filter in ('semua', 'judul', 'topik', 'pengguna'):
+            self.assertNotRegex(self._search_plan(q_filter, 'test 1'), r'Seq Scan on ')
+
+    def test_search_matches_tag_substrings_once(self):
+        Question.objects.all().delete()
+        question = Question.objects.create(user=self.user1, title='judul', question='pertanyaan',
+                                           mode=Question.ModeChoices.PENGAWASAN)
+        question.tags.set([Tag.objects.create(name='ekonomi'), Tag.objects.create(name='sosekonomi')])
+
+        for filter in ('topik', 'semua'):
+            response = self.client.get(reverse(self.get_pengawasan) + f'?filter={filter}&keyword=ekonomi')
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([item['id'] for item in response.data['results']], [str(question.id)])
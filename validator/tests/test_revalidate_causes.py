@@ -0,0 +1,76 @@
+import os
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase, override_settings
+
+from authentication.models import CustomUser
+from validator.enums import ValidationType
+from validator.llm.cache import verdict_cache
+from validator.llm.transport import llm_transport
+from validator.models.causes import Causes
+from validator.models.question import Question
+from validator.services.causes import CausesService
+
+
+@override_settings(LLM_CACHE_ENABLED=False)
+class RevalidateCausesTest(TransactionTestCase):
+    def setUp(self):
+        llm_transport.reset()
+        verdict_cache.clear()
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+        self.user = CustomUser.objects.create_user(username='revalidator', email='revalidator@example.com', password='password')
+        self.questions = []
+        for mode in ('PRIBADI', 'PRIBADI', 'PENGAWASAN'):
+            question = Question.objects.create(user=self.user, question='Test question', mode=mode)
+            Causes.objects.create(problem=question, row=1, column=0, mode=mode, cause='Penyebab')
+            self.questions.append(question)
+
+    def _revalidate(self, side_effect=None, **options):
+        def answer(validation_type, **kwargs):
+            return 1 if validation_type == ValidationType.FALSE else 0
+
+        with patch.object(CausesService, 'api_call', side_effect=side_effect or answer) as mock_api_call:
+            call_command('revalidate_causes', checkpoint=self.checkpoint, stdout=StringIO(), stderr=StringIO(), **{'workers': 2, **options})
+        return mock_api_call
+
+    def test_revalidates_matching_questions_even_when_unchanged(self):
+        self._revalidate()
+        self.assertEqual(Causes.objects.filter(feedback='').count(), 0)
+
+        mock_api_call = self._revalidate(mode='PRIBADI', restart=True)
+
+        # a false verdict and its reason per cause, although none of them changed
+        self.assertEqual(mock_api_call.call_count, 4)
+        with open(self.checkpoint) as file:
+            self.assertEqual(set(json.load(file)['done']), {str(question.id) for question in self.questions[:2]})
+
+    def test_resumes_from_checkpoint_and_retries_failures(self):
+        calls = []
+
+        def answer(validation_type, **kwargs):
+            calls.append(validation_type)
+            # the first question is revalidated first and its first call fails
+            if len(calls) == 1:
+                raise RuntimeError('upstream down')
+            return 1 if validation_type == ValidationType.FALSE else 0
+
+        self._revalidate(side_effect=answer, workers=1)
+        with open(self.checkpoint) as file:
+            self.assertNotIn(str(self.questions[0].id), json.load(file)['done'])
+
+        mock_api_call = self._revalidate()
+
+        self.assertEqual(mock_api_call.call_count, 2)
+        with open(self.checkpoint) as file:
+            self.assertEqual(len(json.load(file)['done']), 3)
+
+    def test_checkpoint_of_other_filters_is_refused(self):
+        self._revalidate(user='revalidator')
+
+        with self.assertRaises(CommandError):
+            self._revalidate(mode='PENGAWASAN')
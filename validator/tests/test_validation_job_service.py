@@ -0,0 +1,113 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from authentication.models import CustomUser
+from validator.constants import ErrorMsg
+from validator.exceptions import AIServiceErrorException, ForbiddenRequestException
+from validator.models.causes import Causes
+from validator.models.question import Question
+from validator.models.validation_job import ValidationJob
+from validator.services.causes import CausesService
+from validator.services.validation_job import ValidationJobService
+
+
+class ValidationJobServiceTest(TestCase):
+    def setUp(self):
+        self.service = ValidationJobService()
+        self.user = CustomUser.objects.create(username='test-username', email='test@email.com')
+        self.question = Question.objects.create(user=self.user, question='Test question')
+        self.cause = Causes.objects.create(problem=self.question, row=1, column=0, mode='PRIBADI', cause='Cause 1')
+
+    def test_claim_takes_oldest_pending_job(self):
+        first = ValidationJob.objects.create(problem=self.question, user=self.user)
+        ValidationJob.objects.create(problem=self.question, user=self.user)
+        ValidationJob.objects.create(problem=self.question, user=self.user, status=ValidationJob.StatusChoices.SUCCEEDED)
+
+        self.assertEqual(self.service.claim(), first.id)
+        first.refresh_from_db()
+        self.assertEqual(first.status, ValidationJob.StatusChoices.RUNNING)
+
+    def test_claim_returns_none_without_pending_jobs(self):
+        ValidationJob.objects.create(problem=self.question, user=self.user, status=ValidationJob.StatusChoices.FAILED)
+
+        self.assertIsNone(self.service.claim())
+
+    def test_claim_picks_up_abandoned_running_job(self):
+        job = ValidationJob.objects.create(problem=self.question, user=self.user, status=ValidationJob.StatusChoices.RUNNING)
+        ValidationJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(self.service.claim(), job.id)
+
+    def test_run_stores_progress_and_result(self):
+        job = ValidationJob.objects.create(problem=self.question, user=self.user)
+
+        with patch.object(CausesService, 'api_call', return_value=1):
+            self.service.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ValidationJob.StatusChoices.SUCCEEDED)
+        self.assertEqual((job.progress, job.total), (1, 1))
+        self.assertEqual(job.result[0]['id'], str(self.cause.id))
+        self.assertTrue(job.result[0]['status'])
+
+    def test_run_marks_job_failed(self):
+        job = ValidationJob.objects.create(problem=self.question, user=self.user)
+
+        with patch.object(CausesService, 'api_call', side_effect=AIServiceErrorException('Failed to call the AI service.')):
+            self.service.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ValidationJob.StatusChoices.FAILED)
+        self.assertEqual(job.error, 'Failed to call the AI service.')
+
+    def test_run_hides_unexpected_error_details(self):
+        job = ValidationJob.objects.create(problem=self.question, user=self.user)
+
+        with patch.object(CausesService, 'api_call', side_effect=RuntimeError('connection to 10.0.0.5 refused')):
+            self.service.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ValidationJob.StatusChoices.FAILED)
+        self.assertEqual(job.error, ErrorMsg.JOB_FAILED)
+
+    def test_enqueue_on_question_of_another_user_is_forbidden(self):
+        other = CustomUser.objects.create(username='other-username', email='other@email.com')
+
+        with self.assertRaises(ForbiddenRequestException):
+            self.service.enqueue(user=other, question_id=self.question.id)
+
+        self.assertFalse(ValidationJob.objects.exists())
+
+    @override_settings(VALIDATION_JOB_BACKEND='thread')
+    def test_abandoned_running_job_is_failed_on_read(self):
+        job = ValidationJob.objects.create(problem=self.question, user=self.user, status=ValidationJob.StatusChoices.RUNNING)
+        ValidationJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(days=1))
+
+        response = self.service.get(user=self.user, question_id=self.question.id, pk=job.id)
+
+        self.assertEqual(response.status, ValidationJob.StatusChoices.FAILED)
+        self.assertEqual(response.error, ErrorMsg.JOB_ABANDONED)
+
+    @override_settings(VALIDATION_JOB_BACKEND='thread')
+    def test_abandoned_pending_job_is_failed_on_read_and_not_run(self):
+        job = ValidationJob.objects.create(problem=self.question, user=self.user)
+        ValidationJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(days=1))
+
+        response = self.service.get(user=self.user, question_id=self.question.id, pk=job.id)
+        with patch.object(CausesService, 'api_call', return_value=1) as mock_api_call:
+            self.service.run(job.id)
+
+        self.assertEqual(response.status, ValidationJob.StatusChoices.FAILED)
+        self.assertEqual(response.error, ErrorMsg.JOB_ABANDONED)
+        mock_api_call.assert_not_called()
+
+    @override_settings(VALIDATION_JOB_BACKEND='thread')
+    def test_running_job_is_left_alone_on_read(self):
+        job = ValidationJob.objects.create(problem=self.question, user=self.user, status=ValidationJob.StatusChoices.RUNNING)
+
+        response = self.service.get(user=self.user, question_id=self.question.id, pk=job.id)
+
+        self.assertEqual(response.status, ValidationJob.StatusChoices.RUNNING)
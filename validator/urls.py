@@ -4,8 +4,9 @@ from validator.views.question import (
     QuestionGet, QuestionPost, QuestionPatch, QuestionDelete
 ) 
 from validator.views.causes import (
-    CausesGet, CausesPost, CausesPatch, ValidateView
+    CausesGet, CausesPost, CausesPatch, ValidateView, ValidationJobGet, ValidateStreamView, PrevalidateView
 )
+from validator.views.llm import LLMStatsView, LLMMetricsView
 
 
 app_name = 'validator'
@@ -30,4 +31,10 @@ urlpatterns = [
     path('causes/<uuid:question_id>/<uuid:pk>', CausesGet.as_view({ 'get': 'get' }), name="get_causes"),
     path('causes/patch/<uuid:question_id>/<uuid:pk>/', CausesPatch.as_view({'patch': 'patch_cause'}), name="patch_causes"),
     path('causes/validate/<uuid:question_id>/', ValidateView.as_view(), name="validate_causes"),
+    path('causes/validate/<uuid:question_id>/jobs/<uuid:pk>/', ValidationJobGet.as_view(), name="get_validation_job"),
+    path('causes/validate/<uuid:question_id>/stream/', ValidateStreamView.as_view(), name="validate_causes_stream"),
+    path('causes/prevalidate/<uuid:question_id>/', PrevalidateView.as_view(), name="prevalidate_cause"),
+    # llm
+    path('llm/stats/', LLMStatsView.as_view(), name="llm_stats"),
+    path('llm/metrics/', LLMMetricsView.as_view(), name="llm_metrics"),
 ]
@@ -1,12 +1,22 @@
+import time
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from validator.services.causes import CausesService
-from validator.serializers import CausesRequest, CausesResponse, BaseCauses
+from validator.services.validation_job import ValidationJobService
+from validator.services.prevalidation import PrevalidationService
+from validator.serializers import CausesRequest, CausesResponse, BaseCauses, ValidationJobResponse, PrevalidationRequest, PrevalidationResponse
 from rest_framework import status
 from drf_spectacular.utils import extend_schema
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.throttling import ScopedRateThrottle
+from utils.renderers import EventStreamRenderer, format_event
+from utils.streaming import to_async_iterator
+from validator.llm.metrics import metrics
 
 @permission_classes([IsAuthenticated])
 class CausesPost(APIView):
@@ -62,11 +72,99 @@ class CausesPatch(ViewSet):
 
 @permission_classes([IsAuthenticated])
 class ValidateView(APIView):
+    service_class = ValidationJobService()
+
     @extend_schema(
-        description='Run Root Cause Analysis for a specific question and row',
-        responses=CausesResponse,
+        description='Enqueue Root Cause Analysis of the newest row of a question, returns the validation job to poll',
+        responses={202: ValidationJobResponse},
+    )
+    def patch(self, request, question_id):
+        job = self.service_class.enqueue(user=request.user, question_id=question_id)
+        serializer = ValidationJobResponse(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+@permission_classes([IsAuthenticated])
+class PrevalidateView(APIView):
+    service_class = PrevalidationService()
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'prevalidate'
+
+    @extend_schema(
+        description=(
+            'Evaluate a draft cause in the background, e.g. when its field loses focus, so that validating '
+            'the question later reuses the LLM answers. A newer draft of the same cell replaces a queued one'
+        ),
+        request=PrevalidationRequest,
+        responses={202: PrevalidationResponse},
+    )
+    def post(self, request, question_id):
+        request_serializer = PrevalidationRequest(data=request.data)
+        request_serializer.is_valid(raise_exception=True)
+        draft = self.service_class.prevalidate(user=request.user, question_id=question_id, **request_serializer.validated_data)
+        serializer = PrevalidationResponse(draft)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+@permission_classes([IsAuthenticated])
+class ValidationJobGet(APIView):
+    service_class = ValidationJobService()
+
+    @extend_schema(
+        description='Returns the progress of a validation job and the validated causes once it succeeded',
+        responses=ValidationJobResponse,
+    )
+    def get(self, request, question_id, pk):
+        job = self.service_class.get(user=request.user, question_id=question_id, pk=pk)
+        serializer = ValidationJobResponse(job)
+        return Response(serializer.data)
+
+
+@permission_classes([IsAuthenticated])
+class ValidateStreamView(APIView):
+    renderer_classes = [EventStreamRenderer, JSONRenderer]
+
+    @extend_schema(
+        description=(
+            'Run Root Cause Analysis of the newest row of a question as Server-Sent Events: '
+            'a "cause" event per cause as soon as its verdict is saved, '
+            'an "error" event per cause that could not be evaluated and a final "summary" event'
+        ),
+        responses={(200, 'text/event-stream'): CausesResponse},
     )
     def patch(self, request, question_id):
-        updated_causes = CausesService.validate(self=CausesService, question_id=question_id)
-        serializer = CausesResponse(updated_causes, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        started = time.perf_counter()
+        results = CausesService.validate_stream(self=CausesService, user=request.user, question_id=question_id)
+        events = self._events(results, started)
+
+        # a synchronous iterator would be buffered completely by the ASGI handler
+        if isinstance(request._request, ASGIRequest):
+            events = to_async_iterator(events)
+
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def _events(self, results, started: float):
+        first_result = None
+        succeeded = failed = 0
+
+        for cause, error in results:
+            elapsed = time.perf_counter() - started
+            if first_result is None:
+                first_result = elapsed
+                metrics.observe('validation_time_to_first_result_seconds', elapsed)
+
+            if error is None:
+                succeeded += 1
+                yield format_event('cause', CausesResponse(cause).data)
+            else:
+                failed += 1
+                yield format_event('error', {'id': cause.id, 'column': cause.column, 'detail': str(error)})
+
+        yield format_event('summary', {
+            'total': succeeded + failed,
+            'succeeded': succeeded,
+            'failed': failed,
+            'time_to_first_result_ms': round(first_result * 1000) if first_result is not None else None,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000),
+        })
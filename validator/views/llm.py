@@ -0,0 +1,57 @@
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.decorators import authentication_classes, permission_classes
+from rest_framework.permissions import IsAdminUser
+from drf_spectacular.utils import extend_schema
+
+from validator.llm.cache import verdict_cache
+from validator.llm.metrics import metrics
+from validator.llm.rate_limit import rate_limiter
+from utils.permissions import HasMetricsToken
+
+
+@permission_classes([IsAdminUser])
+class LLMStatsView(APIView):
+    @extend_schema(
+        description='Returns the counters of the LLM pipeline of this process, including verdict cache hits and misses, the rate limiter queue, the similarity short-circuit rate and coalesced calls',
+    )
+    def get(self, request):
+        return Response({
+            'cache': verdict_cache.stats(),
+            'rate_limit': {
+                'enabled': rate_limiter.enabled,
+                'queue_depth': rate_limiter.queue_depth,
+            },
+            'similarity': similarity_stats(),
+            'coalesced_calls': {
+                'process': metrics.get('llm_coalesced_calls_total', scope='process'),
+                'database': metrics.get('llm_coalesced_calls_total', scope='database'),
+            },
+            'counters': metrics.snapshot(),
+        })
+
+
+# scrapers authenticate with the metrics token, not with a user JWT
+@authentication_classes([])
+@permission_classes([HasMetricsToken])
+class LLMMetricsView(APIView):
+    @extend_schema(
+        description='Exports the LLM metrics of every worker in the Prometheus text format',
+        responses={(200, 'text/plain'): str},
+    )
+    def get(self, request):
+        return HttpResponse(
+            metrics.aggregate().render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
+def similarity_stats() -> dict:
+    checked = metrics.get('validation_similarity_checks_total')
+    short_circuited = metrics.get('validation_similarity_short_circuits_total')
+    return {
+        'checked': checked,
+        'short_circuited': short_circuited,
+        'short_circuit_rate': short_circuited / checked if checked else 0,
+    }
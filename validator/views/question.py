@@ -1,3 +1,5 @@
+from functools import partial
+
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
@@ -7,7 +9,7 @@ from rest_framework.permissions import IsAuthenticated
 
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
-from utils.pagination import CustomPageNumberPagination
+from utils.pagination import CustomPageNumberPagination, KeysetCursorPagination
 
 from validator.services.question import QuestionService
 from validator.serializers import (
@@ -15,6 +17,29 @@ from validator.serializers import (
 )
 
 
+CURSOR_PAGINATION_PARAMETERS = [
+    OpenApiParameter(
+        name='pagination',
+        type=str,
+        location=OpenApiParameter.QUERY,
+        description='Set to "cursor" to page with the next/previous cursors instead of page numbers. '
+                    'A keyword search keeps its relevance order.'
+    ),
+    OpenApiParameter(
+        name='cursor',
+        type=str,
+        location=OpenApiParameter.QUERY,
+        description='Opaque cursor taken from the next or previous link, with pagination=cursor.'
+    ),
+    OpenApiParameter(
+        name='with_count',
+        type=bool,
+        location=OpenApiParameter.QUERY,
+        description='Set to true to compute the total count, with pagination=cursor.'
+    ),
+]
+
+
 @permission_classes([IsAuthenticated])
 class QuestionPost(APIView):
     @extend_schema(
@@ -83,17 +108,16 @@ class QuestionGet(ViewSet):
             location=OpenApiParameter.QUERY,
             description='Specify the page number for paginated results.'
         ),
-        ]
+        ] + CURSOR_PAGINATION_PARAMETERS
     )
     def get_all(self, request):
         time_range = request.query_params.get('time_range') 
-        questions = self.service_class.get_all(user=request.user, time_range=time_range)
+        paginator = self._get_paginator(request)
+        questions = self.service_class.get_all(user=request.user, time_range=time_range,
+                                               paginate=partial(paginator.paginate_queryset, request=request))
         serializer = QuestionResponse(questions, many=True)
 
-        paginator = self.pagination_class
-        page = paginator.paginate_queryset(serializer.data, request)
-
-        return paginator.get_paginated_response(page)
+        return paginator.get_paginated_response(serializer.data)
     
     @extend_schema(
         description='Returns questions with mode PENGAWASAN for privileged users based on keyword and time range.',
@@ -123,22 +147,21 @@ class QuestionGet(ViewSet):
                 location=OpenApiParameter.QUERY,
                 description='Specify the page number for paginated results.'
             ),
-        ]
+        ] + CURSOR_PAGINATION_PARAMETERS
     )
     def get_privileged(self, request):
         # query param to determine time range or response
         q_filter = request.query_params.get('filter')
         keyword =  request.query_params.get('keyword', '')
 
+        paginator = self._get_paginator(request)
         questions = self.service_class.get_privileged(q_filter=q_filter, 
                                                       user=request.user, 
-                                                      keyword=keyword)
+                                                      keyword=keyword,
+                                                      paginate=partial(paginator.paginate_queryset, request=request))
         serializer = QuestionResponse(questions, many=True)
 
-        paginator = self.pagination_class
-        page = paginator.paginate_queryset(serializer.data, request)
-
-        return paginator.get_paginated_response(page)
+        return paginator.get_paginated_response(serializer.data)
     
     @extend_schema(
         description='Returns user question that matched with certain keyword',
@@ -174,7 +197,7 @@ class QuestionGet(ViewSet):
                 location=OpenApiParameter.QUERY,
                 description='Specify the page number for paginated results.'
             ),
-        ]
+        ] + CURSOR_PAGINATION_PARAMETERS
     )
     def get_matched(self, request):
         # query param to determine question mode, time range, or response
@@ -182,16 +205,15 @@ class QuestionGet(ViewSet):
         time_range = request.query_params.get('time_range') 
         keyword = request.query_params.get('keyword', '') 
 
+        paginator = self._get_paginator(request)
         questions = self.service_class.get_matched(q_filter=q_filter,
                                                    user=request.user, 
                                                    time_range=time_range, 
-                                                   keyword=keyword)
+                                                   keyword=keyword,
+                                                   paginate=partial(paginator.paginate_queryset, request=request))
         serializer = QuestionResponse(questions, many=True)
 
-        paginator = self.pagination_class
-        page = paginator.paginate_queryset(serializer.data, request)
-
-        return paginator.get_paginated_response(page)
+        return paginator.get_paginated_response(serializer.data)
     
     @extend_schema(
         description="Returns all unique question fields' values that are attached to available questions.",
@@ -199,9 +221,18 @@ class QuestionGet(ViewSet):
     )
     def get_field_values(self, request):
         values = self.service_class.get_field_values(user=request.user)
+        if values.etag is not None and request.headers.get('If-None-Match') == values.etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': values.etag})
         serializer = FieldValuesResponse(values)
         
-        return Response(serializer.data)
+        headers = {'ETag': values.etag} if values.etag is not None else None
+        return Response(serializer.data, headers=headers)
+
+    def _get_paginator(self, request):
+        # keyset pagination is opt-in, page numbers stay the default
+        if request.query_params.get('pagination') == 'cursor':
+            return KeysetCursorPagination()
+        return self.pagination_class
 
 @permission_classes([IsAuthenticated])
 class QuestionPatch(ViewSet):